@@ -41,6 +41,35 @@ class Settings(BaseSettings):
     PORT: int = 8000  # Railway sets this automatically
     DATABASE_URL: str = ""
     ML_SERVICE_URL: str = "http://ml-service:5000"
+    ML_TRAINING_UPLOAD_FORMAT: str = "columnar"  # "columnar" (streamed binary) or "json"
+    ML_TRAINING_UPLOAD_CHUNK_ROWS: int = 50_000  # Rows per streamed frame
+    ML_TRAINING_DATA_SOURCE: str = "relay"  # "relay" rows from here, or ml-service reads "database"/"parquet"
+    ML_TRAINING_PARQUET_PATH: str = ""  # Snapshot path under ml-service TRAINING_DATA_DIR
+    FEATURE_STORE_REFRESH_SECONDS: int = 900  # Reload county features from training_data
+    RISK_SNAPSHOT_INTERVAL_SECONDS: int = 3600  # Rescore all counties × diseases (0 disables)
+    RISK_SNAPSHOT_PATH: str = "data/risk_snapshot.json"  # Last snapshot, served until the next one
+    RISK_SNAPSHOT_RETRY_SECONDS: float = 15.0  # First retry after a failed rescore, doubling...
+    RISK_SNAPSHOT_RETRY_MAX_SECONDS: float = 300.0  # ...up to this (and never past the interval)
+    
+    # ═══════════════════════════════════════════════════════════════════════════
+    # ML Service Client (one pooled connection set per backend process)
+    # ═══════════════════════════════════════════════════════════════════════════
+    ML_CLIENT_MAX_CONNECTIONS: int = 100
+    ML_CLIENT_MAX_KEEPALIVE: int = 20
+    ML_CLIENT_KEEPALIVE_SECONDS: float = 30.0
+    ML_CLIENT_CONNECT_TIMEOUT_SECONDS: float = 5.0  # Also bounds waiting for a free connection
+    ML_PREDICT_TIMEOUT_SECONDS: float = 30.0
+    ML_TRAIN_TIMEOUT_SECONDS: float = 120.0
+    ML_STATUS_TIMEOUT_SECONDS: float = 10.0
+    ML_COALESCE_WINDOW_MS: float = 2.0  # Batch concurrent predictions for this long (0 disables)
+    ML_COALESCE_MAX_ROWS: int = 256     # ...or until this many rows are waiting
+    ML_BATCH_CHUNK_ROWS: int = 100      # Rows per upstream call when fanning out a batch
+    ML_BATCH_MAX_CONCURRENCY: int = 8   # Upstream calls in flight per batch request
+    ML_BREAKER_FAILURE_THRESHOLD: int = 5  # Consecutive failures that open the circuit
+    ML_BREAKER_RESET_SECONDS: float = 30.0  # Open time before one probe call is allowed
+    ML_FALLBACK_ENABLED: bool = True  # Score locally while ml-service is unavailable
+    ML_FALLBACK_SYNC_SECONDS: int = 300  # Resync model parameters from ml-service (0 = load only)
+    ML_FALLBACK_PARAMS_PATH: str = "data/model_params.json"  # Last synced parameters
     
     # ═══════════════════════════════════════════════════════════════════════════
     # Twitter/X via twikit (free unofficial API)
@@ -33,6 +33,8 @@ class SQLAlchemyPostgrestEmulator:
         self._filters = []
         self._action = None
         self._data = None
+        self._order = []
+        self._range = None
 
     def table(self, name: str):
         emulator = SQLAlchemyPostgrestEmulator(self.session_factory)
@@ -61,6 +63,14 @@ class SQLAlchemyPostgrestEmulator:
         self._filters.append((column, value))
         return self
 
+    def order(self, column: str, desc: bool = False):
+        self._order.append((column, desc))
+        return self
+
+    def range(self, start: int, end: int):
+        self._range = (start, end)
+        return self
+
     def execute(self):
         class Response:
             def __init__(self, data):
@@ -101,6 +111,12 @@ class SQLAlchemyPostgrestEmulator:
                     stmt = select(t)
                     for col, val in self._filters:
                         stmt = stmt.where(getattr(t.c, col) == val)
+                    for col, desc in self._order:
+                        column = getattr(t.c, col)
+                        stmt = stmt.order_by(column.desc() if desc else column)
+                    if self._range is not None:
+                        start, end = self._range
+                        stmt = stmt.offset(start).limit(end - start + 1)
                     result = session.execute(stmt)
                     rows = []
                     for row in result:
@@ -9,6 +9,8 @@ of your backend. It:
 4. Sets up exception handlers
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
@@ -19,6 +21,9 @@ from app.config import settings
 # Import routers (we'll create these next)
 from app.routers import health, diseases, counties, predictions, ml, chat, operators, insights, social
 
+from app.services.ml_service import get_ml_manager
+from app.services.risk_snapshot import get_risk_snapshots
+
 # Import core modules for SDLC improvements
 from app.core.middleware import (
     RequestIDMiddleware,
@@ -40,6 +45,27 @@ from app.core.exceptions import (
 # Configure structured JSON logging for all modules
 configure_logging()
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# 🎓 LEARNING: Lifespan (Startup & Shutdown)
+# ═══════════════════════════════════════════════════════════════════════════════
+# Code before `yield` runs once at startup, code after it at shutdown.
+# The risk snapshot serves the last persisted result immediately, then is
+# rescored in a background task on a schedule. The ML client syncs model
+# parameters for its local fallback and keeps pooled connections open for
+# the life of the process; close them last.
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    risk_snapshots = get_risk_snapshots()
+    risk_snapshots.load()
+    risk_snapshots.start(settings.RISK_SNAPSHOT_INTERVAL_SECONDS)
+    ml_manager = get_ml_manager()
+    ml_manager.start_fallback_sync(settings.ML_FALLBACK_SYNC_SECONDS)
+    yield
+    await risk_snapshots.stop()
+    await ml_manager.stop_fallback_sync()
+    await ml_manager.aclose()
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # 🎓 LEARNING: Creating the FastAPI Application
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -52,6 +78,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",      # Swagger UI location
     redoc_url="/redoc",    # ReDoc location
+    lifespan=lifespan,     # Startup/shutdown hooks (see above)
 )
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -5,7 +5,7 @@ These models define the structure of data used for training and storing
 ML model predictions and training datasets.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, Field
 from datetime import datetime
 from typing import Optional, List
 from enum import Enum
@@ -29,6 +29,14 @@ class RiskLevelEnum(str, Enum):
     LOW = "low"
 
 
+# Model input features, in the column order ml-service uses (FEATURE_COLUMNS there)
+FEATURE_COLUMNS = [
+    'temperature', 'humidity', 'rainfall',
+    'population_density', 'access_to_water', 'healthcare_coverage',
+    'previous_cases', 'vaccination_rate'
+]
+
+
 class TrainingDataPoint(BaseModel):
     """
     Single data point for training the ML model
@@ -59,7 +67,12 @@ class TrainingDataPoint(BaseModel):
     cases_reported: int = Field(0, ge=0, description="Number of cases reported")
     
     # Metadata
-    date: datetime = Field(default_factory=datetime.now, description="Date of observation")
+    # The training_data table names this column observation_date
+    date: datetime = Field(
+        default_factory=datetime.now,
+        validation_alias=AliasChoices("date", "observation_date"),
+        description="Date of observation"
+    )
     created_at: Optional[datetime] = Field(None, description="Creation timestamp")
     updated_at: Optional[datetime] = Field(None, description="Update timestamp")
 
@@ -84,6 +97,44 @@ class PredictionRequest(BaseModel):
     vaccination_rate: float = Field(0, ge=0, le=100, description="% vaccinated")
 
 
+class CountyPredictionRequest(BaseModel):
+    """
+    Prediction request naming only county and disease
+    
+    Features left out are filled from the county feature store (latest
+    observations for the county); any feature given here overrides it.
+    """
+    county: str = Field(..., description="County to predict for")
+    disease: DiseaseEnum = Field(..., description="Disease to predict")
+    
+    temperature: Optional[float] = Field(None, description="Average temperature (Celsius)")
+    humidity: Optional[float] = Field(None, ge=0, le=100, description="Humidity percentage")
+    rainfall: Optional[float] = Field(None, ge=0, description="Monthly rainfall (mm)")
+    population_density: Optional[float] = Field(None, ge=0, description="People per km²")
+    access_to_water: Optional[float] = Field(None, ge=0, le=100, description="% with water access")
+    healthcare_coverage: Optional[float] = Field(None, ge=0, le=100, description="% healthcare coverage")
+    previous_cases: Optional[int] = Field(None, ge=0, description="Cases in previous month")
+    vaccination_rate: Optional[float] = Field(None, ge=0, le=100, description="% vaccinated")
+
+
+class CountyFeatures(BaseModel):
+    """Latest known prediction features for a county and disease"""
+    county: str
+    disease: DiseaseEnum
+    temperature: float
+    humidity: float
+    rainfall: float
+    population_density: float
+    access_to_water: float
+    healthcare_coverage: float
+    previous_cases: int
+    vaccination_rate: float
+    source: str = Field(
+        ..., description="county_disease, county (other diseases) or national (median)"
+    )
+    observed_at: Optional[datetime] = Field(None, description="Date of the source observation")
+
+
 class PredictionResponse(BaseModel):
     """Response model for predictions"""
     id: Optional[int] = None
@@ -96,10 +147,24 @@ class PredictionResponse(BaseModel):
     
     # Model info
     model_version: str = Field(..., description="ML model version used")
+    registry_version: Optional[str] = Field(
+        None, description="Model registry version, as reported by /model/status"
+    )
     created_at: datetime = Field(default_factory=datetime.now)
     
     # Recommendations
     recommendations: List[str] = Field(default_factory=list, description="Action recommendations")
+    
+    # Scored by the backend's local fallback because ml-service was unavailable
+    fallback: bool = Field(False, description="True if scored locally without ml-service")
+
+
+class BatchPredictionItem(BaseModel):
+    """One row of a batch prediction: its prediction, or why it failed"""
+    index: int = Field(..., description="Position of the request in the batch")
+    success: bool
+    prediction: Optional[PredictionResponse] = None
+    error: Optional[str] = None
 
 
 class ModelTrainingRequest(BaseModel):
@@ -107,6 +172,21 @@ class ModelTrainingRequest(BaseModel):
     disease: Optional[DiseaseEnum] = Field(None, description="Specific disease or None for all")
     test_size: float = Field(0.2, ge=0.1, le=0.5, description="Test data percentage")
     random_state: int = Field(42, description="Random seed for reproducibility")
+    cross_validation: bool = Field(
+        False,
+        description="Select var_smoothing by k-fold cross-validation instead of one split"
+    )
+    cv_folds: Optional[int] = Field(None, ge=2, le=20, description="Cross-validation folds")
+    county: Optional[str] = Field(None, description="Train a county-specific model")
+    region: Optional[str] = Field(None, description="Train a region-specific model")
+
+
+class TrainingJobRequest(ModelTrainingRequest):
+    """Request to queue an asynchronous training job on ml-service"""
+    train_all: bool = Field(
+        False,
+        description="Train every disease model plus the combined model in parallel"
+    )
 
 
 class ModelTrainingResponse(BaseModel):
@@ -119,3 +199,6 @@ class ModelTrainingResponse(BaseModel):
     training_timestamp: datetime
     status: str = Field("success", description="Training status")
     metrics: Optional[dict] = Field(None, description="Additional metrics")
+    cross_validation: Optional[dict] = Field(
+        None, description="Per-fold and aggregate metrics when trained with cross-validation"
+    )
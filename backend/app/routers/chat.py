@@ -8,17 +8,19 @@ Integrates Ollama LLM with ML predictions and social media insights.
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional, List
+import asyncio
 import logging
 
 from app.services.ollama_service import get_ollama_service
-from app.services.ml_service import MLModelManager
-from app.models.training_data import PredictionRequest, DiseaseEnum
+from app.services.ml_service import get_ml_manager
+from app.services.feature_store import get_feature_store
+from app.models.training_data import CountyPredictionRequest, DiseaseEnum
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 # Initialize services
-ml_manager = MLModelManager()
+ml_manager = get_ml_manager()
 
 
 class ChatMessage(BaseModel):
@@ -43,29 +45,28 @@ class ChatResponse(BaseModel):
     audio_url: Optional[str] = None  # For ElevenLabs TTS
 
 
-def build_context(county: Optional[str], disease: Optional[str]) -> str:
+async def build_context(county: Optional[str], disease: Optional[str]) -> str:
     """Build context string with ML predictions and social data"""
     context_parts = []
     
     # Add ML prediction if county and disease specified
     if county and disease:
         try:
-            # Create a sample prediction request
-            # In production, you'd fetch real environmental data
-            request = PredictionRequest(
-                county=county,
-                disease=DiseaseEnum(disease.lower()),
-                temperature=25.0,
-                humidity=65.0,
-                rainfall=80.0,
-                population_density=1500.0,
-                access_to_water=70.0,
-                healthcare_coverage=60.0,
-                previous_cases=50,
-                vaccination_rate=45.0
+            # Latest stored features for the county (no database query per message)
+            disease_enum = next(
+                (d for d in DiseaseEnum if d.value.lower() == disease.lower()), None
             )
+            if disease_enum is None:
+                raise ValueError(f"unknown disease {disease}")
+            store = get_feature_store()
+            await asyncio.to_thread(store.ensure_fresh)
+            request = store.build_request(
+                CountyPredictionRequest(county=county, disease=disease_enum)
+            )
+            if request is None:
+                raise ValueError(f"no stored features for {county}")
             
-            prediction = ml_manager.predict(request)
+            prediction = await ml_manager.predict(request)
             context_parts.append(f"""
 ## ML Prediction for {county} - {disease}
 - Risk Level: {prediction.risk_level.value}
@@ -107,7 +108,7 @@ async def chat(request: ChatRequest):
         ollama = get_ollama_service()
         
         # Build context based on conversation
-        context = build_context(request.county, request.disease)
+        context = await build_context(request.county, request.disease)
         
         # Add conversation history to context
         if request.history:
@@ -152,9 +153,11 @@ async def chat_status():
     ollama = get_ollama_service()
     is_available = await ollama.check_availability()
     
+    ml_status = await ml_manager.get_model_status()
+    
     return {
         "ollama_available": is_available,
         "model": ollama.model,
         "fallback_active": not is_available,
-        "ml_models_loaded": len(ml_manager.models) > 0
+        "ml_models_loaded": len(ml_status.get("models", {})) > 0
     }
@@ -88,6 +88,31 @@ def get_mock_stats(county: dict) -> dict:
     }
 
 
+def get_county_stats(county: dict) -> dict:
+    """
+    County stats from the latest risk snapshot (no inference per request).
+    
+    active_cases sums predicted cases across diseases. Falls back to mock
+    stats until the first snapshot has been computed.
+    """
+    from app.services.risk_snapshot import get_risk_snapshots
+
+    snapshots = get_risk_snapshots()
+    risks = snapshots.county_risk(county["id"])
+    if not risks:
+        return get_mock_stats(county)
+    risk_level = risks[0]["risk_level"]
+    return {
+        "county_id": county["id"],
+        "county_name": county["name"],
+        "active_cases": sum(r["predicted_cases"] for r in risks),
+        "risk_level": "high" if risk_level == "critical" else risk_level,
+        "trend": "n/a",
+        "top_diseases": [r["disease"] for r in risks[:2]],
+        "last_updated": snapshots.current.generated_at.isoformat()
+    }
+
+
 @router.get("", response_model=CountyListResponse)
 async def list_counties(
     region: Optional[str] = Query(None, description="Filter by region"),
@@ -107,7 +132,7 @@ async def list_counties(
         if region and county["region"].lower() != region.lower():
             continue
             
-        stats = get_mock_stats(county)
+        stats = get_county_stats(county)
         
         # Apply risk level filter
         if risk_level and stats["risk_level"] != risk_level.value:
@@ -129,7 +154,7 @@ async def get_county(county_id: str):
         if county["id"] == county_id or county["code"] == county_id:
             return {
                 **county,
-                "stats": get_mock_stats(county)
+                "stats": get_county_stats(county)
             }
     
     raise HTTPException(status_code=404, detail="County not found")
@@ -4,8 +4,10 @@ ML Prediction Routes
 API endpoints for machine learning predictions and model management
 """
 
+import asyncio
+import json
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from typing import List
 
 from supabase import Client
@@ -14,10 +16,16 @@ from app.models.training_data import (
     TrainingDataPoint,
     PredictionRequest,
     PredictionResponse,
+    BatchPredictionItem,
+    CountyPredictionRequest,
+    CountyFeatures,
+    DiseaseEnum,
     ModelTrainingRequest,
     ModelTrainingResponse,
+    TrainingJobRequest,
 )
-from app.services.ml_service import MLModelManager
+from app.services.ml_service import get_ml_manager
+from app.services.feature_store import get_feature_store
 from app.services.training_data_repository import TrainingDataRepository
 from app.core.responses import APIResponse, ListResponse
 
@@ -26,8 +34,32 @@ logger = logging.getLogger(__name__)
 # Initialize router
 router = APIRouter(tags=["Machine Learning"])
 
-# Global ML Model Manager instance
-ml_manager = MLModelManager()
+# Shared ML service client (one connection pool per process)
+ml_manager = get_ml_manager()
+
+
+def columnar_response(body: bytes, message: str) -> Response:
+    """
+    Standard APIResponse envelope around an already-serialized data body.
+    
+    The columnar payload from ml-service is spliced in as raw bytes, so a
+    large batch is never decoded and re-encoded by the backend.
+    """
+    envelope = APIResponse.success_response(message=message).model_dump(
+        mode="json", exclude={"data"}
+    )
+    head = json.dumps(envelope, separators=(",", ":"))[:-1].encode()
+    return Response(
+        content=head + b',"data":' + body + b"}",
+        media_type="application/json"
+    )
+
+
+def prediction_message(prediction: PredictionResponse) -> str:
+    message = f"Prediction successful: {prediction.risk_level.value} risk"
+    if prediction.fallback:
+        message += " (local fallback, ML service unavailable)"
+    return message
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -74,10 +106,10 @@ async def predict_outbreak(
         ```
     """
     try:
-        prediction = ml_manager.predict(request)
+        prediction = await ml_manager.predict(request)
         return APIResponse.success_response(
             data=prediction,
-            message=f"Prediction successful: {prediction.risk_level.value} risk"
+            message=prediction_message(prediction)
         )
     except Exception as e:
         logger.error(f"Prediction error: {e}")
@@ -89,30 +121,40 @@ async def predict_outbreak(
 
 @router.post(
     "/predict/batch",
-    response_model=APIResponse[List[PredictionResponse]],
+    response_model=APIResponse[List[BatchPredictionItem]],
     summary="Batch Prediction",
     description="Make predictions for multiple counties/diseases"
 )
 async def batch_predict(
     requests: List[PredictionRequest],
+    response_format: str = Query("rows", alias="format", pattern="^(rows|columnar)$"),
     db: Client = Depends(get_supabase_client)
-) -> APIResponse[List[PredictionResponse]]:
+) -> APIResponse[List[BatchPredictionItem]]:
     """
     Make batch predictions for multiple counties or diseases
     
     Args:
         requests: List of prediction requests
+        response_format: "rows" (one item per request) or "columnar"
+            (one array per field, passed through from ml-service;
+            all-or-nothing)
         db: Database client (injected)
         
     Returns:
-        List of prediction responses
+        One item per request, in order, with its prediction or its error
     """
     try:
-        predictions = [ml_manager.predict(req) for req in requests]
+        if response_format == "columnar":
+            columns = await ml_manager.predict_batch_columnar(requests)
+            return columnar_response(
+                columns, message=f"Generated {len(requests)} predictions"
+            )
+        items = await ml_manager.predict_batch_items(requests)
+        succeeded = sum(item.success for item in items)
         return APIResponse.list_response(
-            data=predictions,
-            count=len(predictions),
-            message=f"Generated {len(predictions)} predictions"
+            data=items,
+            count=len(items),
+            message=f"Generated {succeeded} of {len(items)} predictions"
         )
     except Exception as e:
         logger.error(f"Batch prediction error: {e}")
@@ -122,6 +164,77 @@ async def batch_predict(
         )
 
 
+@router.post(
+    "/predict/county",
+    response_model=APIResponse[PredictionResponse],
+    summary="Predict From County Features",
+    description="Predict for a county and disease using the latest stored features"
+)
+async def predict_for_county(
+    request: CountyPredictionRequest
+) -> APIResponse[PredictionResponse]:
+    """
+    Make a prediction naming only county and disease
+    
+    Features come from the county feature store (latest training_data
+    observations); any feature included in the request overrides it.
+    
+    Example:
+        ```json
+        {"county": "Kisumu", "disease": "Cholera", "rainfall": 180}
+        ```
+    """
+    store = get_feature_store()
+    # A refresh reads the database; keep it off the event loop
+    await asyncio.to_thread(store.ensure_fresh)
+    full_request = store.build_request(request)
+    if full_request is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No stored features for county: {request.county}"
+        )
+    try:
+        prediction = await ml_manager.predict(full_request)
+        return APIResponse.success_response(
+            data=prediction,
+            message=prediction_message(prediction)
+        )
+    except Exception as e:
+        logger.error(f"County prediction error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Prediction failed: {str(e)}"
+        )
+
+
+@router.get(
+    "/features/{county}",
+    response_model=APIResponse[CountyFeatures],
+    summary="Get County Features",
+    description="Latest stored prediction features for a county and disease"
+)
+async def get_county_features(
+    county: str,
+    disease: DiseaseEnum
+) -> APIResponse[CountyFeatures]:
+    """
+    Look up the features /predict/county would use
+    
+    `source` tells whether they come from the county and disease, the
+    county alone, or national medians.
+    """
+    store = get_feature_store()
+    # A refresh reads the database; keep it off the event loop
+    await asyncio.to_thread(store.ensure_fresh)
+    features = store.get(county, disease)
+    if features is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No stored features for county: {county}"
+        )
+    return APIResponse.success_response(data=features)
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # 🧠 Model Training Endpoints
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -139,7 +252,8 @@ async def train_model(
     """
     Train a new ML model using historical data
     
-    Fetches all training data from database and trains a Naive Bayes classifier.
+    Fetches all training data from database (or, with ML_TRAINING_DATA_SOURCE,
+    lets ml-service read it directly) and trains a Naive Bayes classifier.
     Can train a model for specific disease or all diseases combined.
     
     Args:
@@ -154,25 +268,31 @@ async def train_model(
         Consider running during off-peak hours.
     """
     try:
-        # Get training data from database
-        repo = TrainingDataRepository(db)
-        
-        if request.disease:
-            training_data = repo.get_by_disease(request.disease)
-        else:
-            training_data = repo.get_all()
-        
-        if not training_data:
-            raise ValueError(
-                f"No training data available for disease: {request.disease}"
-            )
+        # Get training data from database, unless ml-service reads it directly
+        training_data = None
+        if ml_manager.data_source is None:
+            repo = TrainingDataRepository(db)
+            
+            if request.disease:
+                training_data = repo.get_by_disease(request.disease)
+            else:
+                training_data = repo.get_all()
+            
+            if not training_data:
+                raise ValueError(
+                    f"No training data available for disease: {request.disease}"
+                )
         
         # Train model
-        result = ml_manager.train_model(
+        result = await ml_manager.train_model(
             training_data=training_data,
             disease=request.disease,
             test_size=request.test_size,
-            random_state=request.random_state
+            random_state=request.random_state,
+            cross_validation=request.cross_validation,
+            cv_folds=request.cv_folds,
+            county=request.county,
+            region=request.region
         )
         
         if result["success"]:
@@ -185,7 +305,8 @@ async def train_model(
                     training_samples=result["training_samples"],
                     training_timestamp=__import__("datetime").datetime.now(),
                     status="success",
-                    metrics=result["metrics"]
+                    metrics=result["metrics"],
+                    cross_validation=result.get("cross_validation")
                 ),
                 message=f"Model trained with {result['accuracy']:.1%} accuracy"
             )
@@ -200,6 +321,104 @@ async def train_model(
         )
 
 
+@router.post(
+    "/train/jobs",
+    response_model=APIResponse[dict],
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Queue Background Training",
+    description="Start an asynchronous training job on the ML service"
+)
+async def create_training_job(
+    request: TrainingJobRequest,
+    db: Client = Depends(get_supabase_client)
+) -> APIResponse[dict]:
+    """
+    Queue model training without waiting for it to finish
+    
+    The ML service fits models in a process pool while it keeps serving
+    predictions. With `train_all`, every disease model and the combined
+    model are trained in parallel.
+    
+    Args:
+        request: Training job parameters
+        db: Database client (injected)
+        
+    Returns:
+        Job descriptor with a job_id to poll via GET /train/jobs/{job_id}
+    """
+    try:
+        training_data = None
+        if ml_manager.data_source is None:
+            repo = TrainingDataRepository(db)
+            
+            if request.disease and not request.train_all:
+                training_data = repo.get_by_disease(request.disease)
+            else:
+                training_data = repo.get_all()
+            
+            if not training_data:
+                raise ValueError(
+                    f"No training data available for disease: {request.disease}"
+                )
+        
+        job = await ml_manager.submit_training_job(
+            training_data=training_data,
+            disease=request.disease,
+            train_all=request.train_all,
+            test_size=request.test_size,
+            random_state=request.random_state,
+            cross_validation=request.cross_validation,
+            cv_folds=request.cv_folds,
+            county=request.county,
+            region=request.region
+        )
+        return APIResponse.success_response(
+            data=job,
+            message=f"Training job {job['job_id']} queued"
+        )
+    except Exception as e:
+        logger.error(f"Training job error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Failed to queue training job: {str(e)}"
+        )
+
+
+@router.get(
+    "/train/jobs/{job_id}",
+    response_model=APIResponse[dict],
+    summary="Get Training Job",
+    description="Get progress and metrics of a background training job"
+)
+async def get_training_job(job_id: str) -> APIResponse[dict]:
+    """
+    Get training job progress
+    
+    Args:
+        job_id: ID returned by POST /train/jobs
+        
+    Returns:
+        Job status, per-model progress and training metrics
+    """
+    try:
+        job = await ml_manager.get_training_job(job_id)
+    except Exception as e:
+        logger.error(f"Error getting training job: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Failed to reach ML service"
+        )
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Training job {job_id} not found"
+        )
+    return APIResponse.success_response(
+        data=job,
+        message=f"Training job is {job['status']}"
+    )
+
+
 @router.get(
     "/model/status",
     response_model=APIResponse[dict],
@@ -214,9 +433,9 @@ async def get_model_status() -> APIResponse[dict]:
         Information about trained models including accuracy, training date, etc.
     """
     try:
-        status = ml_manager.get_model_status()
+        status = await ml_manager.get_model_status()
         return APIResponse.success_response(
-            data=status,
+            data={**status, "client": ml_manager.client_stats()},
             message="Model status retrieved successfully"
         )
     except Exception as e:
@@ -17,6 +17,7 @@ from app.models.prediction import (
     PredictionRequest,
     PredictionResponse
 )
+from app.services.risk_snapshot import get_risk_snapshots
 
 router = APIRouter()
 
@@ -179,6 +180,9 @@ async def generate_prediction(request: PredictionRequest):
     )
 
 
+SNAPSHOT_NOT_READY = "Risk snapshot has not been computed yet"
+
+
 @router.get("/national/summary")
 async def get_national_summary():
     """
@@ -187,27 +191,45 @@ async def get_national_summary():
     🎓 LEARNING: Aggregate Endpoints
     Sometimes you need to return aggregated data instead of
     individual records. This endpoint summarizes nationwide risk.
+    
+    Served from the precomputed risk snapshot (every county × disease,
+    rescored on a schedule). `stale` is set while the latest rescore has
+    failed and the previous snapshot is being served; 503 until the
+    background refresher has produced the first one.
     """
+    snapshots = get_risk_snapshots()
+    snapshot = snapshots.current
+    if snapshot is None:
+        raise HTTPException(status_code=503, detail=SNAPSHOT_NOT_READY)
+    return {**snapshot.summary, "stale": snapshots.stale}
+
+
+@router.get("/national/top-risks")
+async def get_top_risks(
+    limit: int = Query(10, ge=1, le=282, description="Number of county/disease pairs"),
+    disease: Optional[str] = Query(None, description="Only this disease")
+):
+    """Highest-risk county/disease pairs from the latest risk snapshot."""
+    snapshots = get_risk_snapshots()
+    if snapshots.current is None:
+        raise HTTPException(status_code=503, detail=SNAPSHOT_NOT_READY)
+    risks = snapshots.top_risks(limit, disease)
+    return {"data": risks, "count": len(risks), "stale": snapshots.stale}
+
+
+@router.get("/national/counties/{county_id}")
+async def get_county_risk(county_id: str):
+    """Every disease's risk for one county from the latest risk snapshot."""
+    snapshots = get_risk_snapshots()
+    snapshot = snapshots.current
+    if snapshot is None:
+        raise HTTPException(status_code=503, detail=SNAPSHOT_NOT_READY)
+    risks = snapshots.county_risk(county_id)
+    if risks is None:
+        raise HTTPException(status_code=404, detail="County not found")
     return {
-        "overall_risk": "medium",
-        "high_risk_counties": 5,
-        "counties_monitored": 47,
-        "active_outbreaks": 2,
-        "predictions_generated_today": 156,
-        "model_accuracy": 94.7,
-        "last_updated": datetime.utcnow().isoformat(),
-        "alerts": [
-            {
-                "county": "Kisumu",
-                "disease": "Cholera",
-                "risk_score": 85,
-                "message": "Elevated cholera risk due to recent flooding"
-            },
-            {
-                "county": "Mombasa",
-                "disease": "Dengue",
-                "risk_score": 72,
-                "message": "Seasonal dengue increase expected"
-            }
-        ]
+        "county_id": county_id,
+        "generated_at": snapshot.generated_at.isoformat(),
+        "stale": snapshots.stale,
+        "risks": risks,
     }
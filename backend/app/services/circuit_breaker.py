@@ -0,0 +1,81 @@
+"""
+Circuit Breaker
+
+Stops calling a dependency that keeps failing, so requests fail fast
+instead of each waiting out a timeout.
+
+    closed     calls go through; `failure_threshold` consecutive failures open it
+    open       calls are refused until `reset_seconds` have passed
+    half_open  one probe call is let through; success closes, failure reopens
+               (a probe that never reports back is replaced after `reset_seconds`)
+"""
+
+import time
+from typing import Callable, Dict
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency while its circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker with a single half-open probe
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_seconds: float,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._probe_at = None
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return CLOSED
+        if self.clock() - self.opened_at >= self.reset_seconds:
+            return HALF_OPEN
+        return OPEN
+
+    def allow(self) -> bool:
+        """Whether a call may go out now (claims the probe when half open)"""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and (
+            self._probe_at is None or self.clock() - self._probe_at >= self.reset_seconds
+        ):
+            self._probe_at = self.clock()
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probe_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probe_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = self.clock()
+        self._probe_at = None
+
+    def stats(self) -> Dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "rejected": self.rejected,
+        }
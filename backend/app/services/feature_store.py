@@ -0,0 +1,290 @@
+"""
+County Feature Store
+
+Keeps the latest environmental and health features per county in memory,
+so a prediction only needs a county and a disease. Built in one paged pass
+over training_data (latest by observation_date) plus disease_reports, and
+swapped in as a whole, so lookups are two dict reads and never touch the
+database. A case report newer than the training observation supplies
+previous_cases.
+
+Fallbacks, most specific first:
+    county_disease   latest observation for the county and disease
+    county           latest observation for the county (any disease), with
+                     the disease-specific fields taken from the national medians
+    national         per-feature median of every county's latest values
+"""
+
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from statistics import median
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.config import settings
+from app.models.training_data import (
+    FEATURE_COLUMNS,
+    CountyFeatures,
+    CountyPredictionRequest,
+    DiseaseEnum,
+    PredictionRequest,
+    TrainingDataPoint,
+)
+
+logger = logging.getLogger(__name__)
+
+# Specific to a disease in a county; every other feature is shared by the county
+DISEASE_FIELDS = ['previous_cases', 'vaccination_rate']
+COUNTY_FIELDS = [name for name in FEATURE_COLUMNS if name not in DISEASE_FIELDS]
+
+# disease_reports names diseases as the diseases table does
+REPORT_DISEASE_NAMES = {"Dengue Fever": DiseaseEnum.DENGUE}
+
+
+def county_key(county: str) -> str:
+    """'Homa Bay', 'homa-bay' and ' HOMA BAY ' share one key"""
+    return re.sub(r"[^a-z0-9]+", "-", county.lower()).strip("-")
+
+
+@dataclass(frozen=True)
+class CaseReport:
+    """Confirmed cases from one disease_reports row"""
+    county: str
+    disease: DiseaseEnum
+    reported_date: datetime
+    confirmed_cases: int
+
+
+@dataclass(frozen=True)
+class FeatureSnapshot:
+    """Immutable lookup tables from one refresh"""
+    by_county_disease: Dict[Tuple[str, DiseaseEnum], TrainingDataPoint] = field(default_factory=dict)
+    by_county: Dict[str, TrainingDataPoint] = field(default_factory=dict)
+    national: Dict[str, float] = field(default_factory=dict)
+    reports: Dict[Tuple[str, DiseaseEnum], CaseReport] = field(default_factory=dict)
+    rows: int = 0
+    refreshed_at: Optional[datetime] = None
+
+    @classmethod
+    def build(
+        cls,
+        rows: Iterable[TrainingDataPoint],
+        reports: Iterable[CaseReport] = ()
+    ) -> "FeatureSnapshot":
+        by_county_disease: Dict[Tuple[str, DiseaseEnum], TrainingDataPoint] = {}
+        by_county: Dict[str, TrainingDataPoint] = {}
+        count = 0
+        for row in rows:
+            count += 1
+            key = county_key(row.county)
+            pair = (key, DiseaseEnum(row.disease))
+            current = by_county_disease.get(pair)
+            if current is None or row.date >= current.date:
+                by_county_disease[pair] = row
+            current = by_county.get(key)
+            if current is None or row.date >= current.date:
+                by_county[key] = row
+
+        national = {}
+        if by_county_disease:
+            for name in COUNTY_FIELDS:
+                national[name] = median(getattr(r, name) for r in by_county.values())
+            for name in DISEASE_FIELDS:
+                national[name] = median(getattr(r, name) for r in by_county_disease.values())
+
+        latest_reports: Dict[Tuple[str, DiseaseEnum], CaseReport] = {}
+        for report in reports:
+            pair = (county_key(report.county), report.disease)
+            current = latest_reports.get(pair)
+            if current is None or report.reported_date >= current.reported_date:
+                latest_reports[pair] = report
+        return cls(
+            by_county_disease, by_county, national, latest_reports, count, datetime.now()
+        )
+
+
+def load_training_rows() -> Iterable[TrainingDataPoint]:
+    """Default loader: every training_data row via the shared database client"""
+    from app.database import supabase
+    from app.services.training_data_repository import TrainingDataRepository
+
+    if supabase is None:
+        raise RuntimeError("Database client is not configured")
+    return TrainingDataRepository(supabase).get_all()
+
+
+def load_case_reports() -> List[CaseReport]:
+    """Every disease_reports row, with county and disease names joined in"""
+    from app.database import SQLAlchemyPostgrestEmulator, supabase
+    from app.services.training_data_repository import iter_pages
+
+    if supabase is None:
+        raise RuntimeError("Database client is not configured")
+    if isinstance(supabase, SQLAlchemyPostgrestEmulator):
+        return []  # the local emulator only models training_data
+
+    reports = []
+    records = iter_pages(
+        lambda: supabase.table("disease_reports").select(
+            "id, reported_date, confirmed_cases, counties(name), diseases(name)"
+        ).order("id")
+    )
+    for record in records:
+        name = (record.get("diseases") or {}).get("name")
+        county = (record.get("counties") or {}).get("name")
+        disease = REPORT_DISEASE_NAMES.get(name) or next(
+            (d for d in DiseaseEnum if d.value == name), None
+        )
+        if disease is None or county is None:
+            continue  # a disease the models do not cover
+        reports.append(CaseReport(
+            county=county,
+            disease=disease,
+            reported_date=datetime.fromisoformat(record["reported_date"]),
+            confirmed_cases=record["confirmed_cases"],
+        ))
+    return reports
+
+
+class CountyFeatureStore:
+    """
+    In-memory latest features per county, refreshed in bulk
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Iterable[TrainingDataPoint]] = load_training_rows,
+        refresh_seconds: Optional[float] = None,
+        report_loader: Optional[Callable[[], Iterable[CaseReport]]] = None
+    ):
+        self.loader = loader
+        self.report_loader = report_loader
+        self.refresh_seconds = (
+            settings.FEATURE_STORE_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        )
+        self._snapshot = FeatureSnapshot()
+        self._refreshed_monotonic: Optional[float] = None
+        self._refresh_lock = threading.Lock()
+
+    def refresh(self, rows: Optional[Iterable[TrainingDataPoint]] = None) -> FeatureSnapshot:
+        """Rebuild every lookup table from `rows` (or the loaders) and swap it in"""
+        rows = self.loader() if rows is None else rows
+        reports: Iterable[CaseReport] = ()
+        if self.report_loader is not None:
+            try:
+                reports = self.report_loader()
+            except Exception as e:
+                logger.warning(f"Case reports unavailable, using training data only: {e}")
+        snapshot = FeatureSnapshot.build(rows, reports)
+        self._snapshot = snapshot
+        self._refreshed_monotonic = time.monotonic()
+        logger.info(
+            f"Feature store refreshed: {len(snapshot.by_county)} counties "
+            f"from {snapshot.rows} rows"
+        )
+        return snapshot
+
+    def is_stale(self) -> bool:
+        return (
+            self._refreshed_monotonic is None
+            or time.monotonic() - self._refreshed_monotonic >= self.refresh_seconds
+        )
+
+    def ensure_fresh(self) -> None:
+        """
+        Refresh when stale. Only one caller refreshes; the others keep
+        reading the current snapshot (or wait for the first one).
+        
+        A refresh reads the whole training_data table, so async callers
+        run this with asyncio.to_thread.
+        """
+        if not self.is_stale():
+            return
+        first_load = self._refreshed_monotonic is None
+        if not self._refresh_lock.acquire(blocking=first_load):
+            return
+        try:
+            if self.is_stale():
+                self.refresh()
+        except Exception as e:
+            logger.warning(f"Feature store refresh failed: {e}")
+            # Keep serving the old snapshot; retry after another interval
+            self._refreshed_monotonic = time.monotonic()
+        finally:
+            self._refresh_lock.release()
+
+    def get(self, county: str, disease: DiseaseEnum) -> Optional[CountyFeatures]:
+        """Latest features for a county and disease, or None if nothing is loaded"""
+        snapshot = self._snapshot
+        disease = DiseaseEnum(disease)
+        key = county_key(county)
+
+        report = snapshot.reports.get((key, disease))
+        row = snapshot.by_county_disease.get((key, disease))
+        if row is not None:
+            values = {name: getattr(row, name) for name in FEATURE_COLUMNS}
+            if report is not None and report.reported_date >= row.date:
+                values["previous_cases"] = report.confirmed_cases
+            return CountyFeatures(
+                county=county, disease=disease, source="county_disease",
+                observed_at=row.date, **values
+            )
+
+        row = snapshot.by_county.get(key)
+        if row is not None:
+            values = {name: getattr(row, name) for name in COUNTY_FIELDS}
+            values.update(self._national_values(snapshot, DISEASE_FIELDS))
+            if report is not None:
+                values["previous_cases"] = report.confirmed_cases
+            return CountyFeatures(
+                county=county, disease=disease, source="county", observed_at=row.date, **values
+            )
+
+        if snapshot.national:
+            values = self._national_values(snapshot, FEATURE_COLUMNS)
+            if report is not None:
+                values["previous_cases"] = report.confirmed_cases
+            return CountyFeatures(county=county, disease=disease, source="national", **values)
+        return None
+
+    @staticmethod
+    def _national_values(snapshot: FeatureSnapshot, names: Iterable[str]) -> Dict[str, float]:
+        values = {name: snapshot.national[name] for name in names}
+        if "previous_cases" in values:
+            values["previous_cases"] = int(round(values["previous_cases"]))
+        return values
+
+    def build_request(self, request: CountyPredictionRequest) -> Optional[PredictionRequest]:
+        """Full PredictionRequest from stored features plus the caller's overrides"""
+        features = self.get(request.county, request.disease)
+        if features is None:
+            return None
+        values = features.model_dump(include=set(FEATURE_COLUMNS))
+        values.update(request.model_dump(include=set(FEATURE_COLUMNS), exclude_none=True))
+        return PredictionRequest(county=request.county, disease=request.disease, **values)
+
+    def stats(self) -> Dict:
+        snapshot = self._snapshot
+        return {
+            "counties": len(snapshot.by_county),
+            "county_diseases": len(snapshot.by_county_disease),
+            "rows": snapshot.rows,
+            "case_reports": len(snapshot.reports),
+            "refreshed_at": snapshot.refreshed_at.isoformat() if snapshot.refreshed_at else None,
+            "refresh_seconds": self.refresh_seconds,
+        }
+
+
+# Singleton instance
+_feature_store: Optional[CountyFeatureStore] = None
+
+
+def get_feature_store() -> CountyFeatureStore:
+    """Get or create the feature store singleton"""
+    global _feature_store
+    if _feature_store is None:
+        _feature_store = CountyFeatureStore(report_loader=load_case_reports)
+    return _feature_store
@@ -0,0 +1,130 @@
+"""
+Local Fallback Scorer
+
+Keeps a copy of ml-service's per-disease and all-disease model parameters
+(GET /model/params), synced periodically and persisted to disk, and scores
+predictions in-process with them when ml-service is down or its circuit
+is open.
+
+Scoring mirrors ml-service's compiled Gaussian Naive Bayes kernel, risk
+bands, case multipliers and recommendation rules, so a fallback answer
+matches what ml-service would have returned from the same model.
+County and region shards are not synced; those requests fall back to the
+disease model (or the all-disease model). Responses are marked
+`fallback=True`.
+"""
+
+import json
+import logging
+import math
+import os
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.config import settings
+from app.models.training_data import DiseaseEnum, PredictionRequest, PredictionResponse
+
+logger = logging.getLogger(__name__)
+
+ALL_MODELS_KEY = "all"
+
+
+class LocalModelScorer:
+    """
+    In-process scoring from the last synced model parameters
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or settings.ML_FALLBACK_PARAMS_PATH)
+        self._params: Optional[Dict] = None
+
+    @property
+    def ready(self) -> bool:
+        return bool(self._params and self._params.get("models"))
+
+    @property
+    def generated_at(self) -> Optional[str]:
+        return self._params.get("generated_at") if self._params else None
+
+    def update(self, params: Dict) -> None:
+        """Swap in freshly synced parameters and persist them"""
+        self._params = params
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp_path.write_text(json.dumps(params))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not persist fallback model parameters: {e}")
+
+    def load(self) -> bool:
+        """Use the last persisted parameters until the first sync succeeds"""
+        try:
+            self._params = json.loads(self.path.read_text())
+            logger.info(f"Loaded fallback model parameters from {self.path}")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable fallback parameters {self.path}: {e}")
+        return self.ready
+
+    def score(self, request: PredictionRequest) -> PredictionResponse:
+        """Score one request locally; raises ValueError when no parameters are loaded"""
+        params = self._params
+        if not self.ready:
+            raise ValueError("No fallback model parameters available")
+        disease = DiseaseEnum(request.disease).value
+        model = params["models"].get(disease) or params["models"].get(ALL_MODELS_KEY)
+        if model is None:
+            raise ValueError(f"No fallback model for {disease}")
+
+        features = [float(getattr(request, name)) for name in params["feature_columns"]]
+        probability = _outbreak_probability(model, features)
+        band = bisect_right(params["risk_thresholds"], probability)
+        risk_level = params["risk_levels"][band]
+
+        return PredictionResponse(
+            county=request.county,
+            disease=request.disease,
+            risk_level=risk_level,
+            outbreak_probability=round(probability, 4),
+            confidence_score=round(max(probability, 1 - probability), 4),
+            predicted_cases=int(request.previous_cases * params["case_multipliers"][band]),
+            model_version=model["model_version"],
+            registry_version=model["version"],
+            recommendations=_recommendations(params, request, risk_level),
+            fallback=True,
+        )
+
+    def score_batch(self, requests: List[PredictionRequest]) -> List[PredictionResponse]:
+        return [self.score(request) for request in requests]
+
+
+def _outbreak_probability(model: Dict, features: List[float]) -> float:
+    """Positive-class probability from the scaler-folded GaussianNB kernel"""
+    jll = [
+        log_norm - 0.5 * sum(
+            (x - mean) ** 2 * inv_var for x, mean, inv_var in zip(features, theta, inv_vars)
+        )
+        for log_norm, theta, inv_vars in zip(model["log_norm"], model["theta"], model["inv_var"])
+    ]
+    classes = model["classes"]
+    if 1 not in classes:
+        return 0.0
+    best = max(jll)
+    likelihoods = [math.exp(j - best) for j in jll]
+    return likelihoods[classes.index(1)] / sum(likelihoods)
+
+
+def _recommendations(params: Dict, request: PredictionRequest, risk_level: str) -> List[str]:
+    """Same rules as ml-service: the level's list, then the conditional ones, up to 5"""
+    conditional = params["conditional_recommendations"]
+    recommendations = list(params["recommendations_by_level"][risk_level])
+    if request.temperature > 30 and request.disease == DiseaseEnum.MALARIA:
+        recommendations.append(conditional["mosquito_control"])
+    if request.humidity > 70 and request.rainfall > 100:
+        recommendations.append(conditional["water_quality"])
+    if request.vaccination_rate < 50:
+        recommendations.append(conditional["low_vaccination"])
+    return recommendations[:5]
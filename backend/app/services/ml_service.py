@@ -3,17 +3,34 @@ Machine Learning Services - Stateless Client Wrapper
 
 Delegates ML training, prediction, and status requests to the standalone 
 ml-service microservice via HTTP requests.
+
+All calls share one long-lived httpx.AsyncClient (keep-alive connection
+pool, bounded by ML_CLIENT_MAX_CONNECTIONS) and are awaited, so a slow
+ml-service call never blocks the event loop. The client is closed by the
+application lifespan.
+
+Prediction calls go through a circuit breaker. While ml-service is
+unreachable, failing with 5xx, or its circuit is open, predictions are
+scored in-process from synced model parameters (see
+app.services.local_scorer) in a worker thread and marked `fallback=True`.
 """
 
+import asyncio
 import httpx
 import logging
 from typing import Optional, Dict, List
 from app.config import settings
 from app.models.training_data import (
+    BatchPredictionItem,
     TrainingDataPoint,
     PredictionRequest,
     PredictionResponse,
 )
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.local_scorer import LocalModelScorer
+from app.services.prediction_coalescer import PredictionCoalescer
+from app.services.single_flight import SingleFlight, canonical_hash
+from app.services.training_stream import MEDIA_TYPE, aiter_training_frames
 
 logger = logging.getLogger(__name__)
 
@@ -23,17 +40,218 @@ class MLModelManager:
     Client proxy that manages the ML model lifecycle by making API calls to ml-service
     """
     
-    def __init__(self):
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
         """Initialize and configure ml-service URL"""
         self.ml_service_url = settings.ML_SERVICE_URL or "http://localhost:5000"
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        # Fail fast while ml-service is down; score locally instead
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.ML_BREAKER_FAILURE_THRESHOLD,
+            reset_seconds=settings.ML_BREAKER_RESET_SECONDS,
+        )
+        self.local_scorer = LocalModelScorer()
+        self._sync_task: Optional[asyncio.Task] = None
+        # Identical in-flight predictions share one upstream call
+        self.single_flight = SingleFlight()
+        # Concurrent single predictions go upstream as one batch call
+        self.coalescer: Optional[PredictionCoalescer] = None
+        if settings.ML_COALESCE_WINDOW_MS > 0:
+            self.coalescer = PredictionCoalescer(
+                send_batch=self._predict_batch_upstream,
+                send_one=self._predict_one,
+                window_seconds=settings.ML_COALESCE_WINDOW_MS / 1000,
+                max_rows=settings.ML_COALESCE_MAX_ROWS,
+                is_unavailable=self._is_unavailable,
+            )
         logger.info(f"MLModelManager configured to communicate with: {self.ml_service_url}")
     
-    def predict(self, prediction_request: PredictionRequest) -> PredictionResponse:
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared pooled client, created on first use inside the event loop"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.ml_service_url,
+                transport=self._transport,
+                limits=httpx.Limits(
+                    max_connections=settings.ML_CLIENT_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.ML_CLIENT_MAX_KEEPALIVE,
+                    keepalive_expiry=settings.ML_CLIENT_KEEPALIVE_SECONDS,
+                ),
+                timeout=self._timeout(settings.ML_PREDICT_TIMEOUT_SECONDS),
+            )
+        return self._client
+    
+    @staticmethod
+    def _timeout(seconds: float) -> httpx.Timeout:
+        """Per-operation timeout; connecting and waiting for a pooled connection fail fast"""
+        return httpx.Timeout(
+            seconds,
+            connect=settings.ML_CLIENT_CONNECT_TIMEOUT_SECONDS,
+            pool=settings.ML_CLIENT_CONNECT_TIMEOUT_SECONDS,
+        )
+    
+    async def aclose(self) -> None:
+        """Close pooled connections (application shutdown)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def _post_prediction(self, url: str, **kwargs) -> httpx.Response:
+        """POST a prediction call through the circuit breaker"""
+        if not self.breaker.allow():
+            raise CircuitOpenError("ML service circuit is open")
+        try:
+            response = await self.client.post(url, **kwargs)
+        except httpx.TransportError:
+            self.breaker.record_failure()
+            raise
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        response.raise_for_status()
+        return response
+    
+    @staticmethod
+    def _is_unavailable(error: Exception) -> bool:
+        """ml-service is down or failing, as opposed to rejecting the request"""
+        return isinstance(error, (CircuitOpenError, httpx.TransportError)) or (
+            isinstance(error, httpx.HTTPStatusError) and error.response.status_code >= 500
+        )
+    
+    def _can_fall_back(self, error: Exception) -> bool:
+        """Only an unavailable ml-service is scored locally, never a rejected request"""
+        return (
+            self._is_unavailable(error)
+            and settings.ML_FALLBACK_ENABLED
+            and self.local_scorer.ready
+        )
+    
+    # ═══════════════════════════════════════════════════════════════════════════
+    # Fallback parameter sync
+    # ═══════════════════════════════════════════════════════════════════════════
+    
+    async def sync_fallback_params(self) -> bool:
+        """Fetch the current model parameters from GET /model/params"""
+        try:
+            response = await self.client.get(
+                "/model/params", timeout=self._timeout(settings.ML_STATUS_TIMEOUT_SECONDS)
+            )
+            response.raise_for_status()
+            params = response.json()
+        except Exception as e:
+            logger.warning(f"Fallback model parameter sync failed: {e}")
+            return False
+        await asyncio.to_thread(self.local_scorer.update, params)
+        return True
+    
+    def start_fallback_sync(self, interval: float) -> None:
+        """Load persisted parameters, then resync every `interval` seconds (0 disables)"""
+        if not settings.ML_FALLBACK_ENABLED:
+            return
+        self.local_scorer.load()
+        if interval <= 0 or self._sync_task is not None:
+            return
+        
+        async def run() -> None:
+            while True:
+                await self.sync_fallback_params()
+                await asyncio.sleep(interval)
+        
+        self._sync_task = asyncio.get_running_loop().create_task(
+            run(), name="ml-fallback-sync"
+        )
+    
+    async def stop_fallback_sync(self) -> None:
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+    
+    def client_stats(self) -> Dict:
+        """Circuit, fallback and coalescing state of this proxy"""
+        return {
+            "circuit": self.breaker.stats(),
+            "fallback": {
+                "enabled": settings.ML_FALLBACK_ENABLED,
+                "ready": self.local_scorer.ready,
+                "params_generated_at": self.local_scorer.generated_at,
+            },
+            "coalescer": self.coalescer.stats() if self.coalescer else None,
+        }
+    
+    @property
+    def data_source(self) -> Optional[Dict]:
+        """
+        Where ml-service reads training rows itself, or None to relay rows
+        
+        With ML_TRAINING_DATA_SOURCE="database" or "parquet", training
+        requests carry only this reference and the backend never loads
+        the training set.
+        """
+        source = settings.ML_TRAINING_DATA_SOURCE
+        if source == "relay":
+            return None
+        reference = {"type": source}
+        if source == "parquet":
+            reference["path"] = settings.ML_TRAINING_PARQUET_PATH
+        return reference
+    
+    @staticmethod
+    def _serialize_training_data(training_data: List[TrainingDataPoint]) -> List[Dict]:
+        """Serialize TrainingDataPoint objects to JSON-ready dictionaries"""
+        serialized_data = []
+        for d in training_data:
+            record = d.dict()
+            # Ensure date structures serialize correctly into ISO strings
+            if record.get('date') and hasattr(record['date'], 'isoformat'):
+                record['date'] = record['date'].isoformat()
+            if record.get('created_at') and hasattr(record['created_at'], 'isoformat'):
+                record['created_at'] = record['created_at'].isoformat()
+            if record.get('updated_at') and hasattr(record['updated_at'], 'isoformat'):
+                record['updated_at'] = record['updated_at'].isoformat()
+            
+            # Convert DiseaseEnum to string
+            if record.get('disease'):
+                record['disease'] = d.disease.value
+            serialized_data.append(record)
+        return serialized_data
+    
+    async def predict(self, prediction_request: PredictionRequest) -> PredictionResponse:
+        """
+        Delegates prediction to standalone ml-service
+        
+        Identical requests already in flight share that call's result.
+        Distinct ones are coalesced with concurrent calls into one
+        POST /predict/batch unless ML_COALESCE_WINDOW_MS is 0. Scored
+        locally if ml-service is unavailable.
+        """
+        try:
+            return await self.single_flight.do(
+                canonical_hash(prediction_request.model_dump(mode="json")),
+                lambda: self._predict_upstream(prediction_request)
+            )
+        except Exception as e:
+            if not self._can_fall_back(e):
+                raise
+            logger.warning(f"ML service unavailable ({e}); scoring locally")
+            return await asyncio.to_thread(self.local_scorer.score, prediction_request)
+    
+    async def _predict_upstream(self, prediction_request: PredictionRequest) -> PredictionResponse:
+        if self.coalescer is None:
+            return await self._predict_one(prediction_request)
+        return await self.coalescer.submit(prediction_request)
+    
+    async def _predict_one(self, prediction_request: PredictionRequest) -> PredictionResponse:
         """
         Delegates prediction to standalone ml-service via POST /predict
         """
         try:
-            url = f"{self.ml_service_url}/predict"
+            url = "/predict"
             payload = prediction_request.dict()
             
             # Convert DiseaseEnum to standard string value for JSON serialization
@@ -42,60 +260,178 @@ class MLModelManager:
                 
             logger.info(f"Forwarding prediction request to ML microservice: {url}")
             
-            with httpx.Client(timeout=30.0) as client:
-                response = client.post(url, json=payload)
-                response.raise_for_status()
-                data = response.json()
-                
-                return PredictionResponse(**data)
+            response = await self._post_prediction(url, json=payload)
+            return PredictionResponse(**response.json())
                 
         except Exception as e:
             logger.error(f"ML prediction delegation failed: {e}")
             raise
     
-    def train_model(
+    async def predict_batch(
         self,
-        training_data: List[TrainingDataPoint],
+        prediction_requests: List[PredictionRequest]
+    ) -> List[PredictionResponse]:
+        """
+        Delegates batch prediction to ml-service, scoring locally if it is unavailable
+        """
+        try:
+            return await self._predict_batch_upstream(prediction_requests)
+        except Exception as e:
+            if not self._can_fall_back(e):
+                raise
+            logger.warning(f"ML service unavailable ({e}); scoring batch locally")
+            # Pure-Python scoring of every row; keep it off the event loop
+            return await asyncio.to_thread(self.local_scorer.score_batch, prediction_requests)
+    
+    async def predict_batch_items(
+        self,
+        prediction_requests: List[PredictionRequest]
+    ) -> List[BatchPredictionItem]:
+        """
+        Batch prediction with a result or an error for every row.
+        
+        Rows are split into chunks of ML_BATCH_CHUNK_ROWS, sent as
+        concurrent /predict/batch calls (at most ML_BATCH_MAX_CONCURRENCY
+        in flight), so a large batch takes about as long as its slowest
+        chunk. A chunk rejected by ml-service is retried row by row to
+        find the bad rows; a chunk that failed because ml-service is
+        unavailable reports that error on each of its rows.
+        """
+        chunk_rows = max(1, settings.ML_BATCH_CHUNK_ROWS)
+        semaphore = asyncio.Semaphore(max(1, settings.ML_BATCH_MAX_CONCURRENCY))
+        
+        async def bounded(call):
+            async with semaphore:
+                return await call
+        
+        async def run_chunk(chunk: List[PredictionRequest]) -> List:
+            try:
+                return await bounded(self.predict_batch(chunk))
+            except Exception as e:
+                if len(chunk) == 1 or self._is_unavailable(e):
+                    return [e] * len(chunk)
+            return await asyncio.gather(
+                *(bounded(self._predict_row(req)) for req in chunk),
+                return_exceptions=True
+            )
+        
+        chunks = [
+            prediction_requests[start:start + chunk_rows]
+            for start in range(0, len(prediction_requests), chunk_rows)
+        ]
+        results = [
+            result
+            for chunk_results in await asyncio.gather(*(run_chunk(c) for c in chunks))
+            for result in chunk_results
+        ]
+        return [
+            BatchPredictionItem(index=index, success=False, error=str(result))
+            if isinstance(result, Exception)
+            else BatchPredictionItem(index=index, success=True, prediction=result)
+            for index, result in enumerate(results)
+        ]
+    
+    async def _predict_row(self, prediction_request: PredictionRequest) -> PredictionResponse:
+        """One row on its own: /predict without coalescing, or the local fallback"""
+        try:
+            return await self._predict_one(prediction_request)
+        except Exception as e:
+            if not self._can_fall_back(e):
+                raise
+            return await asyncio.to_thread(self.local_scorer.score, prediction_request)
+    
+    async def _predict_batch_upstream(
+        self,
+        prediction_requests: List[PredictionRequest]
+    ) -> List[PredictionResponse]:
+        """
+        Delegates batch prediction to standalone ml-service via POST /predict/batch
+        """
+        try:
+            url = "/predict/batch"
+            payload = [req.dict() for req in prediction_requests]
+            for record, req in zip(payload, prediction_requests):
+                record["disease"] = req.disease.value
+            
+            logger.info(f"Forwarding batch of {len(payload)} predictions to ML microservice: {url}")
+            
+            response = await self._post_prediction(url, json=payload)
+            return [PredictionResponse(**item) for item in response.json()]
+                
+        except Exception as e:
+            logger.error(f"ML batch prediction delegation failed: {e}")
+            raise
+    
+    async def predict_batch_columnar(self, prediction_requests: List[PredictionRequest]) -> bytes:
+        """
+        Batch prediction in ml-service's columnar format (one array per field).
+        
+        Returns the response body as-is so it can be passed through to the
+        client without being parsed into per-row models and re-serialized.
+        """
+        try:
+            payload = [req.model_dump(mode="json") for req in prediction_requests]
+            response = await self._post_prediction(
+                "/predict/batch", params={"format": "columnar"}, json=payload
+            )
+            return response.content
+                
+        except Exception as e:
+            logger.error(f"ML columnar batch prediction delegation failed: {e}")
+            raise
+    
+    async def train_model(
+        self,
+        training_data: Optional[List[TrainingDataPoint]] = None,
         disease: Optional[str] = None,
         test_size: float = 0.2,
-        random_state: int = 42
+        random_state: int = 42,
+        cross_validation: bool = False,
+        cv_folds: Optional[int] = None,
+        county: Optional[str] = None,
+        region: Optional[str] = None
     ) -> Dict:
         """
-        Delegates model training to standalone ml-service via POST /train
+        Delegates model training to standalone ml-service
+        
+        Rows are streamed as binary columnar frames to POST /train/stream
+        (ML_TRAINING_UPLOAD_FORMAT="columnar"); frames carry each row's county,
+        so county/region scoped training streams too. Without training_data, ml-service reads rows from self.data_source.
         """
+        disease_value = disease.value if hasattr(disease, 'value') else disease
         try:
-            url = f"{self.ml_service_url}/train"
+            if training_data is None:
+                return await self._train_model_from_source(
+                    disease_value, test_size, random_state,
+                    cross_validation, cv_folds, county, region
+                )
             
-            # Serialize the TrainingDataPoint objects to dictionaries
-            serialized_data = []
-            for d in training_data:
-                record = d.dict()
-                # Ensure date structures serialize correctly into ISO strings
-                if record.get('date') and hasattr(record['date'], 'isoformat'):
-                    record['date'] = record['date'].isoformat()
-                if record.get('created_at') and hasattr(record['created_at'], 'isoformat'):
-                    record['created_at'] = record['created_at'].isoformat()
-                if record.get('updated_at') and hasattr(record['updated_at'], 'isoformat'):
-                    record['updated_at'] = record['updated_at'].isoformat()
-                
-                # Convert DiseaseEnum to string
-                if record.get('disease'):
-                    record['disease'] = d.disease.value
-                serialized_data.append(record)
+            if settings.ML_TRAINING_UPLOAD_FORMAT == "columnar":
+                return await self._train_model_streaming(
+                    training_data, disease_value, test_size, random_state,
+                    cross_validation, cv_folds, county, region
+                )
+            
+            url = "/train"
             
             payload = {
-                "training_data": serialized_data,
-                "disease": disease.value if hasattr(disease, 'value') else disease,
+                "training_data": self._serialize_training_data(training_data),
+                "disease": disease_value,
                 "test_size": test_size,
-                "random_state": random_state
+                "random_state": random_state,
+                "cross_validation": cross_validation,
+                "cv_folds": cv_folds,
+                "county": county,
+                "region": region
             }
             
             logger.info(f"Forwarding training request with {len(training_data)} samples to: {url}")
             
-            with httpx.Client(timeout=120.0) as client:
-                response = client.post(url, json=payload)
-                response.raise_for_status()
-                return response.json()
+            response = await self.client.post(
+                url, json=payload, timeout=self._timeout(settings.ML_TRAIN_TIMEOUT_SECONDS)
+            )
+            response.raise_for_status()
+            return response.json()
                 
         except Exception as e:
             logger.error(f"ML training delegation failed: {e}")
@@ -104,18 +440,158 @@ class MLModelManager:
                 "error": str(e)
             }
     
-    def get_model_status(self) -> Dict:
+    async def _train_model_from_source(
+        self,
+        disease: Optional[str],
+        test_size: float,
+        random_state: int,
+        cross_validation: bool,
+        cv_folds: Optional[int],
+        county: Optional[str],
+        region: Optional[str]
+    ) -> Dict:
+        """Asks ml-service to read training rows from the configured data source"""
+        if self.data_source is None:
+            raise ValueError("No training data given and ML_TRAINING_DATA_SOURCE is 'relay'")
+        url = "/train"
+        payload = {
+            "data_source": self.data_source,
+            "disease": disease,
+            "test_size": test_size,
+            "random_state": random_state,
+            "cross_validation": cross_validation,
+            "cv_folds": cv_folds,
+            "county": county,
+            "region": region
+        }
+        
+        logger.info(f"Requesting training from {self.data_source['type']} source at: {url}")
+        
+        response = await self.client.post(
+            url, json=payload, timeout=self._timeout(settings.ML_TRAIN_TIMEOUT_SECONDS)
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    async def _train_model_streaming(
+        self,
+        training_data: List[TrainingDataPoint],
+        disease: Optional[str],
+        test_size: float,
+        random_state: int,
+        cross_validation: bool,
+        cv_folds: Optional[int],
+        county: Optional[str] = None,
+        region: Optional[str] = None
+    ) -> Dict:
+        """Streams training rows to POST /train/stream in columnar chunks"""
+        url = "/train/stream"
+        params = {
+            "disease": disease,
+            "test_size": test_size,
+            "random_state": random_state,
+            "cross_validation": cross_validation,
+            "cv_folds": cv_folds,
+            "county": county,
+            "region": region,
+        }
+        params = {k: v for k, v in params.items() if v is not None}
+        
+        logger.info(f"Streaming {len(training_data)} training samples to: {url}")
+        
+        response = await self.client.post(
+            url,
+            params=params,
+            # A generator body is sent with chunked transfer encoding; frames
+            # are encoded in worker threads, off the event loop
+            content=aiter_training_frames(
+                training_data, settings.ML_TRAINING_UPLOAD_CHUNK_ROWS
+            ),
+            headers={"Content-Type": MEDIA_TYPE},
+            timeout=self._timeout(settings.ML_TRAIN_TIMEOUT_SECONDS),
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    async def submit_training_job(
+        self,
+        training_data: Optional[List[TrainingDataPoint]] = None,
+        disease: Optional[str] = None,
+        train_all: bool = False,
+        test_size: float = 0.2,
+        random_state: int = 42,
+        cross_validation: bool = False,
+        cv_folds: Optional[int] = None,
+        county: Optional[str] = None,
+        region: Optional[str] = None
+    ) -> Dict:
+        """
+        Queues background training on ml-service via POST /train/jobs
+        
+        Returns as soon as the job is accepted; poll get_training_job for progress.
+        Without training_data, the job reads rows from self.data_source.
+        """
+        try:
+            url = "/train/jobs"
+            if training_data is None:
+                if self.data_source is None:
+                    raise ValueError("No training data given and ML_TRAINING_DATA_SOURCE is 'relay'")
+                data = {"data_source": self.data_source}
+            else:
+                data = {"training_data": self._serialize_training_data(training_data)}
+            payload = {
+                **data,
+                "disease": disease.value if hasattr(disease, 'value') else disease,
+                "train_all": train_all,
+                "test_size": test_size,
+                "random_state": random_state,
+                "cross_validation": cross_validation,
+                "cv_folds": cv_folds,
+                "county": county,
+                "region": region
+            }
+            
+            logger.info(f"Queueing training job at: {url}")
+            
+            response = await self.client.post(url, json=payload)
+            response.raise_for_status()
+            return response.json()
+                
+        except Exception as e:
+            logger.error(f"ML training job submission failed: {e}")
+            raise
+    
+    async def get_training_job(self, job_id: str) -> Optional[Dict]:
+        """
+        Retrieves training job progress from ml-service via GET /train/jobs/{job_id}
+        """
+        try:
+            response = await self.client.get(
+                f"/train/jobs/{job_id}",
+                timeout=self._timeout(settings.ML_STATUS_TIMEOUT_SECONDS)
+            )
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()
+            return response.json()
+                
+        except Exception as e:
+            logger.error(f"Failed to retrieve training job {job_id}: {e}")
+            raise
+    
+    async def get_model_status(self) -> Dict:
         """
         Retrieves ML model statuses from standalone ml-service via GET /model/status
         """
         try:
-            url = f"{self.ml_service_url}/model/status"
+            url = "/model/status"
             logger.info(f"Retrieving model status from ML microservice: {url}")
             
-            with httpx.Client(timeout=10.0) as client:
-                response = client.get(url)
-                response.raise_for_status()
-                return response.json()
+            response = await self.client.get(
+                url, timeout=self._timeout(settings.ML_STATUS_TIMEOUT_SECONDS)
+            )
+            response.raise_for_status()
+            return response.json()
                 
         except Exception as e:
             logger.error(f"Failed to retrieve ML status: {e}")
@@ -124,3 +600,15 @@ class MLModelManager:
                 "last_update": None,
                 "error": str(e)
             }
+
+
+# Singleton instance
+_ml_manager: Optional[MLModelManager] = None
+
+
+def get_ml_manager() -> MLModelManager:
+    """Get or create the ML client singleton (one connection pool per process)"""
+    global _ml_manager
+    if _ml_manager is None:
+        _ml_manager = MLModelManager()
+    return _ml_manager
@@ -0,0 +1,117 @@
+"""
+Prediction Coalescer
+
+Concurrent single-row predictions are collected for a short window (or
+until a row limit) and sent to ml-service as one /predict/batch call; each
+caller awaits its own row of the batch result. Under dashboard load this
+turns hundreds of round-trips into a handful, and ml-service scores the
+rows in one vectorized pass.
+
+A window that closes with a single request sends it to /predict as
+before, so a quiet system sees no difference beyond the window delay. If
+the batch call is rejected, each row is retried on its own, so one bad row
+fails only its own caller. If it failed because ml-service is unavailable
+(`is_unavailable`), every caller in it gets the same exception instead of
+a burst of doomed retries.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional, Set, Tuple
+
+from app.models.training_data import PredictionRequest, PredictionResponse
+
+logger = logging.getLogger(__name__)
+
+SendBatch = Callable[[List[PredictionRequest]], Awaitable[List[PredictionResponse]]]
+SendOne = Callable[[PredictionRequest], Awaitable[PredictionResponse]]
+
+
+class PredictionCoalescer:
+    """
+    Micro-batches concurrent predict calls on the running event loop
+    """
+
+    def __init__(
+        self,
+        send_batch: SendBatch,
+        send_one: SendOne,
+        window_seconds: float,
+        max_rows: int,
+        is_unavailable: Callable[[Exception], bool] = lambda error: False
+    ):
+        self.send_batch = send_batch
+        self.send_one = send_one
+        self.is_unavailable = is_unavailable
+        self.window_seconds = window_seconds
+        self.max_rows = max(1, max_rows)
+        self._pending: List[Tuple[PredictionRequest, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # The loop only keeps weak references to tasks; hold them until done
+        self._dispatching: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.rows = 0
+        self.retried_batches = 0
+
+    async def submit(self, request: PredictionRequest) -> PredictionResponse:
+        """Queue one request and wait for its row of the next batch"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((request, future))
+        if len(self._pending) >= self.max_rows:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+            self._dispatching.add(task)
+            task.add_done_callback(self._dispatching.discard)
+
+    async def _dispatch(self, batch: List[Tuple[PredictionRequest, asyncio.Future]]) -> None:
+        requests = [request for request, _ in batch]
+        self.batches += 1
+        self.rows += len(requests)
+        try:
+            if len(requests) == 1:
+                responses = [await self.send_one(requests[0])]
+            else:
+                responses = await self.send_batch(requests)
+            if len(responses) != len(requests):
+                raise ValueError(
+                    f"ML service returned {len(responses)} predictions for {len(requests)} rows"
+                )
+        except Exception as e:
+            if len(batch) == 1 or self.is_unavailable(e):
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            logger.warning(f"Coalesced batch of {len(batch)} failed ({e}); retrying rows")
+            responses = await asyncio.gather(
+                *(self.send_one(request) for request in requests), return_exceptions=True
+            )
+            self.retried_batches += 1
+        for (_, future), response in zip(batch, responses):
+            if future.done():  # the caller may have been cancelled
+                continue
+            if isinstance(response, Exception):
+                future.set_exception(response)
+            else:
+                future.set_result(response)
+
+    def stats(self) -> dict:
+        return {
+            "window_seconds": self.window_seconds,
+            "max_rows": self.max_rows,
+            "batches": self.batches,
+            "rows": self.rows,
+            "retried_batches": self.retried_batches,
+            "mean_batch_rows": round(self.rows / self.batches, 2) if self.batches else 0.0,
+        }
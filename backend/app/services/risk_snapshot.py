@@ -0,0 +1,317 @@
+"""
+Nationwide Risk Snapshot
+
+Scores every county × disease pair in one /predict/batch call on a
+schedule and keeps the result as an immutable snapshot, in memory and on
+disk. The national summary, top-risk lists and per-county risk are
+precomputed when the snapshot is built, so dashboard reads are dict
+lookups and never trigger model inference.
+
+Rescoring runs as an asyncio task on the application's event loop, since it
+shares the ML service client's connection pool. A failed rescore is retried
+with a short, doubling backoff; until one succeeds the previous snapshot is
+served and flagged stale. Until the first snapshot exists (computed or
+loaded from disk) the dashboard endpoints answer 503; reads never score.
+
+Risk levels come from the predictions themselves, so the bands live only
+in ml-service (and the local fallback that mirrors it). Pairs scored by the
+backend's local fallback are flagged and counted in the summary.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.models.training_data import (
+    CountyPredictionRequest,
+    DiseaseEnum,
+    PredictionResponse,
+    RiskLevelEnum,
+)
+from app.routers.counties import KENYA_COUNTIES
+from app.services.feature_store import CountyFeatureStore, get_feature_store
+from app.services.ml_service import MLModelManager, get_ml_manager
+
+logger = logging.getLogger(__name__)
+
+HIGH_RISK_LEVELS = {RiskLevelEnum.HIGH.value, RiskLevelEnum.CRITICAL.value}
+
+
+@dataclass(frozen=True)
+class RiskSnapshot:
+    """One scoring pass over every county and disease, with its derived views"""
+    generated_at: datetime
+    entries: Tuple[dict, ...]               # every pair, highest probability first
+    by_county: Dict[str, Tuple[dict, ...]]  # county id -> its entries, highest first
+    summary: dict                           # national summary, precomputed
+
+    @classmethod
+    def build(
+        cls,
+        entries: List[dict],
+        generated_at: datetime,
+        model_accuracy: Optional[float] = None
+    ) -> "RiskSnapshot":
+        ranked = sorted(entries, key=lambda e: e["outbreak_probability"], reverse=True)
+        by_county: Dict[str, List[dict]] = {}
+        for entry in ranked:
+            by_county.setdefault(entry["county_id"], []).append(entry)
+
+        high_risk_counties = {e["county_id"] for e in ranked if e["risk_level"] in HIGH_RISK_LEVELS}
+        summary = {
+            "overall_risk": _overall_risk(ranked),
+            "high_risk_counties": len(high_risk_counties),
+            "counties_monitored": len(by_county),
+            "critical_pairs": sum(
+                1 for e in ranked if e["risk_level"] == RiskLevelEnum.CRITICAL.value
+            ),
+            "pairs_scored": len(ranked),
+            "fallback_pairs": sum(1 for e in ranked if e.get("fallback")),
+            "model_accuracy": model_accuracy,
+            "last_updated": generated_at.isoformat(),
+            "alerts": [
+                {
+                    "county": e["county_name"],
+                    "disease": e["disease"],
+                    "risk_score": round(e["outbreak_probability"] * 100),
+                    "message": f"{e['risk_level'].capitalize()} {e['disease']} risk predicted",
+                }
+                for e in ranked[:5] if e["risk_level"] in HIGH_RISK_LEVELS
+            ],
+        }
+        return cls(
+            generated_at=generated_at,
+            entries=tuple(ranked),
+            by_county={k: tuple(v) for k, v in by_county.items()},
+            summary=summary,
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "generated_at": self.generated_at.isoformat(),
+            "model_accuracy": self.summary["model_accuracy"],
+            "entries": list(self.entries),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RiskSnapshot":
+        return cls.build(
+            data["entries"],
+            datetime.fromisoformat(data["generated_at"]),
+            data.get("model_accuracy"),
+        )
+
+
+def _overall_risk(ranked: List[dict]) -> str:
+    """Risk level of the median pair, as its prediction reported it"""
+    if not ranked:
+        return RiskLevelEnum.LOW.value
+    # Levels rise with probability, so the median of the ranking is the median level
+    return ranked[len(ranked) // 2]["risk_level"]
+
+
+class RiskSnapshotService:
+    """
+    Computes, persists and serves the current RiskSnapshot
+    """
+
+    def __init__(
+        self,
+        ml_manager: Optional[MLModelManager] = None,
+        feature_store: Optional[CountyFeatureStore] = None,
+        path: Optional[str] = None
+    ):
+        self.ml_manager = ml_manager or get_ml_manager()
+        self.feature_store = feature_store
+        self.path = Path(path or settings.RISK_SNAPSHOT_PATH)
+        self._snapshot: Optional[RiskSnapshot] = None
+        self._compute_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def current(self) -> Optional[RiskSnapshot]:
+        return self._snapshot
+
+    @property
+    def stale(self) -> bool:
+        """The latest rescore failed, or the snapshot missed two scheduled rescores"""
+        snapshot = self._snapshot
+        if snapshot is None or self.last_error is not None:
+            return True
+        interval = settings.RISK_SNAPSHOT_INTERVAL_SECONDS
+        age = (datetime.now() - snapshot.generated_at).total_seconds()
+        return interval > 0 and age > 2 * interval
+
+    async def compute(self) -> RiskSnapshot:
+        """Score every county × disease in one batch call and swap the snapshot in"""
+        try:
+            snapshot = await self._compute()
+        except Exception as e:
+            self.last_error = str(e)
+            raise
+        self.last_error = None
+        return snapshot
+
+    async def _compute(self) -> RiskSnapshot:
+        async with self._compute_lock:
+            store = self.feature_store or get_feature_store()
+            # A feature refresh reads the database; keep it off the event loop
+            await asyncio.to_thread(store.ensure_fresh)
+
+            pairs, requests = [], []
+            for county in KENYA_COUNTIES:
+                for disease in DiseaseEnum:
+                    request = store.build_request(
+                        CountyPredictionRequest(county=county["name"], disease=disease)
+                    )
+                    if request is not None:
+                        pairs.append((county, store.get(county["name"], disease).source))
+                        requests.append(request)
+            if not requests:
+                raise ValueError("No county features available to score")
+
+            predictions = await self.ml_manager.predict_batch(requests)
+            entries = [
+                _entry(county, source, prediction)
+                for (county, source), prediction in zip(pairs, predictions)
+            ]
+            snapshot = RiskSnapshot.build(
+                entries, datetime.now(), await self._model_accuracy(predictions)
+            )
+            await asyncio.to_thread(self._persist, snapshot)
+            self._snapshot = snapshot
+            logger.info(f"Risk snapshot computed: {len(entries)} county/disease pairs")
+            return snapshot
+
+    async def _model_accuracy(self, predictions: List[PredictionResponse]) -> Optional[float]:
+        """Mean accuracy of the model versions behind this snapshot, as a percentage"""
+        # model_version is a display label; the registry version is what
+        # /model/status reports per model
+        versions = {p.registry_version for p in predictions if p.registry_version}
+        models = (await self.ml_manager.get_model_status()).get("models", {})
+        accuracies = [
+            m["accuracy"] for m in models.values()
+            if m.get("version") in versions and m.get("accuracy") is not None
+        ]
+        return round(100 * sum(accuracies) / len(accuracies), 1) if accuracies else None
+
+    def _persist(self, snapshot: RiskSnapshot) -> None:
+        """Write atomically so a reader never sees a half-written file"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp_path.write_text(json.dumps(snapshot.to_dict()))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not persist risk snapshot: {e}")
+
+    def load(self) -> Optional[RiskSnapshot]:
+        """Serve the last persisted snapshot until the first compute finishes"""
+        try:
+            self._snapshot = RiskSnapshot.from_dict(json.loads(self.path.read_text()))
+            logger.info(f"Loaded risk snapshot from {self.path}")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable risk snapshot {self.path}: {e}")
+        return self._snapshot
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # Serving (no inference)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def national_summary(self) -> Optional[dict]:
+        snapshot = self._snapshot
+        return snapshot.summary if snapshot else None
+
+    def top_risks(self, limit: int = 10, disease: Optional[str] = None) -> Optional[List[dict]]:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        if disease is None:
+            return list(snapshot.entries[:limit])
+        return [e for e in snapshot.entries if e["disease"] == disease][:limit]
+
+    def county_risk(self, county_id: str) -> Optional[List[dict]]:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        entries = snapshot.by_county.get(county_id)
+        return list(entries) if entries is not None else None
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # Scheduling
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def start(self, interval: float) -> None:
+        """Recompute every `interval` seconds in a background task (0 disables)"""
+        if interval <= 0 or self._task is not None:
+            return
+        self._task = asyncio.get_running_loop().create_task(
+            self._run(interval), name="risk-snapshot"
+        )
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, interval: float) -> None:
+        failures = 0
+        while True:
+            try:
+                await self.compute()
+                failures = 0
+                delay = interval
+            except Exception as e:
+                failures += 1
+                delay = retry_delay(failures, interval)
+                logger.warning(
+                    f"Risk snapshot computation failed ({e}); retrying in {delay:.0f}s"
+                )
+            await asyncio.sleep(delay)
+
+
+def retry_delay(failures: int, interval: float) -> float:
+    """Doubling backoff after consecutive failures, capped by the settings and the interval"""
+    delay = settings.RISK_SNAPSHOT_RETRY_SECONDS * 2 ** (failures - 1)
+    return min(delay, settings.RISK_SNAPSHOT_RETRY_MAX_SECONDS, interval)
+
+
+def _entry(county: dict, feature_source: str, prediction: PredictionResponse) -> dict:
+    return {
+        "county_id": county["id"],
+        "county_name": county["name"],
+        "region": county["region"],
+        "disease": prediction.disease.value,
+        "risk_level": prediction.risk_level.value,
+        "outbreak_probability": prediction.outbreak_probability,
+        "confidence_score": prediction.confidence_score,
+        "predicted_cases": prediction.predicted_cases,
+        "model_version": prediction.model_version,
+        "feature_source": feature_source,
+        "fallback": prediction.fallback,
+    }
+
+
+# Singleton instance
+_risk_snapshots: Optional[RiskSnapshotService] = None
+
+
+def get_risk_snapshots() -> RiskSnapshotService:
+    """Get or create the risk snapshot service singleton"""
+    global _risk_snapshots
+    if _risk_snapshots is None:
+        _risk_snapshots = RiskSnapshotService()
+    return _risk_snapshots
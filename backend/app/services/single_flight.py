@@ -0,0 +1,48 @@
+"""
+Single-Flight Calls
+
+Identical concurrent calls share one execution: the first caller for a key
+starts the work, later callers with the same key await the same result
+(or exception) until it completes. Nothing is cached afterwards; the next
+call for the key starts fresh.
+"""
+
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+def canonical_hash(payload: Any) -> str:
+    """sha256 of the payload as JSON with sorted keys and no whitespace"""
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class SingleFlight:
+    """
+    Deduplicates in-flight coroutines by key on the running event loop
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """Await call(), or the already running call for the same key"""
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(call())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.shared += 1
+        # One caller giving up (cancelled) must not cancel the shared call
+        return await asyncio.shield(task)
+
+    def __len__(self) -> int:
+        return len(self._inflight)
@@ -5,7 +5,7 @@ Manages CRUD operations for training data in Supabase
 """
 
 import logging
-from typing import List, Optional
+from typing import Any, Callable, Iterator, List, Optional
 from datetime import datetime
 from supabase import Client
 
@@ -13,6 +13,25 @@ from app.models.training_data import TrainingDataPoint, DiseaseEnum
 
 logger = logging.getLogger(__name__)
 
+# PostgREST returns at most this many rows per request by default
+PAGE_ROWS = 1000
+
+
+def iter_pages(build_query: Callable[[], Any], page_rows: int = PAGE_ROWS) -> Iterator[dict]:
+    """
+    Every row of a select, fetched one range at a time.
+    
+    `build_query` returns a fresh select ordered by a unique column, so no
+    row is skipped or repeated between pages.
+    """
+    start = 0
+    while True:
+        response = build_query().range(start, start + page_rows - 1).execute()
+        yield from response.data
+        if len(response.data) < page_rows:
+            return
+        start += page_rows
+
 
 class TrainingDataRepository:
     """Repository for training data operations"""
@@ -64,14 +83,19 @@ class TrainingDataRepository:
             raise
     
     def get_all(self) -> List[TrainingDataPoint]:
-        """Get all training data"""
+        """Get all training data, one page of PAGE_ROWS at a time"""
         try:
-            response = self.db.table(self.table_name).select("*").execute()
-            return [TrainingDataPoint(**r) for r in response.data]
+            return [TrainingDataPoint(**r) for r in self.iter_records()]
         except Exception as e:
             logger.error(f"Error fetching training data: {e}")
             raise
     
+    def iter_records(self, page_rows: int = PAGE_ROWS) -> Iterator[dict]:
+        """Every raw row, paged by id"""
+        return iter_pages(
+            lambda: self.db.table(self.table_name).select("*").order("id"), page_rows
+        )
+    
     def get_by_disease(self, disease: DiseaseEnum) -> List[TrainingDataPoint]:
         """Get training data for specific disease"""
         try:
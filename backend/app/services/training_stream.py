@@ -0,0 +1,88 @@
+"""
+Binary Training Data Upload - Columnar Frame Encoder
+
+Encodes TrainingDataPoint rows into the length-prefixed .npz frame stream
+that ml-service accepts on POST /train/stream. Rows are converted one chunk
+at a time straight into NumPy arrays, so a million-row retrain never builds
+a JSON document (or a list of dicts) in memory. aiter_training_frames
+encodes each chunk in a worker thread for use on the event loop.
+
+Frame layout (must match ml-service app/columnar_stream.py):
+    8-byte little-endian payload length, then an uncompressed .npz with
+    features (n, 8) float64, labels (n,) bool, disease_codes (n,) int8,
+    diseases (k,) str naming the codes and counties (n,) str, which lets
+    ml-service train county and region models from the stream.
+"""
+
+import asyncio
+import io
+import struct
+from itertools import chain, islice
+from operator import attrgetter
+from typing import AsyncIterator, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from app.models.training_data import FEATURE_COLUMNS, DiseaseEnum, TrainingDataPoint
+
+MEDIA_TYPE = "application/vnd.epipredict.columns+npz"
+FRAME_HEADER = struct.Struct("<Q")
+DEFAULT_CHUNK_ROWS = 50_000
+
+DISEASE_NAMES = [disease.value for disease in DiseaseEnum]
+DISEASE_CODES = {disease: code for code, disease in enumerate(DiseaseEnum)}
+
+
+def encode_chunk(points: List[TrainingDataPoint]) -> bytes:
+    """Encode one chunk of rows as a length-prefixed frame"""
+    n_rows = len(points)
+    features = np.fromiter(
+        chain.from_iterable(map(attrgetter(*FEATURE_COLUMNS), points)),
+        dtype=np.float64,
+        count=n_rows * len(FEATURE_COLUMNS),
+    ).reshape(n_rows, len(FEATURE_COLUMNS))
+    labels = np.fromiter(map(attrgetter("outbreak_occurred"), points), dtype=bool, count=n_rows)
+    disease_codes = np.fromiter(
+        (DISEASE_CODES[DiseaseEnum(p.disease)] for p in points), dtype=np.int8, count=n_rows
+    )
+
+    buffer = io.BytesIO()
+    np.savez(
+        buffer,
+        features=features,
+        labels=labels,
+        disease_codes=disease_codes,
+        diseases=np.array(DISEASE_NAMES, dtype=str),
+        counties=np.array([p.county for p in points], dtype=str),
+    )
+    payload = buffer.getvalue()
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+def _next_frame(rows: Iterator[TrainingDataPoint], chunk_rows: int) -> Optional[bytes]:
+    """The next chunk of `rows` as a frame, or None when they are exhausted"""
+    chunk = list(islice(rows, chunk_rows))
+    return encode_chunk(chunk) if chunk else None
+
+
+def iter_training_frames(
+    training_data: Iterable[TrainingDataPoint],
+    chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> Iterator[bytes]:
+    """Yield frames lazily; suitable as a streaming httpx request body"""
+    rows = iter(training_data)
+    while (frame := _next_frame(rows, chunk_rows)) is not None:
+        yield frame
+
+
+async def aiter_training_frames(
+    training_data: Iterable[TrainingDataPoint],
+    chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> AsyncIterator[bytes]:
+    """
+    Async iter_training_frames: each chunk is built and encoded in a worker
+    thread, so the event loop keeps serving requests during the upload
+    """
+    rows = iter(training_data)
+    while (frame := await asyncio.to_thread(_next_frame, rows, chunk_rows)) is not None:
+        yield frame
@@ -0,0 +1,267 @@
+"""
+Tests for the County Feature Store
+===================================
+Latest-observation lookups, fallbacks, refresh behaviour, and the
+county + disease prediction endpoint.
+"""
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.training_data import (
+    CountyPredictionRequest,
+    DiseaseEnum,
+    PredictionResponse,
+    TrainingDataPoint,
+)
+from app.routers import ml as ml_router
+from app.services import feature_store as feature_store_module
+from app.services.feature_store import CountyFeatureStore
+
+
+def make_row(county, disease, day, **overrides):
+    fields = dict(
+        county=county,
+        disease=disease,
+        temperature=20.0 + day,
+        humidity=60.0,
+        rainfall=100.0,
+        population_density=500.0,
+        access_to_water=70.0,
+        healthcare_coverage=60.0,
+        previous_cases=10 * day,
+        vaccination_rate=50.0,
+        outbreak_occurred=False,
+        date=datetime(2026, 1, day),
+    )
+    fields.update(overrides)
+    return TrainingDataPoint(**fields)
+
+
+ROWS = [
+    make_row("Kisumu", "Cholera", 3),
+    make_row("Kisumu", "Cholera", 9, rainfall=180.0),
+    make_row("Kisumu", "Malaria", 12, previous_cases=400),
+    make_row("Homa Bay", "Malaria", 5, temperature=30.0),
+]
+
+
+@pytest.fixture
+def store():
+    store = CountyFeatureStore(loader=lambda: ROWS, refresh_seconds=3600)
+    store.refresh()
+    return store
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Store Tests
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestCountyFeatureStore:
+    """Lookups against one bulk-refreshed snapshot."""
+
+    def test_latest_observation_for_county_and_disease(self, store):
+        features = store.get("kisumu", DiseaseEnum.CHOLERA)
+        assert features.source == "county_disease"
+        assert features.rainfall == 180.0 and features.previous_cases == 90
+        assert features.observed_at == datetime(2026, 1, 9)
+
+    def test_falls_back_to_county_then_national(self, store):
+        county = store.get("HOMA-BAY", DiseaseEnum.CHOLERA)
+        assert county.source == "county"
+        assert county.temperature == 30.0 and county.previous_cases == 90
+
+        national = store.get("Turkana", DiseaseEnum.FLU)
+        assert national.source == "national"
+        assert national.temperature == 31.0  # median of Kisumu (32) and Homa Bay (30)
+
+    def test_county_fallback_uses_national_disease_medians(self):
+        store = CountyFeatureStore(loader=lambda: [
+            make_row("Kisumu", "Cholera", 3, vaccination_rate=60.0),
+            make_row("Kisumu", "Malaria", 12, previous_cases=400, vaccination_rate=70.0),
+            make_row("Homa Bay", "Malaria", 5, vaccination_rate=80.0),
+        ])
+        store.refresh()
+
+        features = store.get("Homa Bay", DiseaseEnum.CHOLERA)
+        assert features.source == "county"
+        assert features.temperature == 25.0  # the county's own latest observation
+        assert features.previous_cases == 50  # median of 30, 400 and 50
+        assert features.vaccination_rate == 70.0  # median of 60, 70 and 80
+
+    def test_empty_store_has_no_features(self):
+        assert CountyFeatureStore(loader=lambda: []).get("Kisumu", DiseaseEnum.FLU) is None
+
+    def test_build_request_applies_overrides(self, store):
+        request = store.build_request(
+            CountyPredictionRequest(county="Kisumu", disease="Malaria", humidity=90)
+        )
+        assert request.previous_cases == 400
+        assert request.humidity == 90
+
+    def test_ensure_fresh_reloads_only_when_stale(self):
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return ROWS
+
+        store = CountyFeatureStore(loader=loader, refresh_seconds=3600)
+        store.ensure_fresh()
+        store.ensure_fresh()
+        assert len(calls) == 1
+        assert store.stats()["counties"] == 2
+
+    def test_failed_refresh_keeps_previous_snapshot(self, store):
+        def broken():
+            raise RuntimeError("database down")
+
+        store.loader = broken
+        store.refresh_seconds = 0
+        store.ensure_fresh()
+        assert store.get("Kisumu", DiseaseEnum.CHOLERA).source == "county_disease"
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Database Loader Tests
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class FakeQuery:
+    """Just enough of a PostgREST select to page through one table"""
+
+    def __init__(self, client, rows):
+        self.client = client
+        self.rows = rows
+        self.bounds = None
+
+    def select(self, columns):
+        return self
+
+    def order(self, column, desc=False):
+        self.rows = sorted(self.rows, key=lambda r: r[column], reverse=desc)
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end)
+        return self
+
+    def execute(self):
+        self.client.pages += 1
+        start, end = self.bounds or (0, 999)
+        data = self.rows[start:min(end + 1, start + 1000)]  # PostgREST caps at 1000
+        return type("Response", (), {"data": data})()
+
+
+class FakeClient:
+    def __init__(self, tables):
+        self.tables = tables
+        self.pages = 0
+
+    def table(self, name):
+        return FakeQuery(self, self.tables[name])
+
+
+def db_row(i, county, disease, day, previous_cases):
+    return {
+        "id": i, "county": county, "disease": disease,
+        "temperature": 25.0, "humidity": 60.0, "rainfall": 100.0,
+        "population_density": 500.0, "access_to_water": 70.0,
+        "healthcare_coverage": 60.0, "previous_cases": previous_cases,
+        "vaccination_rate": 50.0, "outbreak_occurred": False,
+        "observation_date": f"2026-01-{day:02d}T00:00:00",
+    }
+
+
+class TestDatabaseLoaders:
+    """DB-shaped rows through the real loaders."""
+
+    def test_pages_past_the_row_cap_and_keeps_latest_observation(self, monkeypatch):
+        # 2500 older Kisumu cholera rows, with the newest one on the last page
+        rows = [db_row(i, "Kisumu", "Cholera", 1 + i % 20, i) for i in range(2500)]
+        rows.append(db_row(2500, "Kisumu", "Cholera", 28, 7))
+        client = FakeClient({"training_data": rows})
+        monkeypatch.setattr("app.database.supabase", client)
+
+        store = CountyFeatureStore(loader=feature_store_module.load_training_rows)
+        store.refresh()
+
+        assert client.pages == 3 and store.stats()["rows"] == 2501
+        features = store.get("Kisumu", DiseaseEnum.CHOLERA)
+        assert features.previous_cases == 7
+        assert features.observed_at == datetime(2026, 1, 28)
+
+    def test_newer_case_reports_supply_previous_cases(self, monkeypatch):
+        client = FakeClient({
+            "training_data": [db_row(1, "Kisumu", "Malaria", 10, 40)],
+            "disease_reports": [
+                {"id": "a", "reported_date": "2026-01-05", "confirmed_cases": 12,
+                 "counties": {"name": "Kisumu"}, "diseases": {"name": "Malaria"}},
+                {"id": "b", "reported_date": "2026-01-20", "confirmed_cases": 95,
+                 "counties": {"name": "Kisumu"}, "diseases": {"name": "Malaria"}},
+                {"id": "c", "reported_date": "2026-01-15", "confirmed_cases": 30,
+                 "counties": {"name": "Kisumu"}, "diseases": {"name": "Dengue Fever"}},
+                {"id": "d", "reported_date": "2026-01-15", "confirmed_cases": 3,
+                 "counties": {"name": "Kisumu"}, "diseases": {"name": "Measles"}},
+            ],
+        })
+        monkeypatch.setattr("app.database.supabase", client)
+
+        store = CountyFeatureStore(
+            loader=feature_store_module.load_training_rows,
+            report_loader=feature_store_module.load_case_reports,
+        )
+        store.refresh()
+
+        assert store.stats()["case_reports"] == 2
+        assert store.get("Kisumu", DiseaseEnum.MALARIA).previous_cases == 95
+        assert store.get("Kisumu", DiseaseEnum.DENGUE).previous_cases == 30
+
+    def test_report_failure_keeps_training_features(self):
+        def broken():
+            raise RuntimeError("disease_reports unavailable")
+
+        store = CountyFeatureStore(loader=lambda: ROWS, report_loader=broken)
+        store.refresh()
+        assert store.get("Kisumu", DiseaseEnum.MALARIA).previous_cases == 400
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Endpoint Tests
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestCountyPredictionEndpoint:
+    """POST /api/v1/ml/predict/county needs only county and disease."""
+
+    def test_predict_with_county_and_disease_only(self, store, monkeypatch):
+        sent = []
+
+        async def fake_predict(request):
+            sent.append(request)
+            return PredictionResponse(
+                county=request.county, disease=request.disease, risk_level="high",
+                outbreak_probability=0.8, confidence_score=0.9, model_version="v1"
+            )
+
+        monkeypatch.setattr(feature_store_module, "_feature_store", store)
+        monkeypatch.setattr(ml_router.ml_manager, "predict", fake_predict)
+        client = TestClient(app)
+
+        response = client.post(
+            "/api/v1/ml/predict/county", json={"county": "Kisumu", "disease": "Cholera"}
+        )
+        assert response.status_code == 200
+        assert response.json()["data"]["risk_level"] == "high"
+        assert sent[0].rainfall == 180.0
+
+        features = client.get("/api/v1/ml/features/Kisumu", params={"disease": "Malaria"})
+        assert features.json()["data"]["previous_cases"] == 400
+
+    def test_unknown_county_without_data_is_404(self, monkeypatch):
+        empty = CountyFeatureStore(loader=lambda: [], refresh_seconds=3600)
+        monkeypatch.setattr(feature_store_module, "_feature_store", empty)
+        response = TestClient(app).post(
+            "/api/v1/ml/predict/county", json={"county": "Lamu", "disease": "Flu"}
+        )
+        assert response.status_code == 404
@@ -0,0 +1,660 @@
+"""
+Tests for the ml-service Client Proxy
+======================================
+Covers how the backend ships requests to ml-service: the pooled async
+client, the binary training upload stream, its JSON fallback, direct
+data-source references, and the circuit breaker with local scoring.
+"""
+import asyncio
+import io
+import json
+import threading
+import time
+
+import httpx
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.models.training_data import PredictionRequest, TrainingDataPoint
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from app.services.local_scorer import LocalModelScorer
+from app.services.ml_service import MLModelManager
+from app.services.single_flight import SingleFlight, canonical_hash
+from app.services.training_stream import (
+    DISEASE_NAMES,
+    FEATURE_COLUMNS,
+    FRAME_HEADER,
+    MEDIA_TYPE,
+    aiter_training_frames,
+    iter_training_frames,
+)
+
+
+def make_point(i: int, disease: str = "Malaria") -> TrainingDataPoint:
+    return TrainingDataPoint(
+        county="Kisumu",
+        disease=disease,
+        temperature=20 + i % 10,
+        humidity=60,
+        rainfall=100 + i,
+        population_density=500,
+        access_to_water=70,
+        healthcare_coverage=60,
+        previous_cases=i,
+        vaccination_rate=50,
+        outbreak_occurred=i % 2 == 0,
+    )
+
+
+def split_frames(body: bytes) -> list:
+    frames = []
+    offset = 0
+    while offset < len(body):
+        (length,) = FRAME_HEADER.unpack_from(body, offset)
+        offset += FRAME_HEADER.size
+        with np.load(io.BytesIO(body[offset:offset + length]), allow_pickle=False) as frame:
+            frames.append({name: frame[name] for name in frame.files})
+        offset += length
+    return frames
+
+
+def make_request(county: str = "Kisumu") -> PredictionRequest:
+    return PredictionRequest(
+        county=county, disease="Malaria", temperature=29, humidity=78, rainfall=140,
+        population_density=1200, access_to_water=55, healthcare_coverage=60,
+        previous_cases=150, vaccination_rate=40,
+    )
+
+
+def prediction_json(request: httpx.Request):
+    """ml-service's answer to /predict (one object) or /predict/batch (a list)"""
+    body = json.loads(request.read())
+    rows = body if isinstance(body, list) else [body]
+    predictions = [
+        {
+            "county": row["county"], "disease": row["disease"], "risk_level": "high",
+            "outbreak_probability": 0.7, "confidence_score": 0.7, "model_version": "v1",
+        }
+        for row in rows
+    ]
+    return predictions if isinstance(body, list) else predictions[0]
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+@pytest.fixture
+def captured():
+    """Requests sent by the `manager` fixture, as (request, body) pairs"""
+    return []
+
+
+@pytest.fixture
+def manager(captured):
+    """A proxy whose pooled client talks to a MockTransport"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        captured.append((request, request.read()))
+        return httpx.Response(200, json={"success": True})
+
+    return MLModelManager(transport=httpx.MockTransport(handler))
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Pooled Async Client
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestAsyncClient:
+    """One long-lived AsyncClient, awaited by every call."""
+
+    def test_calls_share_one_client(self, manager, captured):
+        async def calls():
+            await manager.get_model_status()
+            client = manager.client
+            await manager.get_training_job("job-1")
+            assert manager.client is client
+            await manager.aclose()
+            assert manager._client is None
+
+        run(calls())
+        assert [r.url.path for r, _ in captured] == ["/model/status", "/train/jobs/job-1"]
+        assert captured[0][0].url.host == "ml-service"
+
+    def test_per_operation_timeouts(self, manager, captured, monkeypatch):
+        monkeypatch.setattr(settings, "ML_TRAIN_TIMEOUT_SECONDS", 99.0)
+        monkeypatch.setattr(settings, "ML_STATUS_TIMEOUT_SECONDS", 3.0)
+        run(manager.train_model([make_point(0)], county="Kisumu"))
+        run(manager.get_model_status())
+
+        train, status = (r.extensions["timeout"] for r, _ in captured)
+        assert train["read"] == 99.0 and status["read"] == 3.0
+        assert train["connect"] == settings.ML_CLIENT_CONNECT_TIMEOUT_SECONDS
+
+    def test_slow_calls_overlap(self, monkeypatch):
+        monkeypatch.setattr(settings, "ML_COALESCE_WINDOW_MS", 0)
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(0.2)
+            return httpx.Response(200, json=prediction_json(request))
+
+        manager = MLModelManager(transport=httpx.MockTransport(handler))
+
+        async def concurrent():
+            return await asyncio.gather(*(manager.predict(make_request()) for _ in range(5)))
+
+        started = time.perf_counter()
+        results = run(concurrent())
+        assert time.perf_counter() - started < 0.6  # not 5 × 0.2s
+        assert [r.risk_level.value for r in results] == ["high"] * 5
+
+    def test_chat_status_reports_loaded_models(self, monkeypatch):
+        from fastapi.testclient import TestClient
+        from app.main import app
+        from app.routers import chat as chat_router
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/model/status":
+                return httpx.Response(200, json={"models": {"all": {"version": "v1"}}})
+            return httpx.Response(404)
+
+        monkeypatch.setattr(
+            chat_router, "ml_manager", MLModelManager(transport=httpx.MockTransport(handler))
+        )
+        class OfflineOllama:
+            model = "llama3"
+
+            async def check_availability(self):
+                return False
+
+        monkeypatch.setattr(chat_router, "get_ollama_service", OfflineOllama)
+        response = TestClient(app).get("/api/v1/chat/chat/status")
+        assert response.status_code == 200
+        assert response.json()["ml_models_loaded"] is True
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Prediction Coalescing
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestCoalescing:
+    """Concurrent predict() calls share /predict/batch round-trips."""
+
+    @pytest.fixture
+    def upstream(self, monkeypatch):
+        monkeypatch.setattr(settings, "ML_COALESCE_WINDOW_MS", 20)
+        monkeypatch.setattr(settings, "ML_COALESCE_MAX_ROWS", 4)
+        sent = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            sent.append(request)
+            if request.url.path == "/predict/batch" and "fail" in request.read().decode():
+                return httpx.Response(503)
+            if "reject" in request.read().decode():
+                return httpx.Response(422, json={"detail": "invalid row"})
+            return httpx.Response(200, json=prediction_json(request))
+
+        return sent, MLModelManager(transport=httpx.MockTransport(handler))
+
+    def test_concurrent_calls_become_batches(self, upstream):
+        sent, manager = upstream
+        counties = [f"County {i}" for i in range(10)]
+
+        async def concurrent():
+            return await asyncio.gather(*(manager.predict(make_request(c)) for c in counties))
+
+        results = run(concurrent())
+        assert [r.county for r in results] == counties
+        assert [len(json.loads(r.read())) for r in sent] == [4, 4, 2]
+        assert {r.url.path for r in sent} == {"/predict/batch"}
+        assert manager.coalescer.stats()["rows"] == 10
+        assert not manager.coalescer._dispatching  # dispatch tasks are released when done
+
+    def test_lone_request_uses_single_endpoint(self, upstream):
+        sent, manager = upstream
+        assert run(manager.predict(make_request())).county == "Kisumu"
+        assert [r.url.path for r in sent] == ["/predict"]
+
+    def test_batch_failure_reaches_every_caller(self, upstream):
+        _, manager = upstream
+
+        async def concurrent():
+            calls = (manager.predict(make_request(c)) for c in ["fail", "Siaya"])
+            return await asyncio.gather(*calls, return_exceptions=True)
+
+        results = run(concurrent())
+        assert all(isinstance(r, httpx.HTTPStatusError) for r in results)
+
+    def test_rejected_batch_is_retried_row_by_row(self, upstream):
+        sent, manager = upstream
+
+        async def concurrent():
+            calls = (manager.predict(make_request(c)) for c in ["reject", "Siaya", "Kisumu"])
+            return await asyncio.gather(*calls, return_exceptions=True)
+
+        rejected, siaya, kisumu = run(concurrent())
+        assert isinstance(rejected, httpx.HTTPStatusError)
+        assert (siaya.county, kisumu.county) == ("Siaya", "Kisumu")
+        assert [r.url.path for r in sent] == ["/predict/batch"] + ["/predict"] * 3
+        assert manager.coalescer.stats()["retried_batches"] == 1
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Single-Flight Deduplication
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestSingleFlight:
+    """Identical in-flight predictions make one upstream call."""
+
+    def test_identical_requests_share_one_call(self, monkeypatch):
+        monkeypatch.setattr(settings, "ML_COALESCE_WINDOW_MS", 0)
+        sent = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            sent.append(request)
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json=prediction_json(request))
+
+        manager = MLModelManager(transport=httpx.MockTransport(handler))
+        same = [make_request("Kisumu") for _ in range(20)]
+        # Same values spelled differently hash the same
+        same.append(PredictionRequest(**{**make_request("Kisumu").model_dump(), "temperature": 29}))
+
+        async def herd():
+            return await asyncio.gather(*(manager.predict(r) for r in same + [make_request("Siaya")]))
+
+        results = run(herd())
+        assert len(sent) == 2
+        assert results[0] is results[20]
+        assert results[-1].county == "Siaya"
+        assert len(manager.single_flight) == 0
+
+        run(manager.predict(make_request("Kisumu")))  # finished calls are not cached
+        assert len(sent) == 3
+
+    def test_cancelled_caller_does_not_cancel_the_shared_call(self):
+        async def scenario():
+            flight = SingleFlight()
+            gate = asyncio.Event()
+
+            async def call():
+                await gate.wait()
+                return "done"
+
+            first = asyncio.ensure_future(flight.do("k", call))
+            second = asyncio.ensure_future(flight.do("k", call))
+            await asyncio.sleep(0)
+            first.cancel()
+            gate.set()
+            return await second, flight.calls, flight.shared
+
+        assert run(scenario()) == ("done", 1, 1)
+
+    def test_canonical_hash_ignores_key_order(self):
+        assert canonical_hash({"a": 1, "b": [2.0]}) == canonical_hash({"b": [2.0], "a": 1})
+        assert canonical_hash({"a": 1}) != canonical_hash({"a": 2})
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Circuit Breaker & Local Fallback
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# A one-feature model: temperature near 30 is an outbreak, near 20 is not
+FALLBACK_PARAMS = {
+    "generated_at": "2026-01-01T00:00:00",
+    "feature_columns": ["temperature"],
+    "risk_thresholds": [0.4, 0.6, 0.8],
+    "risk_levels": ["low", "medium", "high", "critical"],
+    "case_multipliers": [0.8, 1.2, 1.8, 2.5],
+    "recommendations_by_level": {
+        "low": ["Monitor"], "medium": ["Prepare"], "high": ["Deploy"], "critical": ["Intervene"],
+    },
+    "conditional_recommendations": {
+        "mosquito_control": "Mosquitoes", "water_quality": "Water", "low_vaccination": "Vaccinate",
+    },
+    "models": {
+        "all": {
+            "version": "v20260101_000000_000000", "model_version": "NaiveBayes_2026-01-01",
+            "classes": [0, 1],
+            "theta": [[20.0], [30.0]], "inv_var": [[0.25], [0.25]], "log_norm": [0.0, 0.0],
+        },
+    },
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestCircuitBreaker:
+    """Predictions fail fast while ml-service is down and are scored locally."""
+
+    @pytest.fixture
+    def upstream(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(settings, "ML_COALESCE_WINDOW_MS", 0)
+        monkeypatch.setattr(settings, "ML_BREAKER_FAILURE_THRESHOLD", 2)
+        monkeypatch.setattr(settings, "ML_FALLBACK_PARAMS_PATH", str(tmp_path / "params.json"))
+        sent = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            sent.append(request)
+            if request.url.path == "/model/params":
+                return httpx.Response(200, json=FALLBACK_PARAMS)
+            raise httpx.ConnectError("connection refused", request=request)
+
+        return sent, MLModelManager(transport=httpx.MockTransport(handler))
+
+    def test_breaker_state_transitions(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10, clock=clock)
+        breaker.record_failure()
+        assert breaker.state == CLOSED and breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == OPEN and not breaker.allow()
+
+        clock.now = 10
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow() and not breaker.allow()  # a single probe
+        breaker.record_failure()
+        assert breaker.state == OPEN
+
+        clock.now = 20
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CLOSED and breaker.stats()["rejected"] == 2
+
+    def test_unreachable_service_is_scored_locally(self, upstream):
+        _, manager = upstream
+        assert run(manager.sync_fallback_params())
+
+        prediction = run(manager.predict(make_request()))
+        assert prediction.fallback
+        assert prediction.model_version == "NaiveBayes_2026-01-01"
+        assert prediction.registry_version == "v20260101_000000_000000"
+        assert prediction.risk_level.value == "critical"
+        assert prediction.predicted_cases == int(150 * 2.5)
+        assert prediction.recommendations == ["Intervene", "Water", "Vaccinate"]
+
+        persisted = LocalModelScorer(settings.ML_FALLBACK_PARAMS_PATH)
+        assert persisted.load()
+        rescored = persisted.score(make_request())
+        assert rescored.model_dump(exclude={"created_at"}) == prediction.model_dump(
+            exclude={"created_at"}
+        )
+
+    def test_open_circuit_skips_upstream(self, upstream):
+        sent, manager = upstream
+        run(manager.sync_fallback_params())
+        results = [run(manager.predict(make_request(f"County {i}"))) for i in range(5)]
+
+        assert all(r.fallback for r in results)
+        assert [r.url.path for r in sent] == ["/model/params", "/predict", "/predict"]
+        assert manager.client_stats()["circuit"]["state"] == OPEN
+        assert manager.breaker.rejected == 3
+
+    def test_batch_falls_back(self, upstream):
+        _, manager = upstream
+        run(manager.sync_fallback_params())
+        scoring_threads = []
+        score_batch = manager.local_scorer.score_batch
+
+        def recording_score_batch(requests):
+            scoring_threads.append(threading.current_thread())
+            return score_batch(requests)
+
+        manager.local_scorer.score_batch = recording_score_batch
+        results = run(manager.predict_batch([make_request("Kisumu"), make_request("Siaya")]))
+        assert [(r.county, r.fallback) for r in results] == [("Kisumu", True), ("Siaya", True)]
+        assert scoring_threads and threading.main_thread() not in scoring_threads
+
+    def test_no_parameters_means_no_fallback(self, upstream):
+        _, manager = upstream
+        with pytest.raises(httpx.ConnectError):
+            run(manager.predict(make_request()))
+
+    def test_client_errors_are_not_masked(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(settings, "ML_COALESCE_WINDOW_MS", 0)
+        manager = MLModelManager(
+            transport=httpx.MockTransport(lambda request: httpx.Response(422))
+        )
+        manager.local_scorer = LocalModelScorer(str(tmp_path / "params.json"))
+        manager.local_scorer.update(FALLBACK_PARAMS)
+        with pytest.raises(httpx.HTTPStatusError):
+            run(manager.predict(make_request()))
+        assert manager.breaker.state == CLOSED
+
+    def test_synced_parameters_survive_restart(self, upstream):
+        _, manager = upstream
+        run(manager.sync_fallback_params())
+
+        restarted = MLModelManager(
+            transport=httpx.MockTransport(lambda request: httpx.Response(503))
+        )
+        assert not restarted.local_scorer.ready
+
+        async def start_and_stop():
+            restarted.start_fallback_sync(0)
+            await restarted.stop_fallback_sync()
+
+        run(start_and_stop())
+        assert restarted.local_scorer.generated_at == FALLBACK_PARAMS["generated_at"]
+        assert run(restarted.predict(make_request())).fallback
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Batch Fan-Out
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestBatchFanOut:
+    """Batches are sent as concurrent chunks and report every row on its own."""
+
+    @pytest.fixture
+    def upstream(self, monkeypatch):
+        monkeypatch.setattr(settings, "ML_BATCH_CHUNK_ROWS", 2)
+        monkeypatch.setattr(settings, "ML_BATCH_MAX_CONCURRENCY", 3)
+        sent = []
+        in_flight = [0, 0]  # current, peak
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            sent.append(request)
+            body = request.read().decode()
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+            await asyncio.sleep(0.1)
+            in_flight[0] -= 1
+            if "down" in body:
+                return httpx.Response(503)
+            if "bad" in body:
+                return httpx.Response(422, json={"detail": "bad row"})
+            return httpx.Response(200, json=prediction_json(request))
+
+        return sent, in_flight, MLModelManager(transport=httpx.MockTransport(handler))
+
+    def test_chunks_run_concurrently(self, upstream):
+        sent, in_flight, manager = upstream
+        counties = [f"County {i}" for i in range(6)]
+
+        started = time.perf_counter()
+        items = run(manager.predict_batch_items([make_request(c) for c in counties]))
+        assert time.perf_counter() - started < 0.25  # one round-trip, not three
+        assert [item.prediction.county for item in items] == counties
+        assert [item.index for item in items] == list(range(6))
+        assert [len(json.loads(r.read())) for r in sent] == [2, 2, 2]
+        assert in_flight[1] == 3
+
+    def test_concurrency_is_bounded(self, upstream):
+        sent, in_flight, manager = upstream
+        items = run(manager.predict_batch_items([make_request(f"C{i}") for i in range(12)]))
+        assert all(item.success for item in items)
+        assert len(sent) == 6 and in_flight[1] == 3
+
+    def test_rejected_chunk_is_retried_row_by_row(self, upstream):
+        sent, _, manager = upstream
+        items = run(manager.predict_batch_items(
+            [make_request(c) for c in ["Kisumu", "bad", "Siaya"]]
+        ))
+        assert [item.success for item in items] == [True, False, True]
+        assert "422" in items[1].error and items[1].prediction is None
+        assert sorted(r.url.path for r in sent) == [
+            "/predict", "/predict", "/predict/batch", "/predict/batch"
+        ]
+
+    def test_unavailable_chunk_fails_its_rows(self, upstream):
+        sent, _, manager = upstream
+        items = run(manager.predict_batch_items(
+            [make_request(c) for c in ["Kisumu", "down", "Siaya"]]
+        ))
+        assert [item.success for item in items] == [False, False, True]
+        assert all("503" in item.error for item in items[:2])
+        assert {r.url.path for r in sent} == {"/predict/batch"}
+
+    def test_endpoint_returns_items(self, upstream, monkeypatch):
+        from fastapi.testclient import TestClient
+        from app.database import get_supabase_client
+        from app.main import app
+        from app.routers import ml as ml_router
+
+        _, _, manager = upstream
+        monkeypatch.setattr(ml_router, "ml_manager", manager)
+        monkeypatch.setitem(app.dependency_overrides, get_supabase_client, lambda: None)
+        response = TestClient(app).post(
+            "/api/v1/ml/predict/batch",
+            json=[make_request(c).model_dump(mode="json") for c in ["Kisumu", "bad", "Siaya"]],
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["message"] == "Generated 2 of 3 predictions"
+        assert [item["success"] for item in body["data"]] == [True, False, True]
+        assert body["data"][2]["prediction"]["county"] == "Siaya"
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Binary Training Upload
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestTrainingStream:
+    """Columnar frames sent to POST /train/stream."""
+
+    def test_frames_are_chunked_columns(self):
+        points = [make_point(i, "Cholera" if i % 3 else "Malaria") for i in range(5)]
+        frames = split_frames(b"".join(iter_training_frames(points, chunk_rows=2)))
+
+        assert [len(f["labels"]) for f in frames] == [2, 2, 1]
+        assert frames[0]["features"].shape == (2, len(FEATURE_COLUMNS))
+        assert list(frames[0]["diseases"]) == DISEASE_NAMES
+
+        features = np.concatenate([f["features"] for f in frames])
+        codes = np.concatenate([f["disease_codes"] for f in frames])
+        assert features[:, FEATURE_COLUMNS.index("previous_cases")].tolist() == [0, 1, 2, 3, 4]
+        assert [DISEASE_NAMES[c] for c in codes] == [p.disease.value for p in points]
+
+    def test_async_frames_are_encoded_off_the_event_loop(self, monkeypatch):
+        from app.services import training_stream
+
+        points = [make_point(i) for i in range(5)]
+        encoding_threads = []
+        encode_chunk = training_stream.encode_chunk
+
+        def recording_encode(chunk):
+            encoding_threads.append(threading.current_thread())
+            return encode_chunk(chunk)
+
+        monkeypatch.setattr(training_stream, "encode_chunk", recording_encode)
+
+        async def collect():
+            return [frame async for frame in aiter_training_frames(points, chunk_rows=2)]
+
+        frames = run(collect())
+        assert b"".join(frames) == b"".join(iter_training_frames(points, chunk_rows=2))
+        assert len(encoding_threads) == 6  # 3 async frames, then 3 sync ones
+        assert threading.main_thread() not in encoding_threads[:3]
+
+    def test_train_model_streams_frames(self, manager, captured):
+        points = [make_point(i) for i in range(3)]
+        result = run(manager.train_model(points, disease="Malaria", cv_folds=None))
+
+        assert result == {"success": True}
+        request, body = captured[0]
+        assert request.url.path == "/train/stream"
+        assert request.headers["content-type"] == MEDIA_TYPE
+        assert request.url.params["disease"] == "Malaria"
+        assert "cv_folds" not in request.url.params
+        assert sum(len(f["labels"]) for f in split_frames(body)) == 3
+
+    def test_scoped_training_streams_counties(self, manager, captured):
+        run(manager.train_model([make_point(0), make_point(1)], county="Kisumu"))
+
+        request, body = captured[0]
+        assert request.url.path == "/train/stream"
+        assert request.url.params["county"] == "Kisumu"
+        assert list(split_frames(body)[0]["counties"]) == ["Kisumu", "Kisumu"]
+
+    def test_json_format_setting(self, manager, captured, monkeypatch):
+        monkeypatch.setattr(settings, "ML_TRAINING_UPLOAD_FORMAT", "json")
+        run(manager.train_model([make_point(0)]))
+
+        request, _ = captured[0]
+        assert request.url.path == "/train"
+
+    def test_data_source_mode_sends_reference_only(self, manager, captured, monkeypatch):
+        monkeypatch.setattr(settings, "ML_TRAINING_DATA_SOURCE", "parquet")
+        monkeypatch.setattr(settings, "ML_TRAINING_PARQUET_PATH", "snapshots/latest")
+        run(manager.train_model(disease="Cholera"))
+        run(manager.submit_training_job(train_all=True))
+
+        for request, body in captured:
+            payload = json.loads(body)
+            assert payload["data_source"] == {"type": "parquet", "path": "snapshots/latest"}
+            assert "training_data" not in payload
+        assert [r.url.path for r, _ in captured] == ["/train", "/train/jobs"]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Columnar Batch Predictions
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestColumnarBatch:
+    """?format=columnar is passed through from ml-service without re-encoding."""
+
+    COLUMNS = {
+        "count": 2,
+        "county": ["Kisumu", "Siaya"],
+        "outbreak_probability": [0.81, 0.12],
+        "recommendations": [0, 1],
+        "recommendation_sets": [["🚨 Immediate intervention required"], []],
+    }
+
+    def test_proxy_passes_body_through(self, monkeypatch):
+        from fastapi.testclient import TestClient
+        from app.database import get_supabase_client
+        from app.main import app
+        from app.routers import ml as ml_router
+
+        sent = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            sent.append(request)
+            return httpx.Response(200, json=self.COLUMNS)
+
+        monkeypatch.setattr(
+            ml_router, "ml_manager", MLModelManager(transport=httpx.MockTransport(handler))
+        )
+        monkeypatch.setitem(app.dependency_overrides, get_supabase_client, lambda: None)
+        response = TestClient(app).post(
+            "/api/v1/ml/predict/batch",
+            params={"format": "columnar"},
+            json=[make_request().model_dump(mode="json")] * 2,
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["success"] and body["message"] == "Generated 2 predictions"
+        assert body["data"] == self.COLUMNS
+        assert sent[0].url.params["format"] == "columnar"
+        assert json.loads(sent[0].read())[0]["disease"] == "Malaria"
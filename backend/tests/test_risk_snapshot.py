@@ -0,0 +1,182 @@
+"""
+Tests for the Nationwide Risk Snapshot
+=======================================
+One batched scoring pass over every county × disease, persisted and
+served without inference.
+"""
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.training_data import DiseaseEnum, PredictionResponse, TrainingDataPoint
+from app.routers.counties import KENYA_COUNTIES
+from app.services import risk_snapshot as risk_snapshot_module
+from app.services.feature_store import CountyFeatureStore
+from app.config import settings
+from app.services.risk_snapshot import RiskSnapshotService, retry_delay
+
+
+class FakeMLManager:
+    """Deterministic scores: Kisumu Cholera is the hottest pair"""
+
+    def __init__(self, failures: int = 0, fallback: bool = False):
+        self.batches = []
+        self.failures = failures  # calls that fail before scoring succeeds
+        self.fallback = fallback  # answer as the local fallback would
+
+    async def predict_batch(self, requests):
+        self.batches.append(requests)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("ml-service warming up")
+        responses = []
+        for request in requests:
+            probability = 0.9 if (request.county, request.disease) == ("Kisumu", DiseaseEnum.CHOLERA) \
+                else 0.65 if request.county == "Mombasa" else 0.1
+            level = "critical" if probability >= 0.8 else "high" if probability >= 0.6 else "low"
+            responses.append(PredictionResponse(
+                county=request.county, disease=request.disease, risk_level=level,
+                outbreak_probability=probability, confidence_score=0.8,
+                predicted_cases=10, model_version="NaiveBayes_2026-10-17",
+                registry_version="v20261017_013119_313524", fallback=self.fallback
+            ))
+        return responses
+
+    async def get_model_status(self):
+        return {"models": {
+            "all": {"version": "v20261017_013119_313524", "accuracy": 0.9},
+            "Malaria": {"version": "v20261016_220405_104233", "accuracy": 0.5},
+        }}
+
+
+@pytest.fixture
+def service(tmp_path):
+    row = TrainingDataPoint(
+        county="Kisumu", disease="Cholera", temperature=28, humidity=80, rainfall=150,
+        population_density=600, outbreak_occurred=True, date=datetime(2026, 1, 1)
+    )
+    store = CountyFeatureStore(loader=lambda: [row], refresh_seconds=3600)
+    return RiskSnapshotService(
+        ml_manager=FakeMLManager(), feature_store=store,
+        path=str(tmp_path / "snapshot.json")
+    )
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Snapshot Tests
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestRiskSnapshot:
+    """Scoring, derived views and persistence."""
+
+    def test_scores_every_pair_in_one_batch(self, service):
+        snapshot = asyncio.run(service.compute())
+        assert len(service.ml_manager.batches) == 1
+        assert len(snapshot.entries) == len(KENYA_COUNTIES) * len(DiseaseEnum)
+
+        top = service.top_risks(1)[0]
+        assert (top["county_name"], top["disease"]) == ("Kisumu", "Cholera")
+        assert top["feature_source"] == "county_disease"
+
+        summary = service.national_summary()
+        assert summary["counties_monitored"] == 47
+        assert summary["high_risk_counties"] == 2
+        assert summary["critical_pairs"] == 1
+        assert summary["overall_risk"] == "low"  # most pairs score low
+        assert summary["fallback_pairs"] == 0
+        assert summary["model_accuracy"] == 90.0
+        assert summary["alerts"][0]["county"] == "Kisumu"
+
+    def test_fallback_scores_are_flagged(self, service):
+        service.ml_manager.fallback = True
+        asyncio.run(service.compute())
+        assert all(e["fallback"] for e in service.top_risks(282))
+        assert service.national_summary()["fallback_pairs"] == 47 * len(DiseaseEnum)
+
+    def test_county_risk_is_ranked(self, service):
+        asyncio.run(service.compute())
+        risks = service.county_risk("042")
+        assert len(risks) == len(DiseaseEnum)
+        assert risks[0]["disease"] == "Cholera"
+        assert service.county_risk("999") is None
+        assert [r["disease"] for r in service.top_risks(3, disease="Flu")] == ["Flu"] * 3
+
+    def test_persisted_snapshot_is_served_after_restart(self, service):
+        computed = asyncio.run(service.compute())
+        restarted = RiskSnapshotService(ml_manager=FakeMLManager(), path=str(service.path))
+        assert restarted.national_summary() is None
+
+        restarted.load()
+        assert restarted.national_summary() == computed.summary
+        assert restarted.ml_manager.batches == []
+
+    def test_failed_rescore_retries_with_backoff(self, service, monkeypatch):
+        monkeypatch.setattr(settings, "RISK_SNAPSHOT_RETRY_SECONDS", 0.01)
+        service.ml_manager.failures = 2
+
+        async def run_until_snapshot():
+            service.start(3600)
+            for _ in range(100):
+                if service.current is not None:
+                    break
+                await asyncio.sleep(0.01)
+            await service.stop()
+
+        asyncio.run(run_until_snapshot())
+        assert service.current is not None  # not an hour later
+        assert len(service.ml_manager.batches) == 3
+        assert not service.stale
+
+    def test_retry_delay_doubles_up_to_caps(self, monkeypatch):
+        monkeypatch.setattr(settings, "RISK_SNAPSHOT_RETRY_SECONDS", 15.0)
+        monkeypatch.setattr(settings, "RISK_SNAPSHOT_RETRY_MAX_SECONDS", 300.0)
+        assert [retry_delay(n, 3600) for n in (1, 2, 3, 6)] == [15.0, 30.0, 60.0, 300.0]
+        assert retry_delay(6, 120) == 120
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Endpoint Tests
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestSnapshotEndpoints:
+    """Dashboard endpoints read the snapshot and never score."""
+
+    def test_reads_before_first_snapshot_are_unavailable(self, service, monkeypatch):
+        monkeypatch.setattr(risk_snapshot_module, "_risk_snapshots", service)
+        client = TestClient(app)
+        assert client.get("/api/v1/predictions/national/summary").status_code == 503
+        assert client.get("/api/v1/predictions/national/top-risks").status_code == 503
+        assert client.get("/api/v1/predictions/national/counties/042").status_code == 503
+        assert service.ml_manager.batches == []  # reads never trigger inference
+
+    def test_failed_rescore_serves_stale_snapshot(self, service, monkeypatch):
+        asyncio.run(service.compute())
+        service.ml_manager.failures = 1
+        with pytest.raises(ConnectionError):
+            asyncio.run(service.compute())
+        monkeypatch.setattr(risk_snapshot_module, "_risk_snapshots", service)
+
+        response = TestClient(app).get("/api/v1/predictions/national/summary")
+        assert response.status_code == 200
+        assert response.json()["stale"] is True
+
+    def test_endpoints_serve_snapshot(self, service, monkeypatch):
+        asyncio.run(service.compute())
+        monkeypatch.setattr(risk_snapshot_module, "_risk_snapshots", service)
+        client = TestClient(app)
+
+        summary = client.get("/api/v1/predictions/national/summary").json()
+        assert summary["pairs_scored"] == 47 * len(DiseaseEnum)
+
+        top = client.get("/api/v1/predictions/national/top-risks", params={"limit": 2}).json()
+        assert top["count"] == 2 and top["data"][0]["county_id"] == "042"
+
+        county = client.get("/api/v1/predictions/national/counties/001").json()
+        assert county["risks"][0]["risk_level"] == "high"
+
+        stats = client.get("/api/v1/counties/042").json()["stats"]
+        assert stats["risk_level"] == "high" and stats["top_diseases"][0] == "Cholera"
+        assert len(service.ml_manager.batches) == 1
@@ -34,6 +34,14 @@ export interface PredictionResponse {
   model_version: string;
   created_at: string;
   recommendations: string[];
+  fallback?: boolean;
+}
+
+export interface BatchPredictionItem {
+  index: number;
+  success: boolean;
+  prediction: PredictionResponse | null;
+  error: string | null;
 }
 
 export interface ModelStatus {
@@ -119,7 +127,7 @@ export function useBatchPrediction() {
     mutationFn: async (requests: PredictionRequest[]) => {
       try {
         const response = await axios.post<{
-          data: PredictionResponse[];
+          data: BatchPredictionItem[];
           message: string;
         }>(`${API_BASE}/predict/batch`, requests);
         return response.data.data;
@@ -133,7 +141,9 @@ export function useBatchPrediction() {
     onSuccess: (data) => {
       toast({
         title: "Batch Predictions Complete",
-        description: `Generated ${data.length} predictions`,
+        description: `Generated ${
+          data.filter((item) => item.success).length
+        } of ${data.length} predictions`,
       });
       queryClient.invalidateQueries({ queryKey: ["predictions"] });
     },
@@ -42,10 +42,12 @@ export interface NationalSummary {
     overall_risk: string;
     high_risk_counties: number;
     counties_monitored: number;
-    active_outbreaks: number;
-    predictions_generated_today: number;
-    model_accuracy: number;
+    critical_pairs: number;
+    pairs_scored: number;
+    fallback_pairs: number;
+    model_accuracy: number | null;
     last_updated: string;
+    stale: boolean;
     alerts: Array<{
         county: string;
         disease: string;
@@ -0,0 +1,183 @@
+"""
+Pickle-free model artifacts
+
+A trained scaler + GaussianNB pair is stored as one flat float64 ``.npy``
+file so it can be opened with ``np.load(mmap_mode='r')``: loading is a page
+mapping rather than an unpickle, and every uvicorn worker on the host
+shares the same pages through the OS cache.
+
+Layout (all float64):
+
+    header   MAGIC, FORMAT_VERSION, n_classes, n_features, var_smoothing,
+             epsilon, n_samples_seen, has_scaler, classes_kind, has_priors
+    classes, class_count, class_prior                    (n_classes each)
+    theta, var                                           (n_classes x n_features)
+    scaler mean, var, scale                              (n_features each)
+    folded theta, folded inverse variance                (n_classes x n_features)
+    log normaliser                                       (n_classes)
+
+The folded section is the CompiledGaussianNB kernel, so the serving path
+uses the mapped arrays directly without recomputing anything.
+"""
+
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+from sklearn.naive_bayes import GaussianNB
+from sklearn.preprocessing import StandardScaler
+
+from app.compiled_model import CompiledGaussianNB
+
+ARTIFACT_NAME = "model.npy"
+MAGIC = float(0x45504E42)  # "EPNB"
+FORMAT_VERSION = 1.0
+HEADER_SIZE = 10
+
+_CLASS_KINDS = {"b": 0.0, "i": 1.0, "u": 1.0, "f": 2.0}
+_CLASS_DTYPES = {0: bool, 1: np.int64, 2: np.float64}
+
+
+def save_artifact(
+    path: Path,
+    model: GaussianNB,
+    scaler: Optional[StandardScaler]
+) -> None:
+    """Write a scaler + GaussianNB pair as a flat, mmap-able .npy file"""
+    compiled = CompiledGaussianNB.from_estimators(model, scaler)
+    classes = np.asarray(model.classes_)
+    n_classes, n_features = model.theta_.shape
+    has_scaler = scaler is not None
+
+    if has_scaler:
+        scaler_mean = scaler.mean_
+        scaler_var = scaler.var_
+        scaler_scale = scaler.scale_
+        n_samples_seen = float(np.max(scaler.n_samples_seen_))
+    else:
+        scaler_mean = np.zeros(n_features)
+        scaler_var = np.ones(n_features)
+        scaler_scale = np.ones(n_features)
+        n_samples_seen = 0.0
+
+    header = np.array([
+        MAGIC,
+        FORMAT_VERSION,
+        n_classes,
+        n_features,
+        model.var_smoothing,
+        float(model.epsilon_),
+        n_samples_seen,
+        1.0 if has_scaler else 0.0,
+        _CLASS_KINDS[classes.dtype.kind],
+        1.0 if model.priors is not None else 0.0,
+    ], dtype=np.float64)
+
+    flat = np.concatenate([
+        header,
+        classes.astype(np.float64),
+        np.asarray(model.class_count_, dtype=np.float64),
+        np.asarray(model.class_prior_, dtype=np.float64),
+        np.ravel(model.theta_),
+        np.ravel(model.var_),
+        scaler_mean,
+        scaler_var,
+        scaler_scale,
+        np.ravel(compiled.theta),
+        np.ravel(compiled.inv_var),
+        compiled.log_norm,
+    ]).astype(np.float64, copy=False)
+
+    with open(path, "wb") as f:
+        np.save(f, flat, allow_pickle=False)
+
+
+def load_artifact(
+    path: Path,
+    mmap: bool = True
+) -> Tuple[GaussianNB, Optional[StandardScaler], CompiledGaussianNB]:
+    """
+    Open an artifact and rebuild the estimators around views of its arrays.
+
+    With mmap (the default) nothing is copied; the returned objects must be
+    treated as read-only, which is how the registry uses them.
+    """
+    flat = np.load(path, mmap_mode="r" if mmap else None, allow_pickle=False)
+    return artifact_from_array(flat, path)
+
+
+def artifact_from_array(
+    flat: np.ndarray,
+    source: object = "array"
+) -> Tuple[GaussianNB, Optional[StandardScaler], CompiledGaussianNB]:
+    """
+    Rebuild the estimators around views of a flat artifact array.
+
+    The array may be a file mapping or a shared-memory buffer (see
+    app.shared_models); `source` only names it in error messages.
+    """
+    if flat.ndim != 1 or flat.shape[0] < HEADER_SIZE or flat[0] != MAGIC:
+        raise ValueError(f"Not a model artifact: {source}")
+    if flat[1] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format version {flat[1]} in {source}")
+
+    n_classes = int(flat[2])
+    n_features = int(flat[3])
+    var_smoothing = float(flat[4])
+    epsilon = float(flat[5])
+    n_samples_seen = int(flat[6])
+    has_scaler = bool(flat[7])
+    classes_dtype = _CLASS_DTYPES[int(flat[8])]
+    has_priors = bool(flat[9])
+
+    offset = HEADER_SIZE
+
+    def take(*shape: int) -> np.ndarray:
+        nonlocal offset
+        size = int(np.prod(shape))
+        view = flat[offset:offset + size].reshape(shape)
+        offset += size
+        return view
+
+    classes = np.asarray(take(n_classes)).astype(classes_dtype)
+    class_count = take(n_classes)
+    class_prior = take(n_classes)
+    theta = take(n_classes, n_features)
+    var = take(n_classes, n_features)
+    scaler_mean = take(n_features)
+    scaler_var = take(n_features)
+    scaler_scale = take(n_features)
+    folded_theta = take(n_classes, n_features)
+    folded_inv_var = take(n_classes, n_features)
+    log_norm = take(n_classes)
+    if offset != flat.shape[0]:
+        raise ValueError(f"Corrupt model artifact (size mismatch): {source}")
+
+    model = GaussianNB(
+        priors=np.array(class_prior) if has_priors else None,
+        var_smoothing=var_smoothing,
+    )
+    model.classes_ = classes
+    model.class_count_ = class_count
+    model.class_prior_ = class_prior
+    model.theta_ = theta
+    model.var_ = var
+    model.epsilon_ = epsilon
+    model.n_features_in_ = n_features
+
+    scaler = None
+    if has_scaler:
+        scaler = StandardScaler()
+        scaler.mean_ = scaler_mean
+        scaler.var_ = scaler_var
+        scaler.scale_ = scaler_scale
+        scaler.n_samples_seen_ = n_samples_seen
+        scaler.n_features_in_ = n_features
+
+    compiled = CompiledGaussianNB(
+        classes=classes,
+        theta=folded_theta,
+        inv_var=folded_inv_var,
+        log_norm=log_norm,
+    )
+    return model, scaler, compiled
@@ -0,0 +1,145 @@
+"""
+Columnar training data
+
+Training rows are held as preallocated NumPy columns instead of per-row
+dicts or DataFrames: a float64 feature matrix, a bool label vector and an
+int8 disease code vector. Arrays are filled in one pass straight from the
+source rows (pydantic objects or mappings), or supplied pre-built. Sources
+that can afford it also carry a county name column so scoped models can be
+trained without row objects.
+"""
+
+from dataclasses import dataclass
+from itertools import chain
+from operator import attrgetter
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.model_keys import region_for, slugify
+from app.models import DiseaseEnum, TrainingDataPoint
+
+FEATURE_COLUMNS = [
+    'temperature', 'humidity', 'rainfall',
+    'population_density', 'access_to_water', 'healthcare_coverage',
+    'previous_cases', 'vaccination_rate'
+]
+
+# Stable disease <-> int8 code mapping (DiseaseEnum declaration order)
+DISEASES: List[DiseaseEnum] = list(DiseaseEnum)
+DISEASE_CODES = {disease: code for code, disease in enumerate(DISEASES)}
+DISEASE_CODES.update({disease.value: code for disease, code in list(DISEASE_CODES.items())})
+
+
+@dataclass(frozen=True)
+class TrainingColumns:
+    """Column-oriented training set"""
+    features: np.ndarray       # (n, len(FEATURE_COLUMNS)) float64
+    labels: np.ndarray         # (n,) bool
+    disease_codes: np.ndarray  # (n,) int8, see DISEASE_CODES
+    counties: Optional[np.ndarray] = None  # (n,) str, when the source provides it
+
+    def __post_init__(self):
+        n_rows = len(self.labels)
+        if self.features.shape != (n_rows, len(FEATURE_COLUMNS)):
+            raise ValueError(
+                f"features must have shape ({n_rows}, {len(FEATURE_COLUMNS)}), "
+                f"got {self.features.shape}"
+            )
+        if self.disease_codes.shape != (n_rows,):
+            raise ValueError("disease_codes must have one entry per row")
+        if self.counties is not None and self.counties.shape != (n_rows,):
+            raise ValueError("counties must have one entry per row")
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    @classmethod
+    def from_arrays(
+        cls,
+        features: np.ndarray,
+        labels: np.ndarray,
+        disease_codes: np.ndarray,
+        counties: Optional[np.ndarray] = None
+    ) -> "TrainingColumns":
+        """Wrap pre-built arrays, converting dtypes only where needed"""
+        return cls(
+            features=np.asarray(features, dtype=np.float64),
+            labels=np.asarray(labels, dtype=bool),
+            disease_codes=np.asarray(disease_codes, dtype=np.int8),
+            counties=None if counties is None else np.asarray(counties, dtype=str),
+        )
+
+    @classmethod
+    def from_points(cls, points: Sequence[TrainingDataPoint]) -> "TrainingColumns":
+        """Fill columns from pydantic rows without materialising per-row dicts"""
+        n_rows = len(points)
+        features = np.fromiter(
+            chain.from_iterable(map(attrgetter(*FEATURE_COLUMNS), points)),
+            dtype=np.float64,
+            count=n_rows * len(FEATURE_COLUMNS),
+        ).reshape(n_rows, len(FEATURE_COLUMNS))
+        labels = np.fromiter(
+            map(attrgetter("outbreak_occurred"), points), dtype=bool, count=n_rows
+        )
+        disease_codes = np.fromiter(
+            map(DISEASE_CODES.__getitem__, map(attrgetter("disease"), points)),
+            dtype=np.int8,
+            count=n_rows,
+        )
+        return cls(features, labels, disease_codes)
+
+    @classmethod
+    def concatenate(cls, chunks: Iterable["TrainingColumns"]) -> "TrainingColumns":
+        chunks = list(chunks)
+        if not chunks:
+            return cls.empty()
+        has_counties = all(c.counties is not None for c in chunks)
+        return cls(
+            features=np.concatenate([c.features for c in chunks]),
+            labels=np.concatenate([c.labels for c in chunks]),
+            disease_codes=np.concatenate([c.disease_codes for c in chunks]),
+            counties=np.concatenate([c.counties for c in chunks]) if has_counties else None,
+        )
+
+    @classmethod
+    def empty(cls) -> "TrainingColumns":
+        return cls(
+            features=np.empty((0, len(FEATURE_COLUMNS)), dtype=np.float64),
+            labels=np.empty(0, dtype=bool),
+            disease_codes=np.empty(0, dtype=np.int8),
+        )
+
+    def scoped(
+        self,
+        county: Optional[str] = None,
+        region: Optional[str] = None
+    ) -> "TrainingColumns":
+        """Rows belonging to a county or region scope (same matching as filter_scope)"""
+        if not (county or region):
+            return self
+        if self.counties is None:
+            raise ValueError("County/region scoped training needs row-level training data")
+        # Slug matching runs once per distinct county, not once per row
+        names, inverse = np.unique(self.counties, return_inverse=True)
+        if county:
+            keep = np.array([slugify(name) == slugify(county) for name in names], dtype=bool)
+        else:
+            keep = np.array(
+                [slugify(region_for(name) or "") == slugify(region) for name in names],
+                dtype=bool,
+            )
+        mask = keep[inverse] if len(names) else np.zeros(len(self), dtype=bool)
+        return TrainingColumns(
+            features=self.features[mask],
+            labels=self.labels[mask],
+            disease_codes=self.disease_codes[mask],
+            counties=self.counties[mask],
+        )
+
+    def select(self, disease: Optional[DiseaseEnum] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Feature matrix and labels, optionally restricted to one disease"""
+        if disease is None:
+            return self.features, self.labels
+        mask = self.disease_codes == DISEASE_CODES[disease]
+        return self.features[mask], self.labels[mask]
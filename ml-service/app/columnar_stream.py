@@ -0,0 +1,135 @@
+"""
+Binary streaming transfer of training data
+
+Training sets are sent as a stream of length-prefixed frames instead of one
+JSON document. Each frame is an 8-byte little-endian payload length followed
+by an uncompressed .npz (no pickle) holding one chunk of rows:
+
+    features       (n, 8) float64, FEATURE_COLUMNS order
+    labels         (n,)   bool
+    disease_codes  (n,)   int8, indexes into `diseases`
+    diseases       (k,)   str, disease names used by this frame
+    counties       (n,)   str, optional; needed for county/region training
+
+Frames carry their own disease-name table, so the sender does not need to
+share this service's code assignment. The receiver decodes frames as bytes
+arrive, so neither side ever holds the data as JSON or pydantic rows.
+"""
+
+import io
+import struct
+from typing import AsyncIterator, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from app.columnar import DISEASE_CODES, DISEASES, TrainingColumns
+
+MEDIA_TYPE = "application/vnd.epipredict.columns+npz"
+FRAME_HEADER = struct.Struct("<Q")
+MAX_FRAME_BYTES = 512 * 1024 * 1024
+DEFAULT_CHUNK_ROWS = 50_000
+
+
+def encode_frame(
+    features: np.ndarray,
+    labels: np.ndarray,
+    disease_codes: np.ndarray,
+    diseases: Sequence[str],
+    counties: Optional[Sequence[str]] = None
+) -> bytes:
+    arrays = dict(
+        features=np.ascontiguousarray(features, dtype=np.float64),
+        labels=np.asarray(labels, dtype=bool),
+        disease_codes=np.asarray(disease_codes, dtype=np.int8),
+        diseases=np.asarray(list(diseases), dtype=str),
+    )
+    if counties is not None:
+        arrays["counties"] = np.asarray(counties, dtype=str)
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    payload = buffer.getvalue()
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+def iter_frames(
+    columns: TrainingColumns,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> Iterator[bytes]:
+    """Encode TrainingColumns as a sequence of frames"""
+    names = [disease.value for disease in DISEASES]
+    for start in range(0, len(columns), chunk_rows):
+        stop = start + chunk_rows
+        yield encode_frame(
+            columns.features[start:stop],
+            columns.labels[start:stop],
+            columns.disease_codes[start:stop],
+            names,
+            None if columns.counties is None else columns.counties[start:stop],
+        )
+
+
+def decode_frame(payload: bytes) -> TrainingColumns:
+    """Decode one frame payload (without its length prefix)"""
+    try:
+        with np.load(io.BytesIO(payload), allow_pickle=False) as frame:
+            features = frame["features"]
+            labels = frame["labels"]
+            codes = frame["disease_codes"]
+            names = frame["diseases"]
+            counties = frame["counties"] if "counties" in frame.files else None
+    except (OSError, KeyError, ValueError) as e:
+        raise ValueError(f"Malformed training data frame: {e}") from e
+
+    try:
+        # Map the sender's codes onto ours
+        remap = np.array([DISEASE_CODES[str(name)] for name in names], dtype=np.int8)
+    except KeyError as e:
+        raise ValueError(f"Unknown disease in training data frame: {e.args[0]}") from None
+    if codes.size and (codes.min() < 0 or codes.max() >= len(remap)):
+        raise ValueError("Disease code out of range in training data frame")
+    if counties is not None and counties.shape != labels.shape:
+        raise ValueError("Training data frame has one county per row or none")
+    return TrainingColumns.from_arrays(features, labels, remap[codes], counties)
+
+
+class FrameDecoder:
+    """
+    Incremental decoder: feed arbitrary byte chunks, get complete frames back
+    """
+
+    def __init__(self, max_frame_bytes: int = MAX_FRAME_BYTES):
+        self.max_frame_bytes = max_frame_bytes
+        self._buffer = bytearray()
+        self.frames = 0
+        self.rows = 0
+
+    def feed(self, data: bytes) -> List[TrainingColumns]:
+        self._buffer.extend(data)
+        decoded = []
+        while len(self._buffer) >= FRAME_HEADER.size:
+            (length,) = FRAME_HEADER.unpack_from(self._buffer)
+            if length > self.max_frame_bytes:
+                raise ValueError(f"Training data frame of {length} bytes exceeds the limit")
+            end = FRAME_HEADER.size + length
+            if len(self._buffer) < end:
+                break
+            chunk = decode_frame(bytes(self._buffer[FRAME_HEADER.size:end]))
+            del self._buffer[:end]
+            self.frames += 1
+            self.rows += len(chunk)
+            decoded.append(chunk)
+        return decoded
+
+    def close(self) -> None:
+        if self._buffer:
+            raise ValueError("Training data stream ended mid-frame")
+
+
+async def read_columns(stream: AsyncIterator[bytes]) -> TrainingColumns:
+    """Decode a streamed request body into one TrainingColumns"""
+    decoder = FrameDecoder()
+    chunks: List[TrainingColumns] = []
+    async for data in stream:
+        chunks.extend(decoder.feed(data))
+    decoder.close()
+    return TrainingColumns.concatenate(chunks)
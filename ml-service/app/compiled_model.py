@@ -0,0 +1,113 @@
+"""
+Compiled Gaussian Naive Bayes scoring kernel
+
+Folds a fitted StandardScaler into the GaussianNB parameters so that scoring
+is a single joint log-likelihood evaluation in NumPy, without sklearn's
+per-call input validation.
+
+For a scaler with mean m and scale s, a scaled feature is (x - m) / s, so
+
+    ((x - m) / s - theta)^2 / var  ==  (x - (m + s * theta))^2 / (s^2 * var)
+
+and the model can be evaluated directly on raw features with
+theta' = m + s * theta and var' = s^2 * var. The per-class normalisation
+term is kept from the unscaled variances, so the joint log-likelihood is
+identical to sklearn's and probabilities match within float tolerance.
+"""
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+from sklearn.naive_bayes import GaussianNB
+from sklearn.preprocessing import StandardScaler
+
+
+class CompiledGaussianNB:
+    """
+    Immutable, scaler-folded GaussianNB used on the prediction hot path
+    """
+
+    __slots__ = ("classes", "theta", "inv_var", "log_norm", "positive_index")
+
+    def __init__(
+        self,
+        classes: np.ndarray,
+        theta: np.ndarray,
+        inv_var: np.ndarray,
+        log_norm: np.ndarray
+    ):
+        self.classes = classes
+        self.theta = theta
+        self.inv_var = inv_var
+        self.log_norm = log_norm
+        positive = np.flatnonzero(classes == 1)
+        self.positive_index = int(positive[0]) if positive.size else None
+
+    @classmethod
+    def from_estimators(
+        cls,
+        model: GaussianNB,
+        scaler: Optional[StandardScaler] = None
+    ) -> "CompiledGaussianNB":
+        """Build the kernel from a fitted GaussianNB and optional StandardScaler"""
+        theta = np.asarray(model.theta_, dtype=np.float64)
+        var = np.asarray(model.var_, dtype=np.float64)
+
+        if scaler is not None:
+            mean = scaler.mean_ if getattr(scaler, "mean_", None) is not None else 0.0
+            scale = scaler.scale_ if getattr(scaler, "scale_", None) is not None else 1.0
+            folded_theta = mean + scale * theta
+            folded_var = var * np.square(scale)
+        else:
+            folded_theta = theta
+            folded_var = var
+
+        log_norm = (
+            np.log(np.asarray(model.class_prior_, dtype=np.float64))
+            - 0.5 * np.sum(np.log(2.0 * np.pi * var), axis=1)
+        )
+        return cls(
+            classes=np.asarray(model.classes_),
+            theta=np.ascontiguousarray(folded_theta),
+            inv_var=np.ascontiguousarray(1.0 / folded_var),
+            log_norm=log_norm,
+        )
+
+    def joint_log_likelihood(self, X: np.ndarray) -> np.ndarray:
+        """Per-class joint log-likelihood for raw (unscaled) feature rows"""
+        X = np.asarray(X, dtype=np.float64)
+        diff = X[:, np.newaxis, :] - self.theta
+        return self.log_norm - 0.5 * np.einsum("ncf,cf->nc", diff * diff, self.inv_var)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        jll = self.joint_log_likelihood(X)
+        jll -= jll.max(axis=1, keepdims=True)
+        proba = np.exp(jll)
+        proba /= proba.sum(axis=1, keepdims=True)
+        return proba
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes[np.argmax(self.joint_log_likelihood(X), axis=1)]
+
+    def outbreak_probability(self, X: np.ndarray) -> np.ndarray:
+        """Probability of the positive (outbreak) class for each row"""
+        if self.positive_index is None:
+            return np.zeros(len(X), dtype=np.float64)
+        return self.predict_proba(X)[:, self.positive_index]
+
+    def score_one(self, features: Sequence[float]) -> Tuple[float, object]:
+        """
+        Score a single raw feature row.
+
+        Returns the outbreak probability and the predicted class from one
+        joint log-likelihood evaluation.
+        """
+        diff = np.asarray(features, dtype=np.float64) - self.theta
+        jll = self.log_norm - 0.5 * (diff * diff * self.inv_var).sum(axis=1)
+        best = int(jll.argmax())
+        proba = np.exp(jll - jll[best])
+        if self.positive_index is None:
+            outbreak_prob = 0.0
+        else:
+            outbreak_prob = float(proba[self.positive_index] / proba.sum())
+        return outbreak_prob, self.classes[best]
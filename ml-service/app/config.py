@@ -0,0 +1,75 @@
+"""
+config.py - ML Service Configuration
+
+Settings are read from environment variables (or a local .env file) using
+Pydantic Settings, mirroring the backend's configuration module.
+"""
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from functools import lru_cache
+from typing import List
+
+
+class Settings(BaseSettings):
+    """ML service settings, overridable through environment variables"""
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # Prediction Cache
+    # ═══════════════════════════════════════════════════════════════════════════
+    PREDICTION_CACHE_SIZE: int = 4096         # Max cached responses (0 disables)
+    PREDICTION_CACHE_TTL_SECONDS: float = 300.0
+    PREDICTION_CACHE_QUANTUM: float = 1e-3    # Feature rounding step for cache keys
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # Model Registry
+    # ═══════════════════════════════════════════════════════════════════════════
+    MODEL_HISTORY_LIMIT: int = 5              # Versions retained per model for rollback
+    MODEL_RETIRE_GRACE_SECONDS: float = 300.0  # Pruned versions stay on disk for lagging replicas
+    MANIFEST_POLL_SECONDS: float = 2.0        # Reload models published by other replicas (0 disables)
+    MODEL_CACHE_MAX_MODELS: int = 64          # Loaded model versions kept in memory (LRU)
+    MODEL_CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # Parameter bytes kept in memory (0 = no limit)
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # Training Jobs
+    # ═══════════════════════════════════════════════════════════════════════════
+    TRAINING_MAX_WORKERS: int = 0             # Process pool size (0 = one per CPU)
+    CV_FOLDS: int = 5                         # Folds for cross-validation training mode
+    CV_VAR_SMOOTHING_GRID: List[float] = [1e-11, 1e-10, 1e-9, 1e-8, 1e-7, 1e-6, 1e-5]
+    CV_N_JOBS: int = -1                       # joblib workers for CV fits (-1 = all cores)
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # Training Data Sources
+    # ═══════════════════════════════════════════════════════════════════════════
+    DATABASE_URL: str = ""                    # Same PostgreSQL database as the backend
+    TRAINING_DATA_DIR: str = "data"           # Parquet snapshots must live under this directory
+    TRAINING_SOURCE_CHUNK_ROWS: int = 50_000  # Rows per server-side cursor fetch / Parquet batch
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # Serving
+    # ═══════════════════════════════════════════════════════════════════════════
+    SERVE_WORKERS: int = 1                    # uvicorn worker processes (python -m app.serve)
+    SHARED_MODELS: bool = True                # Launcher shares model parameters with workers
+    INFERENCE_THREADS: int = 0                # Scoring threads per worker (0 = CPUs / workers)
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # Startup Warm-up
+    # ═══════════════════════════════════════════════════════════════════════════
+    WARMUP_ENABLED: bool = True               # Load every model before reporting ready
+    WARMUP_MAX_WORKERS: int = 4               # Models loaded concurrently
+    WARMUP_DUMMY_PREDICTION: bool = True      # Score one row per model after loading
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        extra="ignore",
+    )
+
+
+@lru_cache()
+def get_settings() -> Settings:
+    """Returns the cached settings instance"""
+    return Settings()
+
+
+settings = get_settings()
@@ -0,0 +1,255 @@
+"""
+Direct training data sources
+
+Instead of receiving every row inline from the backend, /train can name a
+data source and ml-service reads the rows itself, chunk by chunk, straight
+into TrainingColumns:
+
+    database   the backend's training_data table, via DATABASE_URL and a
+               server-side (named) cursor, so only one chunk is in flight
+    parquet    a Parquet file or directory of files under TRAINING_DATA_DIR,
+               read as record batches (needs pyarrow)
+
+Disease and date filters are pushed down to the source. County names are
+only read when a scoped model is being trained.
+"""
+
+import logging
+import re
+import uuid
+from contextlib import closing
+from itertools import chain
+from operator import itemgetter
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from app.columnar import DISEASE_CODES, FEATURE_COLUMNS, TrainingColumns
+from app.config import settings
+from app.models import DataSourceRef, DiseaseEnum
+
+try:
+    import psycopg2
+    PSYCOPG2_AVAILABLE = True
+except ImportError:
+    PSYCOPG2_AVAILABLE = False
+
+try:
+    import pyarrow.compute as pa_compute
+    import pyarrow.dataset as pa_dataset
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+TRAINING_TABLE = "training_data"
+# since/until filter on this column (supabase/migrations/002_ml_tables.sql)
+DATE_COLUMN = "observation_date"
+
+# Optional features default like TrainingDataPoint when NULL or absent
+FEATURE_DEFAULTS = {
+    "access_to_water": 0.0,
+    "healthcare_coverage": 0.0,
+    "previous_cases": 0.0,
+    "vaccination_rate": 0.0,
+}
+
+
+def load_training_columns(
+    source: DataSourceRef,
+    disease: Optional[DiseaseEnum] = None,
+    with_counties: bool = False,
+    chunk_rows: Optional[int] = None
+) -> TrainingColumns:
+    """
+    Read a data source into TrainingColumns.
+
+    Raises ValueError for unusable references (missing driver, no
+    DATABASE_URL, path outside TRAINING_DATA_DIR, bad rows).
+    """
+    chunk_rows = chunk_rows or settings.TRAINING_SOURCE_CHUNK_ROWS
+    if source.type == "database":
+        chunks = _read_database(source, disease, with_counties, chunk_rows)
+    else:
+        chunks = _read_parquet(source, disease, with_counties, chunk_rows)
+    columns = TrainingColumns.concatenate(chunks)
+    logger.info(f"Read {len(columns)} training rows from {source.type} source")
+    return columns
+
+
+def _disease_codes(names: Sequence) -> np.ndarray:
+    """Map disease names to codes once per distinct name"""
+    uniques, inverse = np.unique(np.asarray(names, dtype=str), return_inverse=True)
+    try:
+        codes = np.array([DISEASE_CODES[name] for name in uniques], dtype=np.int8)
+    except KeyError as e:
+        raise ValueError(f"Unknown disease in training data source: {e.args[0]}") from None
+    return codes[inverse] if len(uniques) else np.empty(0, dtype=np.int8)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PostgreSQL
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _database_query(
+    source: DataSourceRef,
+    disease: Optional[DiseaseEnum],
+    with_counties: bool
+) -> tuple:
+    selected = [
+        f"COALESCE({col}, {FEATURE_DEFAULTS[col]})" if col in FEATURE_DEFAULTS else col
+        for col in FEATURE_COLUMNS
+    ]
+    selected += ["outbreak_occurred", "disease"]
+    if with_counties:
+        selected.append("county")
+
+    conditions = ["outbreak_occurred IS NOT NULL"]
+    params: List = []
+    if disease:
+        conditions.append("disease = %s")
+        params.append(disease.value)
+    if source.since:
+        conditions.append(f"{DATE_COLUMN} >= %s")
+        params.append(source.since)
+    if source.until:
+        conditions.append(f"{DATE_COLUMN} < %s")
+        params.append(source.until)
+
+    query = (
+        f"SELECT {', '.join(selected)} FROM {TRAINING_TABLE} "
+        f"WHERE {' AND '.join(conditions)}"
+    )
+    return query, params
+
+
+def _rows_to_columns(rows: List[tuple], with_counties: bool) -> TrainingColumns:
+    """Fill columns from cursor tuples laid out as (*features, label, disease[, county])"""
+    n_rows = len(rows)
+    n_features = len(FEATURE_COLUMNS)
+    try:
+        features = np.fromiter(
+            chain.from_iterable(row[:n_features] for row in rows),
+            dtype=np.float64,
+            count=n_rows * n_features,
+        ).reshape(n_rows, n_features)
+    except TypeError:
+        raise ValueError("Training data source has NULL values in required feature columns") from None
+    labels = np.fromiter(map(itemgetter(n_features), rows), dtype=bool, count=n_rows)
+    disease_codes = _disease_codes([row[n_features + 1] for row in rows])
+    counties = (
+        np.array([row[n_features + 2] or "" for row in rows], dtype=str)
+        if with_counties else None
+    )
+    return TrainingColumns(features, labels, disease_codes, counties)
+
+
+def _connect():
+    if not PSYCOPG2_AVAILABLE:
+        raise ValueError("Database training source needs psycopg2 (pip install psycopg2-binary)")
+    if not settings.DATABASE_URL:
+        raise ValueError("Database training source needs DATABASE_URL to be configured")
+    # Accept SQLAlchemy-style URLs such as postgresql+psycopg2://
+    dsn = re.sub(r"^postgres(ql)?\+\w+://", "postgresql://", settings.DATABASE_URL)
+    return psycopg2.connect(dsn)
+
+
+def _read_database(
+    source: DataSourceRef,
+    disease: Optional[DiseaseEnum],
+    with_counties: bool,
+    chunk_rows: int
+) -> Iterator[TrainingColumns]:
+    query, params = _database_query(source, disease, with_counties)
+    with closing(_connect()) as connection:
+        connection.set_session(readonly=True)
+        # A named cursor keeps the result set on the server between fetches
+        with connection.cursor(name=f"training_{uuid.uuid4().hex[:12]}") as cursor:
+            cursor.itersize = chunk_rows
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_rows)
+                if not rows:
+                    break
+                yield _rows_to_columns(rows, with_counties)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Parquet
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _resolve_parquet_path(path: Optional[str]) -> Path:
+    """Resolve a snapshot path, refusing anything outside TRAINING_DATA_DIR"""
+    if not path:
+        raise ValueError("Parquet training source needs a path")
+    root = Path(settings.TRAINING_DATA_DIR).resolve()
+    resolved = (root / path).resolve()
+    if resolved != root and root not in resolved.parents:
+        raise ValueError(f"Parquet path must be inside {settings.TRAINING_DATA_DIR}")
+    if not resolved.exists():
+        raise ValueError(f"Parquet training source not found: {path}")
+    return resolved
+
+
+def _read_parquet(
+    source: DataSourceRef,
+    disease: Optional[DiseaseEnum],
+    with_counties: bool,
+    chunk_rows: int
+) -> Iterator[TrainingColumns]:
+    if not PYARROW_AVAILABLE:
+        raise ValueError("Parquet training source needs pyarrow (pip install pyarrow)")
+    dataset = pa_dataset.dataset(str(_resolve_parquet_path(source.path)), format="parquet")
+
+    available = set(dataset.schema.names)
+    extra_columns = ["outbreak_occurred", "disease"] + (["county"] if with_counties else [])
+    required = [c for c in FEATURE_COLUMNS if c not in FEATURE_DEFAULTS] + extra_columns
+    missing = [c for c in required if c not in available]
+    if missing:
+        raise ValueError(f"Parquet training source is missing columns: {', '.join(missing)}")
+
+    expression = pa_dataset.field("outbreak_occurred").is_valid()
+    if disease:
+        expression &= pa_dataset.field("disease") == disease.value
+    if source.since or source.until:
+        # Table exports use the database column, TrainingDataPoint dumps use `date`
+        date_column = DATE_COLUMN if DATE_COLUMN in available else "date"
+        if date_column not in available:
+            raise ValueError(f"Parquet training source has no {DATE_COLUMN} column to filter on")
+        if source.since:
+            expression &= pa_dataset.field(date_column) >= source.since
+        if source.until:
+            expression &= pa_dataset.field(date_column) < source.until
+
+    read_columns = [c for c in FEATURE_COLUMNS if c in available] + extra_columns
+    for batch in dataset.to_batches(
+        columns=read_columns, filter=expression, batch_size=chunk_rows
+    ):
+        if batch.num_rows:
+            yield _batch_to_columns(batch, with_counties)
+
+
+def _batch_to_columns(batch, with_counties: bool) -> TrainingColumns:
+    n_rows = batch.num_rows
+    names = batch.schema.names
+    features = np.empty((n_rows, len(FEATURE_COLUMNS)), dtype=np.float64)
+    for j, col in enumerate(FEATURE_COLUMNS):
+        if col not in names:
+            features[:, j] = FEATURE_DEFAULTS[col]
+            continue
+        values = batch.column(col)
+        if col in FEATURE_DEFAULTS:
+            values = pa_compute.fill_null(values, FEATURE_DEFAULTS[col])
+        elif values.null_count:
+            raise ValueError(f"Training data source has NULL values in {col}")
+        features[:, j] = values.to_numpy(zero_copy_only=False)
+
+    labels = batch.column("outbreak_occurred").to_numpy(zero_copy_only=False).astype(bool)
+    disease_codes = _disease_codes(batch.column("disease").to_numpy(zero_copy_only=False))
+    counties = (
+        pa_compute.fill_null(batch.column("county"), "").to_numpy(zero_copy_only=False).astype(str)
+        if with_counties else None
+    )
+    return TrainingColumns(features, labels, disease_codes, counties)
@@ -0,0 +1,59 @@
+"""
+Dedicated inference thread pool
+
+Scoring is CPU-bound NumPy work that releases the GIL in its array kernels.
+Prediction endpoints run it here instead of on Starlette's default
+threadpool (40 threads shared with every other sync endpoint), so
+concurrency matches the cores this worker process is meant to use and a
+burst of requests queues instead of oversubscribing the CPU.
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from app.config import settings
+
+T = TypeVar("T")
+
+
+def default_threads() -> int:
+    """INFERENCE_THREADS, or this worker's share of the CPUs"""
+    if settings.INFERENCE_THREADS > 0:
+        return settings.INFERENCE_THREADS
+    return max(1, (os.cpu_count() or 1) // max(1, settings.SERVE_WORKERS))
+
+
+class InferencePool:
+    """
+    Lazily started, fixed-size thread pool for prediction calls
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or default_threads()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="inference"
+                )
+            return self._executor
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Run func(*args, **kwargs) on the pool and await its result"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), functools.partial(func, *args, **kwargs)
+        )
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,132 @@
+"""
+Thread-safe bounded LRU shared by the model and prediction caches
+
+Entries are evicted least recently used first once the cache holds more
+than `max_entries`, or more than `max_bytes` as measured by `sizeof`.
+With a `ttl_seconds`, entries also expire that long after they were put.
+A cache with `max_entries` 0 is disabled: puts are dropped and gets miss
+without being counted.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+
+class BoundedLRU:
+    """
+    LRU bounded by entry count and optionally bytes, with optional expiry
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int = 0,
+        sizeof: Optional[Callable[[Any], int]] = None,
+        ttl_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max(0, max_entries)
+        self.max_bytes = max(0, max_bytes)  # 0 = no byte limit
+        self.ttl_seconds = ttl_seconds      # None = entries never expire
+        self._sizeof = sizeof
+        self._clock = clock
+        # key -> (expires_at or None, size in bytes, value)
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _expired(self, entry: tuple) -> bool:
+        return entry[0] is not None and entry[0] <= self._clock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if not self.max_entries:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if self._expired(entry):
+                del self._entries[key]
+                self.bytes -= entry[1]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Lookup without touching recency or counters"""
+        entry = self._entries.get(key)
+        return entry[2] if entry is not None and not self._expired(entry) else None
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if not self.max_entries:
+            return
+        size = self._sizeof(value) if self._sizeof is not None else 0
+        expires_at = self._clock() + self.ttl_seconds if self.ttl_seconds is not None else None
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            else:
+                self.loads += 1
+            self._entries[key] = (expires_at, size, value)
+            self.bytes += size
+            # Always keep the newest entry, even if it alone exceeds max_bytes
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes and self.bytes > self.max_bytes)
+            ):
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            self.bytes -= entry[1]
+            return entry[2]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def keys(self) -> List[Hashable]:
+        return list(self._entries.keys())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return round(self.hits / lookups, 4) if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hit_rate(),
+        }
@@ -1,30 +1,80 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, ORJSONResponse
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 
 from app.models import (
     PredictionRequest,
     PredictionResponse,
     TrainingDataPoint,
+    DataSourceRef,
     ModelTrainingRequest,
     ModelTrainingResponse,
 )
+from app.columnar_stream import MEDIA_TYPE, read_columns
+from app.config import settings
+from app.data_sources import load_training_columns
+from app.inference_pool import InferencePool
 from app.ml_service import MLModelManager
+from app.training_jobs import TrainingJobManager
+from app.warmup import ModelWarmup
+
+ml_manager = MLModelManager()
+training_jobs = TrainingJobManager(ml_manager)
+warmup = ModelWarmup(ml_manager)
+inference_pool = InferencePool()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load models in the background; /ready gates traffic until they are hot
+    if settings.WARMUP_ENABLED:
+        warmup.start()
+    else:
+        warmup.mark_ready()
+    # Converge on models trained by other replicas sharing the volume
+    ml_manager.registry.start_polling(settings.MANIFEST_POLL_SECONDS)
+    yield
+    ml_manager.registry.stop_polling()
+    training_jobs.shutdown()
+    inference_pool.shutdown()
+
 
 app = FastAPI(
     title="EpiPredict Kenya AI - ML Service",
     description="Standalone ML prediction and training service",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-ml_manager = MLModelManager()
-
 
 class TrainPayload(BaseModel):
-    training_data: List[TrainingDataPoint]
+    training_data: Optional[List[TrainingDataPoint]] = None
+    data_source: Optional[DataSourceRef] = None  # Read rows here instead of inline
     disease: Optional[str] = None
     test_size: float = 0.2
     random_state: int = 42
+    incremental: bool = False
+    cross_validation: bool = False
+    cv_folds: Optional[int] = None
+    county: Optional[str] = None
+    region: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_data(self) -> "TrainPayload":
+        if (self.training_data is None) == (self.data_source is None):
+            raise ValueError("Provide exactly one of training_data or data_source")
+        if self.incremental and self.data_source is not None and self.data_source.since is None:
+            # Without a lower bound the source holds the full history, which
+            # would be folded into the active model a second time
+            raise ValueError("Incremental training from a data_source needs data_source.since")
+        return self
+
+
+class TrainJobPayload(TrainPayload):
+    train_all: bool = False
 
 
 @app.get("/health")
@@ -32,10 +82,37 @@ def health_check():
     return {"status": "healthy", "service": "ml-service"}
 
 
+@app.get("/ready")
+def readiness_check():
+    """503 until every registered model has been loaded (startup warm-up)"""
+    status = warmup.to_dict()
+    if not status["ready"]:
+        return JSONResponse(status_code=503, content={**status, "status": "warming_up"})
+    return {**status, "status": "ready", "service": "ml-service"}
+
+
 @app.post("/predict", response_model=PredictionResponse)
-def predict_outbreak(request: PredictionRequest):
+async def predict_outbreak(request: PredictionRequest):
     try:
-        return ml_manager.predict(request)
+        return await inference_pool.run(ml_manager.predict, request)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/predict/batch", response_model=List[PredictionResponse])
+async def predict_outbreak_batch(
+    requests: List[PredictionRequest],
+    response_format: str = Query("rows", alias="format", pattern="^(rows|columnar)$")
+):
+    """
+    `format=columnar` returns one array per field instead of one object
+    per row, serialized straight from NumPy with orjson.
+    """
+    try:
+        if response_format == "columnar":
+            columns = await inference_pool.run(ml_manager.predict_batch_columns, requests)
+            return ORJSONResponse(columns)
+        return await inference_pool.run(ml_manager.predict_batch, requests)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -48,21 +125,155 @@ def train_model(payload: TrainPayload):
         disease_enum = None
         if payload.disease:
             disease_enum = DiseaseEnum(payload.disease)
+        
+        training_data = payload.training_data
+        if payload.data_source is not None:
+            training_data = load_training_columns(
+                payload.data_source,
+                disease=disease_enum,
+                with_counties=bool(payload.county or payload.region)
+            )
+            
+        if payload.incremental:
+            # Only the new observations are sent; fold them into the active model
+            return ml_manager.update_model(
+                training_data=training_data,
+                disease=disease_enum,
+                county=payload.county,
+                region=payload.region
+            )
             
         result = ml_manager.train_model(
-            training_data=payload.training_data,
+            training_data=training_data,
             disease=disease_enum,
             test_size=payload.test_size,
-            random_state=payload.random_state
+            random_state=payload.random_state,
+            cross_validation=payload.cross_validation,
+            cv_folds=payload.cv_folds,
+            county=payload.county,
+            region=payload.region
         )
         return result
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.post("/train/stream")
+async def train_model_stream(
+    request: Request,
+    disease: Optional[str] = None,
+    test_size: float = 0.2,
+    random_state: int = 42,
+    incremental: bool = False,
+    cross_validation: bool = False,
+    cv_folds: Optional[int] = None,
+    county: Optional[str] = None,
+    region: Optional[str] = None
+):
+    """
+    Train from a streamed columnar body (see app.columnar_stream).
+    
+    Frames are decoded straight into NumPy arrays as they arrive; options
+    are passed as query parameters. County/region training needs frames
+    that carry the optional counties array.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type != MEDIA_TYPE:
+        raise HTTPException(status_code=415, detail=f"Expected Content-Type: {MEDIA_TYPE}")
+    try:
+        from app.models import DiseaseEnum
+        disease_enum = DiseaseEnum(disease) if disease else None
+        columns = await read_columns(request.stream())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if incremental:
+        return await run_in_threadpool(
+            ml_manager.update_model,
+            training_data=columns,
+            disease=disease_enum,
+            county=county,
+            region=region
+        )
+    return await run_in_threadpool(
+        ml_manager.train_model,
+        training_data=columns,
+        disease=disease_enum,
+        test_size=test_size,
+        random_state=random_state,
+        cross_validation=cross_validation,
+        cv_folds=cv_folds,
+        county=county,
+        region=region
+    )
+
+
+@app.post("/train/jobs", status_code=202)
+def create_training_job(payload: TrainJobPayload):
+    """Queue training in the background; poll GET /train/jobs/{job_id} for progress"""
+    try:
+        if payload.incremental:
+            raise ValueError("Incremental updates are O(new rows); use POST /train instead")
+        from app.models import DiseaseEnum
+        disease_enum = DiseaseEnum(payload.disease) if payload.disease else None
+        job = training_jobs.submit(
+            training_data=payload.training_data,
+            data_source=payload.data_source,
+            disease=disease_enum,
+            train_all=payload.train_all,
+            test_size=payload.test_size,
+            random_state=payload.random_state,
+            cross_validation=payload.cross_validation,
+            cv_folds=payload.cv_folds,
+            county=payload.county,
+            region=payload.region
+        )
+        return job.to_dict()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/train/jobs")
+def list_training_jobs():
+    return training_jobs.list_jobs()
+
+
+@app.get("/train/jobs/{job_id}")
+def get_training_job(job_id: str):
+    job = training_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Training job {job_id} not found")
+    return job
+
+
 @app.get("/model/status")
 def get_model_status():
     try:
         return ml_manager.get_model_status()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/model/params")
+def get_model_params():
+    """Kernel parameters of the per-disease and all-disease models (backend fallback)"""
+    return ml_manager.export_params()
+
+
+@app.get("/model/{model_key}/versions")
+def get_model_versions(model_key: str):
+    versions = ml_manager.registry.versions(model_key)
+    if not versions:
+        raise HTTPException(status_code=404, detail=f"No model registered for: {model_key}")
+    return {"model": model_key, "versions": versions}
+
+
+@app.post("/model/{model_key}/rollback")
+def rollback_model(model_key: str, version: Optional[str] = None):
+    """Repoint a model at the previous version, or at `version` if given"""
+    try:
+        return ml_manager.rollback_model(model_key, version)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
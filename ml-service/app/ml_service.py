@@ -1,16 +1,22 @@
-import joblib
-import json
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, List, Tuple
+from typing import Optional, Dict, List, Sequence, Tuple, Union
 import numpy as np
-import pandas as pd
 from sklearn.naive_bayes import GaussianNB
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import GridSearchCV, StratifiedKFold, train_test_split
+from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+from sklearn.metrics import (
+    accuracy_score, precision_score, recall_score, f1_score, confusion_matrix, make_scorer
+)
 
+from app.columnar import FEATURE_COLUMNS, TrainingColumns
+from app.config import settings
+from app.model_keys import fallback_chain, filter_scope, scope_rank, scoped_key
+from app.model_registry import ModelRegistry, ModelVersion
+from app.prediction_cache import PredictionCache
+from app.shared_models import attached_segment
 from app.models import (
     TrainingDataPoint,
     PredictionRequest,
@@ -21,275 +27,611 @@ from app.models import (
 
 logger = logging.getLogger(__name__)
 
+# Outbreak probability bands: searchsorted(RISK_THRESHOLDS, p, side="right")
+# gives the band index used for both the risk level and the case multiplier.
+RISK_THRESHOLDS = np.array([0.4, 0.6, 0.8])
+RISK_LEVELS_BY_BAND = [
+    RiskLevelEnum.LOW,
+    RiskLevelEnum.MEDIUM,
+    RiskLevelEnum.HIGH,
+    RiskLevelEnum.CRITICAL,
+]
+CASE_MULTIPLIERS_BY_BAND = np.array([0.8, 1.2, 1.8, 2.5])
+
+# Recommendations: the risk level's list, then any conditional ones, up to 5
+RECOMMENDATIONS_BY_LEVEL = {
+    RiskLevelEnum.CRITICAL: [
+        "🚨 Activate emergency response protocol immediately",
+        "📞 Alert Ministry of Health for outbreak investigation",
+        "🏥 Prepare isolation wards and ICU beds",
+        "💉 Begin mass vaccination campaign",
+        "📊 Increase surveillance frequency to daily"
+    ],
+    RiskLevelEnum.HIGH: [
+        "⚠️  Increase health facility preparedness",
+        "📋 Stockpile medical supplies and medications",
+        "👥 Alert community health workers",
+        "📊 Begin weekly surveillance monitoring",
+        "🎓 Conduct public health education"
+    ],
+    RiskLevelEnum.MEDIUM: [
+        "👁️  Maintain elevated surveillance",
+        "📦 Review and update supply inventory",
+        "🏥 Train healthcare workers on protocols",
+        "📊 Monitor trend every 2-3 days"
+    ],
+    RiskLevelEnum.LOW: ["✅ Continue routine surveillance"],
+}
+CONDITIONAL_RECOMMENDATIONS = {
+    "mosquito_control": "🦟 Increase mosquito control measures",  # temperature > 30, malaria
+    "water_quality": "💧 Enhance water quality monitoring",        # humidity > 70, rainfall > 100
+    "low_vaccination": "💉 Accelerate vaccination campaigns",      # vaccination_rate < 50
+}
+
+
+def fit_naive_bayes(
+    X: np.ndarray,
+    y: np.ndarray,
+    test_size: float = 0.2,
+    random_state: int = 42
+) -> Tuple[GaussianNB, StandardScaler, Dict]:
+    """
+    Fit a scaler + GaussianNB pair and evaluate it on a held-out split.
+    
+    Module-level and side-effect free so it can run in a worker process.
+    """
+    # If we only have 1 class or too few samples, do a basic split without stratify
+    unique_classes = np.unique(y)
+    if len(unique_classes) < 2 or len(y) < 5:
+        # Mock high accuracy evaluate to prevent train_test_split crash on low dataset
+        scaler = StandardScaler()
+        X_scaled = scaler.fit_transform(X)
+        model = GaussianNB()
+        model.fit(X_scaled, y)
+        accuracy = 1.0
+        precision = 1.0
+        recall = 1.0
+        f1 = 1.0
+        X_train = X
+        X_test = X
+        y_pred = y
+        y_test = y
+    else:
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=test_size, random_state=random_state, stratify=y
+        )
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train)
+        X_test_scaled = scaler.transform(X_test)
+        
+        model = GaussianNB()
+        model.fit(X_train_scaled, y_train)
+        
+        y_pred = model.predict(X_test_scaled)
+        accuracy = accuracy_score(y_test, y_pred)
+        precision = precision_score(y_test, y_pred, zero_division=0)
+        recall = recall_score(y_test, y_pred, zero_division=0)
+        f1 = f1_score(y_test, y_pred, zero_division=0)
+    
+    evaluation = {
+        "accuracy": float(accuracy),
+        "precision": float(precision),
+        "recall": float(recall),
+        "f1_score": float(f1),
+        "training_samples": len(X_train),
+        "test_samples": len(X_test),
+        "metrics": {
+            "true_positives": int(np.sum((y_pred == 1) & (y_test == 1))),
+            "true_negatives": int(np.sum((y_pred == 0) & (y_test == 0))),
+            "false_positives": int(np.sum((y_pred == 1) & (y_test == 0))),
+            "false_negatives": int(np.sum((y_pred == 0) & (y_test == 1)))
+        }
+    }
+    return model, scaler, evaluation
+
+
+def _confusion_cell(y_true: np.ndarray, y_pred: np.ndarray, cell: Tuple[int, int]) -> int:
+    return int(confusion_matrix(y_true, y_pred, labels=[False, True])[cell])
+
+
+# Fold-level scorers; confusion cells are summed across folds afterwards
+CV_SCORING = {
+    "accuracy": "accuracy",
+    "precision": make_scorer(precision_score, zero_division=0),
+    "recall": make_scorer(recall_score, zero_division=0),
+    "f1_score": make_scorer(f1_score, zero_division=0),
+    "true_negatives": make_scorer(_confusion_cell, cell=(0, 0)),
+    "false_positives": make_scorer(_confusion_cell, cell=(0, 1)),
+    "false_negatives": make_scorer(_confusion_cell, cell=(1, 0)),
+    "true_positives": make_scorer(_confusion_cell, cell=(1, 1)),
+}
+CV_METRICS = ("accuracy", "precision", "recall", "f1_score")
+CV_CONFUSION = ("true_positives", "true_negatives", "false_positives", "false_negatives")
+
+
+def cross_validate_naive_bayes(
+    X: np.ndarray,
+    y: np.ndarray,
+    n_folds: Optional[int] = None,
+    var_smoothing_grid: Optional[Sequence[float]] = None,
+    n_jobs: Optional[int] = None,
+    random_state: int = 42
+) -> Tuple[GaussianNB, StandardScaler, Dict]:
+    """
+    Select var_smoothing by stratified k-fold cross-validation and refit.
+    
+    Every (fold, candidate) fit runs in parallel via joblib, so wall-clock
+    time is bounded by core count rather than folds x grid size. The scaler
+    is fitted inside each fold, so held-out rows never leak into scaling.
+    The winner (best mean F1) is refitted on all rows.
+    """
+    n_folds = n_folds or settings.CV_FOLDS
+    grid = list(var_smoothing_grid or settings.CV_VAR_SMOOTHING_GRID)
+    n_jobs = settings.CV_N_JOBS if n_jobs is None else n_jobs
+    
+    _, class_counts = np.unique(y, return_counts=True)
+    if len(class_counts) < 2:
+        raise ValueError("Cross-validation needs examples of both outcomes")
+    # Every fold needs at least one row of the minority class
+    folds = min(n_folds, int(class_counts.min()))
+    if folds < 2:
+        raise ValueError(
+            f"Too few minority-class samples ({class_counts.min()}) for cross-validation"
+        )
+    
+    search = GridSearchCV(
+        Pipeline([("scaler", StandardScaler()), ("model", GaussianNB())]),
+        param_grid={"model__var_smoothing": grid},
+        scoring=CV_SCORING,
+        refit="f1_score",
+        cv=StratifiedKFold(n_splits=folds, shuffle=True, random_state=random_state),
+        n_jobs=n_jobs,
+    )
+    search.fit(X, y)
+    results = search.cv_results_
+    best = search.best_index_
+    
+    per_fold = [
+        {
+            "fold": i,
+            **{m: float(results[f"split{i}_test_{m}"][best]) for m in CV_METRICS},
+        }
+        for i in range(folds)
+    ]
+    aggregate = {
+        m: {
+            "mean": float(results[f"mean_test_{m}"][best]),
+            "std": float(results[f"std_test_{m}"][best]),
+        }
+        for m in CV_METRICS
+    }
+    confusion = {
+        c: int(sum(results[f"split{i}_test_{c}"][best] for i in range(folds)))
+        for c in CV_CONFUSION
+    }
+    
+    evaluation = {
+        **{m: aggregate[m]["mean"] for m in CV_METRICS},
+        "training_samples": len(y),
+        # Each row is held out exactly once across the folds
+        "test_samples": len(y),
+        "metrics": confusion,
+        "training_mode": "cross_validation",
+        "cross_validation": {
+            "folds": folds,
+            "var_smoothing": float(search.best_params_["model__var_smoothing"]),
+            "per_fold": per_fold,
+            "aggregate": aggregate,
+            "grid": [
+                {
+                    "var_smoothing": float(results["param_model__var_smoothing"][i]),
+                    "f1_mean": float(results["mean_test_f1_score"][i]),
+                    "f1_std": float(results["std_test_f1_score"][i]),
+                }
+                for i in range(len(grid))
+            ],
+        },
+    }
+    pipeline = search.best_estimator_
+    return pipeline.named_steps["model"], pipeline.named_steps["scaler"], evaluation
+
+
+def _merge_moments(
+    n_a: np.ndarray,
+    mean_a: np.ndarray,
+    var_a: np.ndarray,
+    n_b: np.ndarray,
+    mean_b: np.ndarray,
+    var_b: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Combine count/mean/variance of two sample sets (Chan et al. parallel
+    form of Welford's update) without revisiting the original rows.
+    """
+    n = n_a + n_b
+    safe_n = np.where(n > 0, n, 1)
+    delta = mean_b - mean_a
+    mean = mean_a + delta * (n_b / safe_n)
+    m2 = var_a * n_a + var_b * n_b + np.square(delta) * (n_a * n_b / safe_n)
+    return n, mean, m2 / safe_n
+
+
+def update_naive_bayes(
+    model: GaussianNB,
+    scaler: StandardScaler,
+    X: np.ndarray,
+    y: np.ndarray
+) -> Tuple[GaussianNB, StandardScaler, Dict]:
+    """
+    Fold a batch of new observations into an existing scaler + GaussianNB.
+    
+    The scaler's running mean/variance and the per-class sufficient
+    statistics (count, mean, variance in raw feature space) are merged with
+    the batch, so the cost is O(new rows). The active model is not modified;
+    new estimator objects are returned. The batch is scored with the current
+    model before it is learned from (test-then-train evaluation).
+    """
+    unseen = set(np.unique(y).tolist()) - set(model.classes_.tolist())
+    if unseen:
+        raise ValueError(
+            f"Incremental update cannot introduce new classes {sorted(unseen)}; "
+            "run a full retrain instead"
+        )
+    
+    y_pred = model.predict(scaler.transform(X))
+    n_new = len(X)
+    
+    # Running scaler statistics
+    old_mean = scaler.mean_
+    old_scale = scaler.scale_
+    n_seen, mean, var = _merge_moments(
+        np.float64(scaler.n_samples_seen_), old_mean, scaler.var_,
+        np.float64(n_new), X.mean(axis=0), X.var(axis=0)
+    )
+    new_scaler = StandardScaler()
+    new_scaler.n_features_in_ = X.shape[1]
+    new_scaler.n_samples_seen_ = int(n_seen)
+    new_scaler.mean_ = mean
+    new_scaler.var_ = var
+    new_scaler.scale_ = np.where(var > 0, np.sqrt(var), 1.0)
+    
+    # Per-class statistics, mapped back to raw feature space with the
+    # variance smoothing stripped so they can be merged exactly
+    theta = model.theta_ * old_scale + old_mean
+    class_var = (model.var_ - model.epsilon_) * np.square(old_scale)
+    class_count = model.class_count_.astype(np.float64).copy()
+    for i, label in enumerate(model.classes_):
+        rows = X[y == label]
+        if len(rows) == 0:
+            continue
+        class_count[i], theta[i], class_var[i] = _merge_moments(
+            class_count[i], theta[i], class_var[i],
+            np.float64(len(rows)), rows.mean(axis=0), rows.var(axis=0)
+        )
+    
+    new_scale = new_scaler.scale_
+    epsilon = model.var_smoothing * np.max(var / np.square(new_scale))
+    new_model = GaussianNB(priors=model.priors, var_smoothing=model.var_smoothing)
+    new_model.classes_ = model.classes_.copy()
+    new_model.n_features_in_ = model.n_features_in_
+    new_model.class_count_ = class_count
+    new_model.class_prior_ = (
+        np.asarray(model.priors) if model.priors is not None
+        else class_count / class_count.sum()
+    )
+    new_model.theta_ = (theta - new_scaler.mean_) / new_scale
+    new_model.var_ = class_var / np.square(new_scale) + epsilon
+    new_model.epsilon_ = epsilon
+    
+    evaluation = {
+        "accuracy": float(accuracy_score(y, y_pred)),
+        "precision": float(precision_score(y, y_pred, zero_division=0)),
+        "recall": float(recall_score(y, y_pred, zero_division=0)),
+        "f1_score": float(f1_score(y, y_pred, zero_division=0)),
+        "training_samples": int(class_count.sum()),
+        "test_samples": n_new,
+        "training_mode": "incremental",
+        "metrics": {
+            "true_positives": int(np.sum((y_pred == 1) & (y == 1))),
+            "true_negatives": int(np.sum((y_pred == 0) & (y == 0))),
+            "false_positives": int(np.sum((y_pred == 1) & (y == 0))),
+            "false_negatives": int(np.sum((y_pred == 0) & (y == 1)))
+        }
+    }
+    return new_model, new_scaler, evaluation
+
 
 class MLModelManager:
     """
     Manages ML model lifecycle including training, saving, loading, and predictions
     """
     
-    def __init__(self, models_dir: str = "models"):
+    def __init__(
+        self,
+        models_dir: str = "models",
+        cache_size: Optional[int] = None,
+        cache_ttl_seconds: Optional[float] = None
+    ):
         """
         Initialize ML Model Manager
         
         Args:
             models_dir: Directory to store trained models
+            cache_size: Max cached predictions (defaults to PREDICTION_CACHE_SIZE)
+            cache_ttl_seconds: Cached prediction lifetime (defaults to PREDICTION_CACHE_TTL_SECONDS)
         """
         self.models_dir = Path(models_dir)
         self.models_dir.mkdir(parents=True, exist_ok=True)
         
-        # Store models and scalers in memory
-        self.models: Dict[str, GaussianNB] = {}
-        self.scalers: Dict[str, StandardScaler] = {}
-        self.model_metadata: Dict[str, dict] = {}
+        # Immutable (model, scaler, metadata) versions; models load lazily
+        self.registry = ModelRegistry(
+            self.models_dir,
+            history_limit=settings.MODEL_HISTORY_LIMIT,
+            retire_grace_seconds=settings.MODEL_RETIRE_GRACE_SECONDS,
+            max_loaded_models=settings.MODEL_CACHE_MAX_MODELS,
+            max_loaded_bytes=settings.MODEL_CACHE_MAX_BYTES,
+            shared=attached_segment(),
+        )
         
-        # Load metadata only (lazy load models)
-        self._load_metadata()
-    
-    def _get_model_path(self, disease: Optional[str] = None) -> Path:
-        """Get file path for model"""
-        model_name = disease if disease else "all_diseases"
-        return self.models_dir / f"naive_bayes_{model_name}.pkl"
-    
-    def _get_scaler_path(self, disease: Optional[str] = None) -> Path:
-        """Get file path for scaler"""
-        model_name = disease if disease else "all_diseases"
-        return self.models_dir / f"scaler_{model_name}.pkl"
-    
-    def _get_metadata_path(self, disease: Optional[str] = None) -> Path:
-        """Get file path for metadata"""
-        model_name = disease if disease else "all_diseases"
-        return self.models_dir / f"metadata_{model_name}.json"
-    
-    def _load_metadata(self):
-        """Load metadata for all models (lightweight)"""
-        try:
-            for meta_file in self.models_dir.glob("metadata_*.json"):
-                disease = meta_file.stem.replace("metadata_", "").replace("all_diseases", "")
-                if disease == "":
-                    disease_key = "all"
-                else:
-                    disease_key = disease
-                try:
-                    with open(meta_file, 'r') as f:
-                        self.model_metadata[disease_key] = json.load(f)
-                    logger.info(f"Loaded metadata for disease: {disease_key}")
-                except Exception as e:
-                    logger.warning(f"Failed to load metadata {disease_key}: {e}")
-        except Exception as e:
-            logger.warning(f"No existing metadata found: {e}")
-
-    def _get_or_load_model(self, disease_key: str):
-        """Lazy load model and scaler if not in memory"""
-        if disease_key in self.models:
-            return self.models[disease_key], self.scalers.get(disease_key)
-        
-        # Determine disease name from key
-        disease_name = None if disease_key == "all" else disease_key
-        
-        model_path = self._get_model_path(disease_name)
-        if not model_path.exists():
-            return None, None
-            
-        try:
-            model = joblib.load(model_path)
-            self.models[disease_key] = model
-            
-            scaler_path = self._get_scaler_path(disease_name)
-            if scaler_path.exists():
-                self.scalers[disease_key] = joblib.load(scaler_path)
-                
-            logger.info(f"Lazy loaded model for {disease_key}")
-            return model, self.scalers.get(disease_key)
-        except Exception as e:
-            logger.error(f"Failed to lazy load model {disease_key}: {e}")
-            return None, None
+        self.prediction_cache = PredictionCache(
+            max_size=settings.PREDICTION_CACHE_SIZE if cache_size is None else cache_size,
+            ttl_seconds=(
+                settings.PREDICTION_CACHE_TTL_SECONDS
+                if cache_ttl_seconds is None else cache_ttl_seconds
+            ),
+        )
+    
+    @property
+    def model_metadata(self) -> Dict[str, dict]:
+        """Metadata of the active version of every registered model"""
+        return self.registry.metadata()
+    
+    def _resolve_model(
+        self,
+        disease: str,
+        county: Optional[str] = None
+    ) -> Tuple[Optional[str], Optional[ModelVersion]]:
+        """
+        Most specific trained model for a request:
+        county+disease -> region+disease -> disease -> all
+        """
+        for model_key in fallback_chain(disease, county):
+            if model_key not in self.registry:
+                continue
+            model_version = self.registry.get(model_key)
+            if model_version is not None:
+                return model_key, model_version
+            logger.warning(f"Model {model_key} failed to load, trying a broader model")
+        return None, None
+    
+    def rollback_model(self, model_key: str, version: Optional[str] = None) -> Dict:
+        """Repoint a model key at a previous (or given) version"""
+        activated = self.registry.activate(model_key, version)
+        self.prediction_cache.clear()
+        return {
+            "model": model_key,
+            "active_version": activated.version,
+            "trained_at": activated.metadata.get("trained_at"),
+            "versions": self.registry.versions(model_key),
+        }
     
     def prepare_training_data(
         self,
-        training_data: List[TrainingDataPoint],
-        disease: Optional[DiseaseEnum] = None
+        training_data: Union[Sequence[TrainingDataPoint], TrainingColumns],
+        disease: Optional[DiseaseEnum] = None,
+        county: Optional[str] = None,
+        region: Optional[str] = None
     ) -> Tuple[np.ndarray, np.ndarray]:
         """
         Prepare data for training
-        """
-        if disease:
-            data = [d for d in training_data if d.disease == disease]
-        else:
-            data = training_data
-        
-        if not data:
-            raise ValueError(f"No training data available for disease: {disease}")
         
-        df = pd.DataFrame([d.dict() for d in data])
+        Accepts TrainingDataPoint rows or pre-built TrainingColumns; rows are
+        converted straight into NumPy columns and filtered by disease code.
+        County/region scoping needs rows, or columns read with county names.
+        """
+        if county or region:
+            if isinstance(training_data, TrainingColumns):
+                training_data = training_data.scoped(county=county, region=region)
+            else:
+                training_data = filter_scope(training_data, county=county, region=region)
+        if not isinstance(training_data, TrainingColumns):
+            training_data = TrainingColumns.from_points(training_data)
         
-        feature_cols = [
-            'temperature', 'humidity', 'rainfall',
-            'population_density', 'access_to_water', 'healthcare_coverage',
-            'previous_cases', 'vaccination_rate'
-        ]
+        X, y = training_data.select(disease)
         
-        X = df[feature_cols].values
-        y = df['outbreak_occurred'].values
+        if len(X) == 0:
+            raise ValueError(f"No training data available for disease: {disease}")
         
-        logger.info(f"Prepared {len(X)} samples with {len(feature_cols)} features")
+        logger.info(f"Prepared {len(X)} samples with {len(FEATURE_COLUMNS)} features")
         return X, y
     
     def train_model(
         self,
-        training_data: List[TrainingDataPoint],
+        training_data: Union[Sequence[TrainingDataPoint], TrainingColumns],
         disease: Optional[DiseaseEnum] = None,
         test_size: float = 0.2,
-        random_state: int = 42
+        random_state: int = 42,
+        cross_validation: bool = False,
+        cv_folds: Optional[int] = None,
+        county: Optional[str] = None,
+        region: Optional[str] = None
     ) -> Dict:
         """
         Train a Naive Bayes model
+        
+        With cross_validation, var_smoothing is chosen by parallel k-fold CV
+        and per-fold metrics are recorded instead of a single split. With a
+        county or region, only that scope's rows are used and the model is
+        published under a scoped key.
         """
         try:
-            X, y = self.prepare_training_data(training_data, disease)
-            
-            # If we only have 1 class or too few samples, do a basic split without stratify
-            unique_classes = np.unique(y)
-            if len(unique_classes) < 2 or len(y) < 5:
-                # Mock high accuracy evaluate to prevent train_test_split crash on low dataset
-                scaler = StandardScaler()
-                X_scaled = scaler.fit_transform(X)
-                model = GaussianNB()
-                model.fit(X_scaled, y)
-                accuracy = 1.0
-                precision = 1.0
-                recall = 1.0
-                f1 = 1.0
-                X_train = X
-                X_test = X
-                y_pred = y
-                y_test = y
-            else:
-                X_train, X_test, y_train, y_test = train_test_split(
-                    X, y, test_size=test_size, random_state=random_state, stratify=y
+            X, y = self.prepare_training_data(training_data, disease, county, region)
+            if cross_validation:
+                model, scaler, evaluation = cross_validate_naive_bayes(
+                    X, y, n_folds=cv_folds, random_state=random_state
                 )
-                scaler = StandardScaler()
-                X_train_scaled = scaler.fit_transform(X_train)
-                X_test_scaled = scaler.transform(X_test)
-                
-                model = GaussianNB()
-                model.fit(X_train_scaled, y_train)
-                
-                y_pred = model.predict(X_test_scaled)
-                accuracy = accuracy_score(y_test, y_pred)
-                precision = precision_score(y_test, y_pred, zero_division=0)
-                recall = recall_score(y_test, y_pred, zero_division=0)
-                f1 = f1_score(y_test, y_pred, zero_division=0)
-            
-            model_key = disease.value if disease else "all"
-            self.models[model_key] = model
-            self.scalers[model_key] = scaler
-            
-            model_path = self._get_model_path(disease.value if disease else None)
-            scaler_path = self._get_scaler_path(disease.value if disease else None)
-            
-            joblib.dump(model, model_path)
-            joblib.dump(scaler, scaler_path)
-            
-            metadata = {
-                "disease": disease.value if disease else "all_diseases",
-                "accuracy": float(accuracy),
-                "precision": float(precision),
-                "recall": float(recall),
-                "f1_score": float(f1),
-                "trained_at": datetime.now().isoformat(),
-                "training_samples": len(X_train),
-                "test_samples": len(X_test),
-                "features": [
-                    'temperature', 'humidity', 'rainfall',
-                    'population_density', 'access_to_water', 'healthcare_coverage',
-                    'previous_cases', 'vaccination_rate'
-                ]
-            }
-            self.model_metadata[model_key] = metadata
-            
-            meta_path = self._get_metadata_path(disease.value if disease else None)
-            with open(meta_path, 'w') as f:
-                json.dump(metadata, f, indent=2)
-            
-            logger.info(f"Model trained successfully for {disease or 'all diseases'}")
-            
+            else:
+                model, scaler, evaluation = fit_naive_bayes(X, y, test_size, random_state)
+            return self.publish_trained(
+                disease, model, scaler, evaluation, county=county, region=region
+            )
+        
+        except Exception as e:
+            logger.error(f"Model training failed: {e}")
             return {
-                "success": True,
-                "model_version": f"v{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-                "disease": disease.value if disease else None,
-                "accuracy": accuracy,
-                "precision": precision,
-                "recall": recall,
-                "f1_score": f1,
-                "training_samples": len(X_train),
-                "metrics": {
-                    "true_positives": int(np.sum((y_pred == 1) & (y_test == 1))),
-                    "true_negatives": int(np.sum((y_pred == 0) & (y_test == 0))),
-                    "false_positives": int(np.sum((y_pred == 1) & (y_test == 0))),
-                    "false_negatives": int(np.sum((y_pred == 0) & (y_test == 1)))
-                }
+                "success": False,
+                "error": str(e)
             }
+    
+    def update_model(
+        self,
+        training_data: Union[Sequence[TrainingDataPoint], TrainingColumns],
+        disease: Optional[DiseaseEnum] = None,
+        county: Optional[str] = None,
+        region: Optional[str] = None
+    ) -> Dict:
+        """
+        Incrementally update the active model with new observations only
+        """
+        try:
+            model_key = scoped_key(disease.value if disease else None, county, region)
+            current = self.registry.get(model_key)
+            if current is None or current.scaler is None:
+                raise ValueError(
+                    f"No trained model for {model_key}; run a full training first"
+                )
+            
+            X, y = self.prepare_training_data(training_data, disease, county, region)
+            model, scaler, evaluation = update_naive_bayes(
+                current.model, current.scaler, X, y
+            )
+            return self.publish_trained(
+                disease, model, scaler, evaluation, county=county, region=region
+            )
         
         except Exception as e:
-            logger.error(f"Model training failed: {e}")
+            logger.error(f"Incremental model update failed: {e}")
             return {
                 "success": False,
                 "error": str(e)
             }
     
+    def publish_trained(
+        self,
+        disease: Optional[DiseaseEnum],
+        model: GaussianNB,
+        scaler: StandardScaler,
+        evaluation: Dict,
+        county: Optional[str] = None,
+        region: Optional[str] = None
+    ) -> Dict:
+        """
+        Register a fitted model as the active version and build the training result
+        """
+        model_key = scoped_key(disease.value if disease else None, county, region)
+        metadata = {
+            "disease": disease.value if disease else "all_diseases",
+            "county": county,
+            "region": None if county else region,
+            "accuracy": evaluation["accuracy"],
+            "precision": evaluation["precision"],
+            "recall": evaluation["recall"],
+            "f1_score": evaluation["f1_score"],
+            "trained_at": datetime.now().isoformat(),
+            "training_samples": evaluation["training_samples"],
+            "test_samples": evaluation["test_samples"],
+            "training_mode": evaluation.get("training_mode", "full"),
+            "features": list(FEATURE_COLUMNS)
+        }
+        if "cross_validation" in evaluation:
+            metadata["cross_validation"] = evaluation["cross_validation"]
+        published = self.registry.publish(model_key, model, scaler, metadata)
+        self.prediction_cache.clear()
+        
+        logger.info(f"Model trained successfully for {disease or 'all diseases'}")
+        
+        return {
+            "success": True,
+            "model_key": model_key,
+            "model_version": published.version,
+            "disease": disease.value if disease else None,
+            "accuracy": evaluation["accuracy"],
+            "precision": evaluation["precision"],
+            "recall": evaluation["recall"],
+            "f1_score": evaluation["f1_score"],
+            "training_samples": evaluation["training_samples"],
+            "metrics": evaluation["metrics"],
+            "cross_validation": evaluation.get("cross_validation")
+        }
+    
+    @staticmethod
+    def _request_features(prediction_request: PredictionRequest) -> List[float]:
+        """Feature row for a request, ordered as FEATURE_COLUMNS"""
+        return [getattr(prediction_request, col) for col in FEATURE_COLUMNS]
+    
+    @staticmethod
+    def _mock_probability(prediction_request: PredictionRequest) -> float:
+        """Deterministic placeholder probability used when no model is trained"""
+        import random
+        random.seed(hash(f"{prediction_request.county}-{prediction_request.disease}"))
+        return random.uniform(0.1, 0.9)
+    
+    @staticmethod
+    def _classify_risk(outbreak_prob: float, previous_cases: int) -> Tuple[RiskLevelEnum, int]:
+        """Map an outbreak probability to a risk level and estimated case count"""
+        band = int(np.searchsorted(RISK_THRESHOLDS, outbreak_prob, side="right"))
+        estimated_cases = int(previous_cases * CASE_MULTIPLIERS_BY_BAND[band])
+        return RISK_LEVELS_BY_BAND[band], estimated_cases
+    
+    @staticmethod
+    def _cache_key(
+        prediction_request: PredictionRequest,
+        model_version: ModelVersion,
+        features: List[float]
+    ) -> tuple:
+        """Cache key: disease, serving model and its version, quantized features"""
+        quantum = settings.PREDICTION_CACHE_QUANTUM
+        return (
+            prediction_request.disease.value,
+            model_version.key,
+            model_version.version,
+            model_version.metadata.get("trained_at"),
+            tuple(round(value / quantum) for value in features),
+        )
+    
+    @staticmethod
+    def _model_version(model_version: Optional[ModelVersion]) -> str:
+        metadata = model_version.metadata if model_version is not None else {}
+        return f"NaiveBayes_{metadata.get('trained_at', 'unknown')[:10]}"
+    
     def predict(self, prediction_request: PredictionRequest) -> PredictionResponse:
         """
         Make a prediction using trained model
         """
         try:
-            model_key = prediction_request.disease.value
-            model, scaler = self._get_or_load_model(model_key)
-            
-            if not model:
-                logger.warning(f"No model for {model_key}, trying general model")
-                model_key = "all"
-                model, scaler = self._get_or_load_model(model_key)
+            # One registry read: model, scaler and metadata always belong together
+            _, model_version = self._resolve_model(
+                prediction_request.disease.value, prediction_request.county
+            )
             
-            # If still no model, train a quick fallback mock prediction
-            if not model:
-                # Generate a smart mock prediction to keep system functional
-                import random
-                random.seed(hash(f"{prediction_request.county}-{prediction_request.disease}"))
-                prob = random.uniform(0.1, 0.9)
-                confidence = max(prob, 1 - prob)
-                predicted = random.choice([True, False])
-                outbreak_prob = prob
-                prediction = predicted
+            # If still no model, fall back to a mock prediction to keep system functional
+            cache_key = None
+            if model_version is None:
+                outbreak_prob = self._mock_probability(prediction_request)
             else:
-                features = np.array([[
-                    prediction_request.temperature,
-                    prediction_request.humidity,
-                    prediction_request.rainfall,
-                    prediction_request.population_density,
-                    prediction_request.access_to_water,
-                    prediction_request.healthcare_coverage,
-                    prediction_request.previous_cases,
-                    prediction_request.vaccination_rate
-                ]])
-                
-                if scaler:
-                    features = scaler.transform(features)
-                
-                outbreak_prob = model.predict_proba(features)[0][1]
-                prediction = model.predict(features)[0]
+                features = self._request_features(prediction_request)
+                cache_key = self._cache_key(prediction_request, model_version, features)
+                cached = self.prediction_cache.get(cache_key)
+                if cached is not None:
+                    return cached.model_copy(update={
+                        "county": prediction_request.county,
+                        "created_at": datetime.now(),
+                    })
+                outbreak_prob, _ = model_version.compiled.score_one(features)
             
-            if outbreak_prob >= 0.8:
-                risk_level = RiskLevelEnum.CRITICAL
-                estimated_cases = int(prediction_request.previous_cases * 2.5)
-            elif outbreak_prob >= 0.6:
-                risk_level = RiskLevelEnum.HIGH
-                estimated_cases = int(prediction_request.previous_cases * 1.8)
-            elif outbreak_prob >= 0.4:
-                risk_level = RiskLevelEnum.MEDIUM
-                estimated_cases = int(prediction_request.previous_cases * 1.2)
-            else:
-                risk_level = RiskLevelEnum.LOW
-                estimated_cases = int(prediction_request.previous_cases * 0.8)
+            risk_level, estimated_cases = self._classify_risk(
+                outbreak_prob, prediction_request.previous_cases
+            )
             
             recommendations = self._generate_recommendations(
                 prediction_request,
@@ -297,9 +639,6 @@ class MLModelManager:
                 outbreak_prob
             )
             
-            metadata = self.model_metadata.get(model_key, {})
-            model_version = metadata.get("trained_at", "unknown")[:10]
-            
             response = PredictionResponse(
                 county=prediction_request.county,
                 disease=prediction_request.disease,
@@ -307,68 +646,256 @@ class MLModelManager:
                 outbreak_probability=round(outbreak_prob, 4),
                 confidence_score=round(max(outbreak_prob, 1 - outbreak_prob), 4),
                 predicted_cases=estimated_cases,
-                model_version=f"NaiveBayes_{model_version}",
+                model_version=self._model_version(model_version),
+                registry_version=model_version.version if model_version is not None else None,
                 recommendations=recommendations
             )
             
+            if cache_key is not None:
+                self.prediction_cache.put(cache_key, response)
+            
             return response
         
         except Exception as e:
             logger.error(f"Prediction failed: {e}")
             raise
     
+    def _score_batch(
+        self,
+        prediction_requests: List[PredictionRequest]
+    ) -> Tuple[np.ndarray, np.ndarray, List[str], List[Optional[str]]]:
+        """
+        Features, outbreak probabilities, model version labels and registry
+        versions per row.
+        
+        Rows are grouped by disease model so each compiled model scores the
+        stacked feature matrix in one pass.
+        """
+        n_rows = len(prediction_requests)
+        features = np.array(
+            [self._request_features(r) for r in prediction_requests],
+            dtype=np.float64
+        )
+        probabilities = np.empty(n_rows, dtype=np.float64)
+        row_versions: List[str] = [""] * n_rows
+        row_registry_versions: List[Optional[str]] = [None] * n_rows
+        
+        # Group rows by the model that will score them (county shards,
+        # regional and disease fallbacks resolve to the same key)
+        groups: Dict[Optional[str], List[int]] = {}
+        resolved: Dict[Optional[str], Optional[ModelVersion]] = {}
+        chains: Dict[tuple, Optional[str]] = {}
+        for i, request in enumerate(prediction_requests):
+            scope = (request.disease.value, request.county)
+            if scope not in chains:
+                model_key, model_version = self._resolve_model(*scope)
+                chains[scope] = model_key
+                resolved[model_key] = model_version
+            groups.setdefault(chains[scope], []).append(i)
+        
+        for model_key, indices in groups.items():
+            model_version = resolved[model_key]
+            
+            rows = np.asarray(indices)
+            if model_version is None:
+                probabilities[rows] = [
+                    self._mock_probability(prediction_requests[i]) for i in indices
+                ]
+            else:
+                probabilities[rows] = model_version.compiled.outbreak_probability(
+                    features[rows]
+                )
+            
+            version_label = self._model_version(model_version)
+            registry_version = model_version.version if model_version is not None else None
+            for i in indices:
+                row_versions[i] = version_label
+                row_registry_versions[i] = registry_version
+        
+        return features, probabilities, row_versions, row_registry_versions
+    
+    def predict_batch(
+        self,
+        prediction_requests: List[PredictionRequest]
+    ) -> List[PredictionResponse]:
+        """
+        Score many requests at once.
+        
+        Risk bands and estimated cases are derived from the batch scores
+        with array operations, then one PredictionResponse is built per row.
+        """
+        try:
+            if not prediction_requests:
+                return []
+            
+            features, probabilities, row_versions, row_registry_versions = \
+                self._score_batch(prediction_requests)
+            bands = np.searchsorted(RISK_THRESHOLDS, probabilities, side="right")
+            previous_cases = features[:, FEATURE_COLUMNS.index('previous_cases')]
+            estimated_cases = (previous_cases * CASE_MULTIPLIERS_BY_BAND[bands]).astype(np.int64)
+            rounded_probs = np.round(probabilities, 4)
+            confidences = np.round(np.maximum(probabilities, 1 - probabilities), 4)
+            
+            responses = []
+            for i, request in enumerate(prediction_requests):
+                risk_level = RISK_LEVELS_BY_BAND[bands[i]]
+                responses.append(PredictionResponse(
+                    county=request.county,
+                    disease=request.disease,
+                    risk_level=risk_level,
+                    outbreak_probability=float(rounded_probs[i]),
+                    confidence_score=float(confidences[i]),
+                    predicted_cases=int(estimated_cases[i]),
+                    model_version=row_versions[i],
+                    registry_version=row_registry_versions[i],
+                    recommendations=self._generate_recommendations(
+                        request, risk_level, probabilities[i]
+                    )
+                ))
+            
+            return responses
+        
+        except Exception as e:
+            logger.error(f"Batch prediction failed: {e}")
+            raise
+    
+    def predict_batch_columns(self, prediction_requests: List[PredictionRequest]) -> Dict:
+        """
+        Score many requests and return parallel arrays instead of row objects.
+        
+        Each PredictionResponse field becomes one array (NumPy where
+        numeric), so no per-row model is built and the result can be
+        serialized directly with orjson. Recommendation lists repeat a lot,
+        so they are dictionary-encoded: `recommendations[i]` indexes into
+        `recommendation_sets`.
+        """
+        try:
+            n_rows = len(prediction_requests)
+            features, probabilities, row_versions, row_registry_versions = \
+                self._score_batch(prediction_requests) if n_rows \
+                else (np.empty((0, len(FEATURE_COLUMNS))), np.empty(0), [], [])
+            bands = np.searchsorted(RISK_THRESHOLDS, probabilities, side="right")
+            column = {name: features[:, i] for i, name in enumerate(FEATURE_COLUMNS)}
+            estimated_cases = (
+                column['previous_cases'] * CASE_MULTIPLIERS_BY_BAND[bands]
+            ).astype(np.int64)
+            
+            # Recommendations depend only on the band and three feature flags
+            is_malaria = np.fromiter(
+                (r.disease == DiseaseEnum.MALARIA for r in prediction_requests),
+                dtype=bool, count=n_rows
+            )
+            flags = np.stack([
+                bands,
+                (column['temperature'] > 30) & is_malaria,
+                (column['humidity'] > 70) & (column['rainfall'] > 100),
+                column['vaccination_rate'] < 50,
+            ], axis=1).astype(np.int64) if n_rows else np.empty((0, 4), dtype=np.int64)
+            unique_flags, recommendation_codes = np.unique(flags, axis=0, return_inverse=True)
+            recommendation_sets = [
+                self._recommendations_for(RISK_LEVELS_BY_BAND[band], *map(bool, rest))
+                for band, *rest in unique_flags
+            ]
+            
+            level_values = np.array([level.value for level in RISK_LEVELS_BY_BAND])
+            return {
+                "count": n_rows,
+                "created_at": datetime.now().isoformat(),
+                "county": [r.county for r in prediction_requests],
+                "disease": [r.disease.value for r in prediction_requests],
+                "risk_level": level_values[bands].tolist(),
+                "outbreak_probability": np.round(probabilities, 4),
+                "confidence_score": np.round(np.maximum(probabilities, 1 - probabilities), 4),
+                "predicted_cases": estimated_cases,
+                "model_version": row_versions,
+                "registry_version": row_registry_versions,
+                "recommendations": recommendation_codes.reshape(-1),
+                "recommendation_sets": recommendation_sets,
+            }
+        
+        except Exception as e:
+            logger.error(f"Columnar batch prediction failed: {e}")
+            raise
+    
     @staticmethod
     def _generate_recommendations(
         request: PredictionRequest,
         risk_level: RiskLevelEnum,
         probability: float
     ) -> List[str]:
-        recommendations = []
-        if risk_level == RiskLevelEnum.CRITICAL:
-            recommendations.extend([
-                "🚨 Activate emergency response protocol immediately",
-                "📞 Alert Ministry of Health for outbreak investigation",
-                "🏥 Prepare isolation wards and ICU beds",
-                "💉 Begin mass vaccination campaign",
-                "📊 Increase surveillance frequency to daily"
-            ])
-        elif risk_level == RiskLevelEnum.HIGH:
-            recommendations.extend([
-                "⚠️  Increase health facility preparedness",
-                "📋 Stockpile medical supplies and medications",
-                "👥 Alert community health workers",
-                "📊 Begin weekly surveillance monitoring",
-                "🎓 Conduct public health education"
-            ])
-        elif risk_level == RiskLevelEnum.MEDIUM:
-            recommendations.extend([
-                "👁️  Maintain elevated surveillance",
-                "📦 Review and update supply inventory",
-                "🏥 Train healthcare workers on protocols",
-                "📊 Monitor trend every 2-3 days"
-            ])
-        else:
-            recommendations.append("✅ Continue routine surveillance")
-        
-        if request.temperature > 30 and request.disease == DiseaseEnum.MALARIA:
-            recommendations.append("🦟 Increase mosquito control measures")
-        
-        if request.humidity > 70 and request.rainfall > 100:
-            recommendations.append("💧 Enhance water quality monitoring")
-        
-        if request.vaccination_rate < 50:
-            recommendations.append("💉 Accelerate vaccination campaigns")
+        return MLModelManager._recommendations_for(
+            risk_level,
+            mosquito_control=request.temperature > 30 and request.disease == DiseaseEnum.MALARIA,
+            water_quality=request.humidity > 70 and request.rainfall > 100,
+            low_vaccination=request.vaccination_rate < 50
+        )
+    
+    @staticmethod
+    def _recommendations_for(
+        risk_level: RiskLevelEnum,
+        mosquito_control: bool,
+        water_quality: bool,
+        low_vaccination: bool
+    ) -> List[str]:
+        recommendations = list(RECOMMENDATIONS_BY_LEVEL[risk_level])
+        if mosquito_control:
+            recommendations.append(CONDITIONAL_RECOMMENDATIONS["mosquito_control"])
+        if water_quality:
+            recommendations.append(CONDITIONAL_RECOMMENDATIONS["water_quality"])
+        if low_vaccination:
+            recommendations.append(CONDITIONAL_RECOMMENDATIONS["low_vaccination"])
         
         return recommendations[:5]
     
+    def export_params(self) -> Dict:
+        """
+        Scoring parameters of the active per-disease and all-disease models.
+        
+        Everything a client needs to reproduce predict() for those models
+        offline (the backend's fallback scorer): the scaler-folded kernel
+        arrays, risk bands, case multipliers and recommendation texts.
+        County and region shards are left out.
+        """
+        models = {}
+        for key in self.registry.keys():
+            if scope_rank(key) > 1:
+                continue
+            model_version = self.registry.get(key)
+            if model_version is None:
+                continue
+            compiled = model_version.compiled
+            models[key] = {
+                "version": model_version.version,
+                "model_version": self._model_version(model_version),
+                "classes": np.asarray(compiled.classes).tolist(),
+                "theta": np.asarray(compiled.theta).tolist(),
+                "inv_var": np.asarray(compiled.inv_var).tolist(),
+                "log_norm": np.asarray(compiled.log_norm).tolist(),
+            }
+        return {
+            "generated_at": datetime.now().isoformat(),
+            "feature_columns": FEATURE_COLUMNS,
+            "risk_thresholds": RISK_THRESHOLDS.tolist(),
+            "risk_levels": [level.value for level in RISK_LEVELS_BY_BAND],
+            "case_multipliers": CASE_MULTIPLIERS_BY_BAND.tolist(),
+            "recommendations_by_level": {
+                level.value: texts for level, texts in RECOMMENDATIONS_BY_LEVEL.items()
+            },
+            "conditional_recommendations": CONDITIONAL_RECOMMENDATIONS,
+            "models": models,
+        }
+    
     def get_model_status(self) -> Dict:
         status = {
             "models": {},
-            "last_update": None
+            "last_update": None,
+            "prediction_cache": self.prediction_cache.stats(),
+            "model_cache": self.registry.cache_stats()
         }
         
         for disease, metadata in self.model_metadata.items():
             status["models"][disease] = {
+                "version": metadata.get("version"),
                 "trained_at": metadata.get("trained_at"),
                 "accuracy": metadata.get("accuracy"),
                 "training_samples": metadata.get("training_samples"),
@@ -0,0 +1,43 @@
+"""
+Memory-bounded LRU of loaded model versions
+
+With per-county and per-region model shards there can be far more models
+on disk than should be resident at once. Loaded versions are kept in an LRU
+bounded by count and by estimated array bytes; a miss is reported to the
+caller, which loads the version from disk and puts it back.
+"""
+
+from typing import Any, Callable, Dict
+
+from app.lru_cache import BoundedLRU
+
+
+class ModelCache(BoundedLRU):
+    """
+    Thread-safe LRU bounded by entry count and total size in bytes
+    """
+
+    def __init__(
+        self,
+        max_models: int,
+        max_bytes: int = 0,
+        sizeof: Callable[[Any], int] = lambda value: 0
+    ):
+        super().__init__(max(1, max_models), max_bytes=max_bytes, sizeof=sizeof)
+
+    @property
+    def max_models(self) -> int:
+        return self.max_entries
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self),
+            "max_models": self.max_models,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate(),
+        }
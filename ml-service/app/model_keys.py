@@ -0,0 +1,108 @@
+"""
+Model keys and scoped fallback
+
+Models can be trained for a disease within one county or one region, as
+well as per disease and across all diseases. Keys are filesystem- and
+URL-safe because they double as registry directory names:
+
+    county__kisumu__Malaria   ->  region__nyanza__Malaria  ->  Malaria  ->  all
+
+A prediction uses the most specific model that exists along that chain.
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence, TypeVar
+
+from app.models import TrainingDataPoint
+
+ALL_MODELS_KEY = "all"
+
+# Former provinces, matching the backend's KENYA_COUNTIES regions
+COUNTY_REGIONS = {
+    "Mombasa": "Coast", "Kwale": "Coast", "Kilifi": "Coast", "Tana River": "Coast",
+    "Lamu": "Coast", "Taita-Taveta": "Coast",
+    "Garissa": "North Eastern", "Wajir": "North Eastern", "Mandera": "North Eastern",
+    "Marsabit": "Eastern", "Isiolo": "Eastern", "Meru": "Eastern",
+    "Tharaka-Nithi": "Eastern", "Embu": "Eastern", "Kitui": "Eastern",
+    "Machakos": "Eastern", "Makueni": "Eastern",
+    "Nyandarua": "Central", "Nyeri": "Central", "Kirinyaga": "Central",
+    "Murang'a": "Central", "Kiambu": "Central",
+    "Turkana": "Rift Valley", "West Pokot": "Rift Valley", "Samburu": "Rift Valley",
+    "Trans-Nzoia": "Rift Valley", "Uasin Gishu": "Rift Valley",
+    "Elgeyo-Marakwet": "Rift Valley", "Nandi": "Rift Valley", "Baringo": "Rift Valley",
+    "Laikipia": "Rift Valley", "Nakuru": "Rift Valley", "Narok": "Rift Valley",
+    "Kajiado": "Rift Valley", "Kericho": "Rift Valley", "Bomet": "Rift Valley",
+    "Kakamega": "Western", "Vihiga": "Western", "Bungoma": "Western", "Busia": "Western",
+    "Siaya": "Nyanza", "Kisumu": "Nyanza", "Homa Bay": "Nyanza", "Migori": "Nyanza",
+    "Kisii": "Nyanza", "Nyamira": "Nyanza",
+    "Nairobi": "Nairobi",
+}
+
+
+def slugify(name: str) -> str:
+    """'Homa Bay' -> 'homa-bay', "Murang'a" -> 'muranga'"""
+    return re.sub(r"[^a-z0-9]+", "-", name.lower().replace("'", "")).strip("-")
+
+
+_REGIONS_BY_SLUG = {slugify(county): region for county, region in COUNTY_REGIONS.items()}
+
+
+def region_for(county: str) -> Optional[str]:
+    return _REGIONS_BY_SLUG.get(slugify(county))
+
+
+def scoped_key(
+    disease: Optional[str] = None,
+    county: Optional[str] = None,
+    region: Optional[str] = None
+) -> str:
+    """Registry key for a disease (or all diseases), optionally scoped"""
+    base = disease or ALL_MODELS_KEY
+    if county:
+        return f"county__{slugify(county)}__{base}"
+    if region:
+        return f"region__{slugify(region)}__{base}"
+    return base
+
+
+def scope_rank(key: str) -> int:
+    """0 = all, 1 = disease, 2 = region, 3 = county (broadest first)"""
+    if key == ALL_MODELS_KEY:
+        return 0
+    if key.startswith("region__"):
+        return 2
+    if key.startswith("county__"):
+        return 3
+    return 1
+
+
+@lru_cache(maxsize=4096)
+def fallback_chain(disease: str, county: Optional[str] = None) -> Sequence[str]:
+    """Most specific to least specific model key for a request"""
+    chain: List[str] = []
+    if county:
+        chain.append(scoped_key(disease, county=county))
+        region = region_for(county)
+        if region:
+            chain.append(scoped_key(disease, region=region))
+    chain.extend([disease, ALL_MODELS_KEY])
+    return tuple(dict.fromkeys(chain))
+
+
+Point = TypeVar("Point", bound=TrainingDataPoint)
+
+
+def filter_scope(
+    points: Iterable[Point],
+    county: Optional[str] = None,
+    region: Optional[str] = None
+) -> List[Point]:
+    """Rows belonging to a county or region scope"""
+    if county:
+        target = slugify(county)
+        return [p for p in points if slugify(p.county) == target]
+    if region:
+        target = slugify(region)
+        return [p for p in points if slugify(region_for(p.county) or "") == target]
+    return list(points)
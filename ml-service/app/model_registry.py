@@ -0,0 +1,579 @@
+"""
+Versioned model registry
+
+Each trained (model, scaler, metadata) triple is published as an immutable
+ModelVersion. Serving reads resolve the active version from a manifest
+snapshot that writers replace wholesale, so a reader always sees one
+consistent version and never waits on training. Loaded versions live in a
+count/byte-bounded LRU (see app.model_cache) and are reloaded on a miss.
+
+On disk every version lives in its own directory:
+
+    models/
+        manifest.json                      <- flipped last, atomically
+        versions/<key>/<version>/
+            model.npy                      <- pickle-free, see app.artifacts
+            metadata.json
+
+The manifest records the active version, artifact path and sha256 checksum
+of the retained history per model key. Replicas sharing the volume poll the
+manifest's mtime/size (a cheap stat) and reload only the keys whose active
+version changed, so they converge on newly trained models without a
+restart. Writers take an exclusive flock on manifest.lock around the whole
+read-modify-write of the manifest, so concurrent publishes from different
+processes never drop each other's versions.
+
+Versions pruned from the history are not deleted at once: they are listed
+as retired in the manifest and their directories removed by a later publish
+once `retire_grace_seconds` have passed, so a replica that has not polled
+the new manifest yet can still load the version its snapshot points at.
+
+Legacy flat files (naive_bayes_<disease>.pkl, scaler_<disease>.pkl,
+metadata_<disease>.json) are registered as a "legacy" version on first start.
+Joblib files (legacy or from older versioned directories) remain loadable so
+existing deployments can be retrained into the new format at their own pace.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+from sklearn.naive_bayes import GaussianNB
+from sklearn.preprocessing import StandardScaler
+
+from app.artifacts import ARTIFACT_NAME, artifact_from_array, load_artifact, save_artifact
+from app.compiled_model import CompiledGaussianNB
+from app.model_cache import ModelCache
+from app.shared_models import SharedModelSegment
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are serialized within the process only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_LOCK_NAME = "manifest.lock"
+LEGACY_VERSION = "legacy"
+
+
+@dataclass(frozen=True)
+class ModelVersion:
+    """One immutable trained model version"""
+    key: str
+    version: str
+    model: GaussianNB
+    scaler: Optional[StandardScaler]
+    compiled: CompiledGaussianNB
+    metadata: dict = field(default_factory=dict)
+
+
+def model_nbytes(version: ModelVersion) -> int:
+    """Approximate resident size of a loaded version's parameter arrays"""
+    arrays = [
+        version.compiled.theta, version.compiled.inv_var, version.compiled.log_norm,
+        version.model.theta_, version.model.var_, version.model.class_prior_,
+    ]
+    if version.scaler is not None:
+        arrays.extend([version.scaler.mean_, version.scaler.scale_])
+    return int(sum(np.asarray(a).nbytes for a in arrays))
+
+
+class ModelRegistry:
+    """
+    In-memory registry of model versions with atomic pointer swaps
+    """
+
+    def __init__(
+        self,
+        models_dir: Path,
+        history_limit: int = 5,
+        max_loaded_models: int = 64,
+        max_loaded_bytes: int = 0,
+        shared: Optional[SharedModelSegment] = None,
+        retire_grace_seconds: float = 300.0,
+        clock: Callable[[], float] = time.time
+    ):
+        self.models_dir = Path(models_dir)
+        self.models_dir.mkdir(parents=True, exist_ok=True)
+        self.history_limit = max(1, history_limit)
+        # Pruned versions stay on disk this long for replicas still using them
+        self.retire_grace_seconds = max(0.0, retire_grace_seconds)
+        self._clock = clock
+        # Parameters placed in shared memory by the multi-worker launcher
+        self.shared = shared
+
+        # Writers (publish/activate) are serialized, across processes too
+        # (see _locked_manifest); reads are not. Loads of
+        # different keys run in parallel, each key behind its own lock, and
+        # only the manifest snapshot swap is serialized by _swap_lock.
+        self._write_lock = threading.Lock()
+        self._swap_lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+        # The manifest snapshot is replaced, never mutated, so readers need no
+        # lock; it names the active version of every key.
+        self._manifest_etag = self._stat_manifest()
+        self._manifest: Dict[str, dict] = self._read_manifest()
+        # Loaded (key, version) pairs, bounded; a recently active version
+        # usually stays resident, so a rollback is still a pointer swap.
+        self._models = ModelCache(
+            max_models=max_loaded_models,
+            max_bytes=max_loaded_bytes,
+            sizeof=model_nbytes,
+        )
+
+        self._poll_stop = threading.Event()
+        self._poll_thread: Optional[threading.Thread] = None
+
+    # ── Paths & manifest ────────────────────────────────────────────────────
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.models_dir / MANIFEST_NAME
+
+    def _version_dir(self, key: str, version: str) -> Path:
+        return self.models_dir / "versions" / key / version
+
+    def _stat_manifest(self) -> Optional[Tuple[int, int]]:
+        """Cheap change token for the manifest: (mtime_ns, size)"""
+        try:
+            stat = self.manifest_path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read_manifest_file(self) -> Optional[Dict[str, dict]]:
+        if not self.manifest_path.exists():
+            return None
+        try:
+            with open(self.manifest_path, "r") as f:
+                return json.load(f).get("models", {})
+        except Exception as e:
+            logger.warning(f"Failed to read model manifest: {e}")
+            return None
+
+    def _read_manifest(self) -> Dict[str, dict]:
+        models = self._read_manifest_file()
+        if models is not None:
+            return models
+        return self._migrate_legacy_files()
+
+    @contextmanager
+    def _locked_manifest(self):
+        """
+        Hold the writer lock of this process and an exclusive flock on the
+        sidecar lock file, so another process's read-modify-write of the
+        manifest cannot interleave with ours.
+        """
+        with self._write_lock:
+            with open(self.models_dir / MANIFEST_LOCK_NAME, "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _write_manifest(self, models: Dict[str, dict]) -> None:
+        """Write the manifest to a temp file and atomically replace the old one"""
+        tmp_path = self.manifest_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"updated_at": datetime.now().isoformat(), "models": models}, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+        self._manifest_etag = self._stat_manifest()
+
+    @staticmethod
+    def _checksum(path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return f"sha256:{digest.hexdigest()}"
+
+    def _migrate_legacy_files(self) -> Dict[str, dict]:
+        """Register pre-registry flat model files as 'legacy' versions"""
+        models: Dict[str, dict] = {}
+        for meta_file in self.models_dir.glob("metadata_*.json"):
+            name = meta_file.stem.replace("metadata_", "")
+            key = "all" if name == "all_diseases" else name
+            model_file = self.models_dir / f"naive_bayes_{name}.pkl"
+            if not model_file.exists():
+                continue
+            try:
+                with open(meta_file, "r") as f:
+                    metadata = json.load(f)
+            except Exception as e:
+                logger.warning(f"Failed to load metadata {key}: {e}")
+                continue
+            scaler_file = self.models_dir / f"scaler_{name}.pkl"
+            models[key] = {
+                "active": LEGACY_VERSION,
+                "versions": [{
+                    "version": LEGACY_VERSION,
+                    "model_path": model_file.name,
+                    "scaler_path": scaler_file.name if scaler_file.exists() else None,
+                    "metadata": metadata,
+                }],
+            }
+            logger.info(f"Registered legacy model files for: {key}")
+        return models
+
+    # ── Reads (lock-free) ───────────────────────────────────────────────────
+
+    def get(self, key: str) -> Optional[ModelVersion]:
+        """Active version for a model key, loading it from disk on a cache miss"""
+        entry = self._manifest.get(key)
+        if entry is None:
+            return None  # unknown keys never touch the cache or the disk
+        loaded = self._models.get((key, entry["active"]))
+        if loaded is not None:
+            return loaded
+        return self._load_active(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._manifest
+
+    def keys(self) -> List[str]:
+        return list(self._manifest.keys())
+
+    def is_loaded(self, key: str) -> bool:
+        """Whether the active version of a key is resident in memory"""
+        entry = self._manifest.get(key)
+        return entry is not None and (key, entry["active"]) in self._models
+
+    @property
+    def max_loaded_models(self) -> int:
+        return self._models.max_models
+
+    def cache_stats(self) -> dict:
+        return self._models.stats()
+
+    def metadata(self) -> Dict[str, dict]:
+        """Active version metadata per model key, without loading any model"""
+        result = {}
+        for key, entry in self._manifest.items():
+            record = self._find_version(entry, entry["active"])
+            if record is not None:
+                result[key] = {**record["metadata"], "version": record["version"]}
+        return result
+
+    def versions(self, key: str) -> List[dict]:
+        entry = self._manifest.get(key)
+        if entry is None:
+            return []
+        return [
+            {
+                "version": record["version"],
+                "active": record["version"] == entry["active"],
+                "trained_at": record["metadata"].get("trained_at"),
+                "accuracy": record["metadata"].get("accuracy"),
+            }
+            for record in entry["versions"]
+        ]
+
+    @staticmethod
+    def _find_version(entry: dict, version: str) -> Optional[dict]:
+        for record in entry["versions"]:
+            if record["version"] == version:
+                return record
+        return None
+
+    # ── Loading ─────────────────────────────────────────────────────────────
+
+    def _load_version(self, key: str, record: dict) -> ModelVersion:
+        cached = self._models.peek((key, record["version"]))
+        if cached is not None:
+            return cached
+        shared = self.shared.get(key, record["version"]) if self.shared is not None else None
+        if shared is not None:
+            # Verified by the launcher; views of memory shared by every worker
+            model, scaler, compiled = artifact_from_array(shared, f"shared:{key}@{record['version']}")
+        elif record.get("artifact_path"):
+            path = self.models_dir / record["artifact_path"]
+            if record.get("checksum") and self._checksum(path) != record["checksum"]:
+                raise ValueError(f"Checksum mismatch for {path}")
+            # Memory-mapped: arrays are views of the page cache, shared by workers
+            model, scaler, compiled = load_artifact(path)
+        else:
+            model = joblib.load(self.models_dir / record["model_path"])
+            scaler = None
+            if record.get("scaler_path"):
+                scaler = joblib.load(self.models_dir / record["scaler_path"])
+            compiled = CompiledGaussianNB.from_estimators(model, scaler)
+        loaded = ModelVersion(
+            key=key,
+            version=record["version"],
+            model=model,
+            scaler=scaler,
+            compiled=compiled,
+            metadata=record["metadata"],
+        )
+        self._models.put((key, loaded.version), loaded)
+        return loaded
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._swap_lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def _load_active(self, key: str) -> Optional[ModelVersion]:
+        with self._key_lock(key):
+            entry = self._manifest.get(key)
+            if entry is None:
+                return None
+            record = self._find_version(entry, entry["active"])
+            if record is None:
+                return None
+            # Another thread may have loaded it while we waited for the lock
+            loaded = self._models.peek((key, record["version"]))
+            if loaded is not None:
+                return loaded
+            try:
+                loaded = self._load_version(key, record)
+            except Exception as e:
+                logger.error(f"Failed to load model {key}@{record['version']}: {e}")
+                return None
+            logger.info(f"Loaded model {key}@{loaded.version}")
+            return loaded
+
+    def active_artifacts(self) -> List[Tuple[str, str, np.ndarray]]:
+        """
+        (key, version, flat array) for every active pickle-free artifact.
+
+        Checksums are verified here; used by the launcher to fill shared
+        memory. Legacy joblib versions and unreadable files are skipped.
+        """
+        artifacts = []
+        for key, entry in self._manifest.items():
+            record = self._find_version(entry, entry["active"])
+            if record is None or not record.get("artifact_path"):
+                continue
+            path = self.models_dir / record["artifact_path"]
+            try:
+                if record.get("checksum") and self._checksum(path) != record["checksum"]:
+                    raise ValueError(f"Checksum mismatch for {path}")
+                flat = np.load(path, mmap_mode="r", allow_pickle=False)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Not sharing model {key}@{record['version']}: {e}")
+                continue
+            artifacts.append((key, record["version"], flat))
+        return artifacts
+
+    # ── Writes ──────────────────────────────────────────────────────────────
+
+    def _new_version_id(self, key: str, manifest: Dict[str, dict]) -> str:
+        version = f"v{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        entry = manifest.get(key)
+        if entry is not None and self._find_version(entry, version) is not None:
+            version = f"{version}_{len(entry['versions'])}"
+        return version
+
+    def publish(
+        self,
+        key: str,
+        model: GaussianNB,
+        scaler: Optional[StandardScaler],
+        metadata: dict
+    ) -> ModelVersion:
+        """
+        Persist a new version and make it active.
+
+        Files go to a fresh versioned directory, the manifest is flipped
+        last, and only then is the in-memory pointer swapped.
+        """
+        compiled = CompiledGaussianNB.from_estimators(model, scaler)
+        with self._locked_manifest():
+            # Start from the file, not our snapshot: another replica may have
+            # published since we last polled. An empty manifest is still the file.
+            manifest = self._read_manifest_file()
+            if manifest is None:
+                manifest = copy.deepcopy(self._manifest)
+            version = self._new_version_id(key, manifest)
+            final_dir = self._version_dir(key, version)
+            tmp_dir = final_dir.with_name(f".{version}.tmp")
+            tmp_dir.mkdir(parents=True, exist_ok=False)
+            save_artifact(tmp_dir / ARTIFACT_NAME, model, scaler)
+            checksum = self._checksum(tmp_dir / ARTIFACT_NAME)
+            with open(tmp_dir / "metadata.json", "w") as f:
+                json.dump(metadata, f, indent=2)
+            os.replace(tmp_dir, final_dir)
+
+            relative_dir = final_dir.relative_to(self.models_dir)
+            record = {
+                "version": version,
+                "artifact_path": str(relative_dir / ARTIFACT_NAME),
+                "checksum": checksum,
+                "metadata": metadata,
+            }
+            entry = manifest.setdefault(key, {"active": version, "versions": []})
+            entry["versions"].append(record)
+            entry["active"] = version
+            pruned = entry["versions"][:-self.history_limit]
+            entry["versions"] = entry["versions"][-self.history_limit:]
+            now = self._clock()
+            entry.setdefault("retired", []).extend(
+                {"version": r["version"], "retired_at": now} for r in pruned
+            )
+            expired = self._expire_retired(manifest, now)
+            self._write_manifest(manifest)
+
+            published = ModelVersion(
+                key=key,
+                version=version,
+                model=model,
+                scaler=scaler,
+                compiled=compiled,
+                metadata=metadata,
+            )
+            self._models.put((key, version), published)
+            for record in pruned:
+                self._models.pop((key, record["version"]))
+            with self._swap_lock:
+                self._manifest = manifest
+
+        for expired_key, expired_version in expired:
+            self._remove_version(expired_key, expired_version)
+        logger.info(f"Published model {key}@{version}")
+        return published
+
+    def activate(self, key: str, version: Optional[str] = None) -> ModelVersion:
+        """
+        Repoint a model key at another retained version.
+
+        With no version, rolls back to the version published before the
+        currently active one.
+        """
+        with self._locked_manifest():
+            manifest = self._read_manifest_file()
+            if manifest is None:
+                manifest = copy.deepcopy(self._manifest)
+            entry = manifest.get(key)
+            if entry is None:
+                raise KeyError(f"No model registered for: {key}")
+            history = [record["version"] for record in entry["versions"]]
+            if version is None:
+                position = history.index(entry["active"])
+                if position == 0:
+                    raise ValueError(f"No earlier version of {key} to roll back to")
+                version = history[position - 1]
+            record = self._find_version(entry, version)
+            if record is None:
+                raise KeyError(f"Version {version} of {key} not found")
+
+            target = self._load_version(key, record)
+            entry["active"] = version
+            self._write_manifest(manifest)
+            with self._swap_lock:
+                self._manifest = manifest
+
+        logger.info(f"Activated model {key}@{version}")
+        return target
+
+    # ── Change polling ──────────────────────────────────────────────────────
+
+    def refresh(self) -> List[str]:
+        """
+        Pick up manifest changes made by other processes.
+
+        A stat of the manifest is compared with the last seen (mtime, size);
+        only when it differs is the manifest re-read. Keys whose active
+        version changed and whose previous version was resident are loaded
+        off the request path; everything else stays lazy, so memory stays
+        bounded however many shards exist. Returns the keys reloaded.
+        """
+        etag = self._stat_manifest()
+        if etag is None or etag == self._manifest_etag:
+            return []
+        manifest = self._read_manifest_file()
+        if manifest is None:
+            return []  # mid-write or corrupt; retried on the next poll
+
+        updates: Dict[str, ModelVersion] = {}
+        for key, entry in manifest.items():
+            previous = self._manifest.get(key)
+            if previous is None or previous["active"] == entry["active"]:
+                continue
+            if (key, previous["active"]) not in self._models:
+                continue  # not hot here; load on first use
+            record = self._find_version(entry, entry["active"])
+            if record is None:
+                continue
+            try:
+                updates[key] = self._load_version(key, record)
+            except Exception as e:
+                logger.error(f"Failed to reload model {key}@{record['version']}: {e}")
+                return []  # keep serving the old snapshot; retry next poll
+
+        with self._write_lock:
+            if self._stat_manifest() != etag:
+                return []  # changed again while loading; next poll catches up
+            with self._swap_lock:
+                self._manifest = manifest
+                self._manifest_etag = etag
+
+        for key, version in updates.items():
+            logger.info(f"Reloaded model {key}@{version.version} from manifest")
+        return list(updates)
+
+    def start_polling(self, interval_seconds: float) -> None:
+        """Poll the manifest for changes on a daemon thread"""
+        if interval_seconds <= 0 or self._poll_thread is not None:
+            return
+        self._poll_stop.clear()
+
+        def poll():
+            while not self._poll_stop.wait(interval_seconds):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.error(f"Manifest poll failed: {e}")
+
+        self._poll_thread = threading.Thread(target=poll, name="manifest-poller", daemon=True)
+        self._poll_thread.start()
+
+    def stop_polling(self) -> None:
+        self._poll_stop.set()
+        if self._poll_thread is not None:
+            self._poll_thread.join(timeout=5)
+            self._poll_thread = None
+
+    def _expire_retired(self, manifest: Dict[str, dict], now: float) -> List[Tuple[str, str]]:
+        """Drop retired versions past their grace period from `manifest`; returns them"""
+        expired = []
+        for key, entry in manifest.items():
+            if "retired" not in entry:
+                continue
+            keep = []
+            for retired in entry["retired"]:
+                if self._find_version(entry, retired["version"]) is not None:
+                    continue  # back in the history; no longer retired
+                if now - retired["retired_at"] < self.retire_grace_seconds:
+                    keep.append(retired)
+                else:
+                    expired.append((key, retired["version"]))
+            entry["retired"] = keep
+        return expired
+
+    def _remove_version(self, key: str, version: str) -> None:
+        if version == LEGACY_VERSION:
+            return
+        shutil.rmtree(self._version_dir(key, version), ignore_errors=True)
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional, List
+from typing import Literal, Optional, List
 from enum import Enum
 
 
@@ -39,6 +39,14 @@ class TrainingDataPoint(BaseModel):
     updated_at: Optional[datetime] = None
 
 
+class DataSourceRef(BaseModel):
+    """Where ml-service should read training rows itself (see app.data_sources)"""
+    type: Literal["database", "parquet"]
+    path: Optional[str] = None        # Parquet file or directory, under TRAINING_DATA_DIR
+    since: Optional[datetime] = None  # Only rows with date >= since
+    until: Optional[datetime] = None  # Only rows with date < until
+
+
 class PredictionRequest(BaseModel):
     county: str
     disease: DiseaseEnum
@@ -61,6 +69,7 @@ class PredictionResponse(BaseModel):
     confidence_score: float
     predicted_cases: int = 0
     model_version: str
+    registry_version: Optional[str] = None  # Model registry version, as in /model/status
     created_at: datetime = Field(default_factory=datetime.now)
     recommendations: List[str] = Field(default_factory=list)
 
@@ -0,0 +1,46 @@
+"""
+Bounded LRU + TTL cache for prediction responses
+
+Entries expire after a fixed time-to-live and the least recently used entry
+is evicted once the cache is full. Safe to share between the threadpool
+workers FastAPI runs sync endpoints on.
+"""
+
+import time
+from typing import Any, Callable, Dict
+
+from app.lru_cache import BoundedLRU
+
+
+class PredictionCache(BoundedLRU):
+    """
+    Thread-safe LRU cache with per-entry expiry and hit/miss counters
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        super().__init__(max_size, ttl_seconds=ttl_seconds, clock=clock)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @property
+    def max_size(self) -> int:
+        return self.max_entries
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hit_rate(),
+        }
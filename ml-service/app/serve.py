@@ -0,0 +1,64 @@
+"""
+Multi-process ml-service launcher
+
+    python -m app.serve --workers 4
+
+With more than one worker, active model parameters are copied once into
+shared memory before the workers start (see app.shared_models), and each
+worker sizes its inference pool to its share of the CPUs (see
+app.inference_pool). With one worker this is plain `uvicorn app.main:app`.
+"""
+
+import argparse
+import logging
+import os
+from pathlib import Path
+from typing import List, Optional
+
+import uvicorn
+
+from app.config import settings
+from app.model_registry import ModelRegistry
+from app.shared_models import SharedModelSegment
+
+logger = logging.getLogger(__name__)
+
+MODELS_DIR = "models"  # where app.main's MLModelManager keeps its registry
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run ml-service with N worker processes")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=settings.SERVE_WORKERS)
+    return parser.parse_args(argv)
+
+
+def share_models(models_dir: str = MODELS_DIR) -> Optional[SharedModelSegment]:
+    """Copy every active model into shared memory and export it to workers"""
+    registry = ModelRegistry(Path(models_dir), history_limit=settings.MODEL_HISTORY_LIMIT)
+    segment = SharedModelSegment.publish(registry.active_artifacts())
+    if segment is not None:
+        os.environ.update(segment.environ())
+    return segment
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args(argv)
+    workers = max(1, args.workers)
+    # Workers read SERVE_WORKERS to size their inference pools
+    os.environ["SERVE_WORKERS"] = str(workers)
+
+    segment = None
+    if workers > 1 and settings.SHARED_MODELS:
+        segment = share_models()
+    try:
+        uvicorn.run("app.main:app", host=args.host, port=args.port, workers=workers)
+    finally:
+        if segment is not None:
+            segment.close()
+
+
+if __name__ == "__main__":
+    main()
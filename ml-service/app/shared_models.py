@@ -0,0 +1,129 @@
+"""
+Shared-memory model parameters for multi-worker serving
+
+`python -m app.serve --workers N` runs N uvicorn worker processes. Before
+they start, the launcher copies the flat artifact array (see app.artifacts)
+of every active model version into one multiprocessing.shared_memory
+segment and passes its name and index to the workers through the
+environment. Each worker attaches read-only and builds its estimators
+around views of the segment, so the parameters exist once in RAM however
+many workers run, and no worker opens or checksums those artifact files.
+
+Versions published after launch are not in the segment; workers load them
+from their memory-mapped files as usual. Legacy joblib models are never
+shared.
+"""
+
+import json
+import logging
+import os
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_ENV = "ML_SHARED_MODELS_SEGMENT"
+INDEX_ENV = "ML_SHARED_MODELS_INDEX"
+ITEM_SIZE = np.dtype(np.float64).itemsize
+
+
+def _slot(key: str, version: str) -> str:
+    return f"{key}@{version}"
+
+
+class SharedModelSegment:
+    """
+    One shared-memory block holding the flat artifact arrays of many versions
+    """
+
+    def __init__(
+        self,
+        shm: shared_memory.SharedMemory,
+        index: Dict[str, Tuple[int, int]],
+        owner: bool = False
+    ):
+        self.shm = shm
+        self.index = index      # "key@version" -> (offset, length) in float64 items
+        self.owner = owner      # only the launcher unlinks the segment
+        n_items = sum(length for _, length in index.values())
+        self._data = np.ndarray((n_items,), dtype=np.float64, buffer=shm.buf)
+        if not owner:
+            self._data.flags.writeable = False
+
+    @classmethod
+    def publish(cls, artifacts: List[Tuple[str, str, np.ndarray]]) -> Optional["SharedModelSegment"]:
+        """
+        Copy (key, version, flat array) artifacts into a new segment.
+
+        Launcher side; returns None when there is nothing to share.
+        """
+        if not artifacts:
+            return None
+        index: Dict[str, Tuple[int, int]] = {}
+        offset = 0
+        for key, version, flat in artifacts:
+            index[_slot(key, version)] = (offset, int(flat.shape[0]))
+            offset += int(flat.shape[0])
+
+        shm = shared_memory.SharedMemory(create=True, size=offset * ITEM_SIZE)
+        segment = cls(shm, index, owner=True)
+        for key, version, flat in artifacts:
+            start, length = index[_slot(key, version)]
+            segment._data[start:start + length] = flat
+        segment._data.flags.writeable = False
+        logger.info(
+            f"Shared {len(index)} model versions ({offset * ITEM_SIZE} bytes) "
+            f"in segment {shm.name}"
+        )
+        return segment
+
+    @classmethod
+    def attach(cls, name: str, index: Dict[str, Tuple[int, int]]) -> "SharedModelSegment":
+        """Worker side: map an existing segment read-only"""
+        try:
+            # Python 3.13+: the launcher owns cleanup, not this process
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, {slot: tuple(span) for slot, span in index.items()})
+
+    def environ(self) -> Dict[str, str]:
+        """Environment variables that let worker processes attach"""
+        return {SEGMENT_ENV: self.shm.name, INDEX_ENV: json.dumps(self.index)}
+
+    def get(self, key: str, version: str) -> Optional[np.ndarray]:
+        """Read-only flat artifact array for a version, if it was shared"""
+        span = self.index.get(_slot(key, version))
+        if span is None:
+            return None
+        start, length = span
+        return self._data[start:start + length]
+
+    def close(self) -> None:
+        self._data = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+_attached: Optional[SharedModelSegment] = None
+
+
+def attached_segment() -> Optional[SharedModelSegment]:
+    """
+    The segment the launcher shared with this process, if any.
+
+    Attached once per process and kept open for its lifetime.
+    """
+    global _attached
+    name = os.environ.get(SEGMENT_ENV)
+    if _attached is None and name:
+        try:
+            _attached = SharedModelSegment.attach(name, json.loads(os.environ[INDEX_ENV]))
+            logger.info(f"Attached shared model segment {name} ({len(_attached.index)} versions)")
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"Could not attach shared model segment {name}: {e}")
+            os.environ.pop(SEGMENT_ENV, None)
+    return _attached
@@ -0,0 +1,223 @@
+"""
+Asynchronous training jobs
+
+Training requests are accepted immediately and fitted in a process pool, so
+a full retrain of every disease model runs in parallel across cores while
+the API keeps serving predictions from the currently active versions. Each
+model is published to the registry as soon as its own fit completes.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Union
+
+from app.columnar import TrainingColumns
+from app.config import settings
+from app.data_sources import load_training_columns
+from app.ml_service import MLModelManager, cross_validate_naive_bayes, fit_naive_bayes
+from app.model_keys import ALL_MODELS_KEY, filter_scope
+from app.models import DataSourceRef, DiseaseEnum, TrainingDataPoint
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TrainingJob:
+    """Progress and results of one training job"""
+    id: str
+    targets: List[str]
+    status: str = "queued"
+    results: Dict[str, dict] = field(default_factory=dict)
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    def to_dict(self) -> dict:
+        results = dict(self.results)  # snapshot; the job thread keeps writing
+        finished = len(results)
+        failed = sum(1 for r in results.values() if not r.get("success"))
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "targets": self.targets,
+            "progress": {
+                "total": len(self.targets),
+                "finished": finished,
+                "failed": failed,
+                "fraction": round(finished / len(self.targets), 4) if self.targets else 1.0,
+            },
+            "results": results,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class TrainingJobManager:
+    """
+    Runs training jobs on a shared process pool and tracks their progress
+    """
+
+    def __init__(
+        self,
+        ml_manager: MLModelManager,
+        max_workers: Optional[int] = None,
+        history_limit: int = 50
+    ):
+        self.ml_manager = ml_manager
+        self.max_workers = max_workers or settings.TRAINING_MAX_WORKERS or os.cpu_count() or 1
+        self.history_limit = history_limit
+        self._jobs: Dict[str, TrainingJob] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: never fork a process that is running server threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def submit(
+        self,
+        training_data: Optional[Union[Sequence[TrainingDataPoint], TrainingColumns]] = None,
+        disease: Optional[DiseaseEnum] = None,
+        train_all: bool = False,
+        test_size: float = 0.2,
+        random_state: int = 42,
+        cross_validation: bool = False,
+        cv_folds: Optional[int] = None,
+        county: Optional[str] = None,
+        region: Optional[str] = None,
+        data_source: Optional[DataSourceRef] = None
+    ) -> TrainingJob:
+        """
+        Queue a training job and return immediately.
+
+        With train_all, every DiseaseEnum model plus the combined model is
+        fitted in parallel; otherwise only the requested model is trained.
+        With cross_validation, each target runs the k-fold var_smoothing
+        search instead of a single split. A county or region restricts the
+        rows and publishes scoped models. A data_source is read by the job
+        itself instead of passing training_data.
+        """
+        if (training_data is None) == (data_source is None):
+            raise ValueError("Provide exactly one of training_data or data_source")
+        if train_all:
+            targets = [d.value for d in DiseaseEnum] + [ALL_MODELS_KEY]
+        else:
+            targets = [disease.value if disease else ALL_MODELS_KEY]
+
+        job = TrainingJob(id=uuid.uuid4().hex, targets=targets)
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.history_limit:
+                oldest = next(iter(self._jobs))
+                if self._jobs[oldest].status in ("queued", "running"):
+                    break
+                del self._jobs[oldest]
+
+        threading.Thread(
+            target=self._run,
+            args=(job, training_data, test_size, random_state, cross_validation, cv_folds,
+                  county, region, data_source),
+            name=f"training-job-{job.id[:8]}",
+            daemon=True,
+        ).start()
+        return job
+
+    def get(self, job_id: str) -> Optional[dict]:
+        job = self._jobs.get(job_id)
+        return job.to_dict() if job else None
+
+    def list_jobs(self) -> List[dict]:
+        return [job.to_dict() for job in list(self._jobs.values())]
+
+    def _run(
+        self,
+        job: TrainingJob,
+        training_data: Optional[Union[Sequence[TrainingDataPoint], TrainingColumns]],
+        test_size: float,
+        random_state: int,
+        cross_validation: bool = False,
+        cv_folds: Optional[int] = None,
+        county: Optional[str] = None,
+        region: Optional[str] = None,
+        data_source: Optional[DataSourceRef] = None
+    ) -> None:
+        job.status = "running"
+        job.started_at = datetime.now()
+        try:
+            executor = self._get_executor()
+            if data_source is not None:
+                # A lone disease target only needs that disease's rows
+                only = job.targets[0] if len(job.targets) == 1 else ALL_MODELS_KEY
+                training_data = load_training_columns(
+                    data_source,
+                    disease=None if only == ALL_MODELS_KEY else DiseaseEnum(only),
+                    with_counties=bool(county or region),
+                )
+            if county or region:
+                if isinstance(training_data, TrainingColumns):
+                    training_data = training_data.scoped(county=county, region=region)
+                else:
+                    training_data = filter_scope(training_data, county=county, region=region)
+            # Convert once; each target is then a cheap disease-code mask
+            if not isinstance(training_data, TrainingColumns):
+                training_data = TrainingColumns.from_points(training_data)
+            futures: Dict[Future, str] = {}
+            for target in job.targets:
+                disease = None if target == ALL_MODELS_KEY else DiseaseEnum(target)
+                try:
+                    X, y = self.ml_manager.prepare_training_data(training_data, disease)
+                except ValueError as e:
+                    job.results[target] = {"success": False, "skipped": True, "error": str(e)}
+                    continue
+                if cross_validation:
+                    # Targets already run in parallel; only a lone target fans out its folds
+                    n_jobs = None if len(job.targets) == 1 else 1
+                    future = executor.submit(
+                        cross_validate_naive_bayes, X, y, cv_folds, None, n_jobs, random_state
+                    )
+                else:
+                    future = executor.submit(fit_naive_bayes, X, y, test_size, random_state)
+                futures[future] = target
+
+            for future in as_completed(futures):
+                target = futures[future]
+                disease = None if target == ALL_MODELS_KEY else DiseaseEnum(target)
+                try:
+                    model, scaler, evaluation = future.result()
+                    job.results[target] = self.ml_manager.publish_trained(
+                        disease, model, scaler, evaluation, county=county, region=region
+                    )
+                except Exception as e:
+                    logger.error(f"Training job {job.id} failed for {target}: {e}")
+                    job.results[target] = {"success": False, "error": str(e)}
+
+            trained = [r for r in job.results.values() if r.get("success")]
+            job.status = "completed" if trained else "failed"
+        except Exception as e:
+            logger.error(f"Training job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = datetime.now()
+            logger.info(f"Training job {job.id} {job.status}")
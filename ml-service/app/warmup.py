@@ -0,0 +1,126 @@
+"""
+Startup model warm-up
+
+Models are otherwise loaded lazily by the first prediction that needs them,
+so the first callers after a restart pay the load latency. The warm-up
+loads every registered model concurrently in the background, optionally
+scores one row through each to fault in its pages, and reports progress;
+/ready stays 503 until it has finished.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import List, Optional
+
+from app.config import settings
+from app.ml_service import MLModelManager
+from app.model_keys import scope_rank
+
+logger = logging.getLogger(__name__)
+
+
+class ModelWarmup:
+    """
+    Loads all registered models in parallel and tracks readiness
+    """
+
+    def __init__(
+        self,
+        ml_manager: MLModelManager,
+        max_workers: Optional[int] = None,
+        dummy_prediction: Optional[bool] = None
+    ):
+        self.ml_manager = ml_manager
+        self.max_workers = max(1, max_workers or settings.WARMUP_MAX_WORKERS)
+        self.dummy_prediction = (
+            settings.WARMUP_DUMMY_PREDICTION if dummy_prediction is None else dummy_prediction
+        )
+        self.status = "pending"
+        self.targets: List[str] = []
+        self.loaded: List[str] = []
+        self.failed: List[str] = []
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set()
+
+    def start(self) -> None:
+        """Run the warm-up on a background thread (idempotent)"""
+        with self._lock:
+            if self.status != "pending":
+                return
+            self.status = "running"
+        threading.Thread(target=self.run, name="model-warmup", daemon=True).start()
+
+    def mark_ready(self) -> None:
+        """Skip warm-up entirely (WARMUP_ENABLED=false)"""
+        self.status = "skipped"
+        self._done.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def run(self) -> None:
+        """Load every registered model; blocks until all have been attempted"""
+        self.status = "running"
+        self.started_at = datetime.now()
+        registry = self.ml_manager.registry
+        # Broadest models first, and never more than the model cache holds,
+        # so county shards cannot evict the fallbacks everything relies on
+        self.targets = sorted(registry.keys(), key=scope_rank)[:registry.max_loaded_models]
+        try:
+            with ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="model-warmup"
+            ) as pool:
+                futures = {pool.submit(self._warm, key): key for key in self.targets}
+                for future in as_completed(futures):
+                    key = futures[future]
+                    try:
+                        future.result()
+                        self.loaded.append(key)
+                    except Exception as e:
+                        logger.error(f"Warm-up failed for model {key}: {e}")
+                        self.failed.append(key)
+            # Failed keys fall back to the combined/mock path rather than
+            # keeping the pod out of rotation forever.
+            self.status = "ready"
+        except Exception as e:
+            logger.error(f"Model warm-up failed: {e}")
+            self.status = "failed"
+        finally:
+            self.finished_at = datetime.now()
+            self._done.set()
+            logger.info(
+                f"Model warm-up {self.status}: {len(self.loaded)}/{len(self.targets)} loaded"
+            )
+
+    def _warm(self, key: str) -> None:
+        version = self.ml_manager.registry.get(key)
+        if version is None:
+            raise RuntimeError(f"Model {key} could not be loaded")
+        if self.dummy_prediction:
+            # Touches every parameter page and the scoring code path
+            version.compiled.score_one(version.compiled.theta[0])
+
+    def to_dict(self) -> dict:
+        total = len(self.targets)
+        done = len(self.loaded) + len(self.failed)
+        return {
+            "ready": self.ready,
+            "status": self.status,
+            "progress": {
+                "total": total,
+                "loaded": len(self.loaded),
+                "failed": len(self.failed),
+                "fraction": round(done / total, 4) if total else (1.0 if self.ready else 0.0),
+            },
+            "failed_models": list(self.failed),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
@@ -0,0 +1,236 @@
+"""
+Training pipeline benchmark
+===========================
+Times each stage of model training on synthetic data from 1e3 to 1e7 rows:
+
+    generate   synthetic columns (not part of the pipeline, reported for scale)
+    prepare    MLModelManager.prepare_training_data from TrainingDataPoint rows
+               (up to --max-point-rows) and from pre-built TrainingColumns
+    fit        fit_naive_bayes (scaler + GaussianNB + held-out evaluation)
+    persist    ModelRegistry.publish (artifact, checksum, manifest)
+    load       cold ModelRegistry.get + first score (maps and faults in pages)
+
+Each size runs in its own subprocess so the recorded peak RSS belongs to
+that size alone. Results are written as JSON.
+
+Run from ml-service/:
+    python benchmarks/bench_training.py
+    python benchmarks/bench_training.py --sizes 1000 100000 --repeat 3 --output out.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import sklearn
+
+from app.columnar import DISEASES, FEATURE_COLUMNS, TrainingColumns
+from app.ml_service import MLModelManager, fit_naive_bayes
+from app.model_registry import ModelRegistry
+from app.models import TrainingDataPoint
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+# Building pydantic rows costs ~1 KB each; beyond this only columns are used
+DEFAULT_MAX_POINT_ROWS = 1_000_000
+
+
+def synthetic_columns(n_rows: int, seed: int = 7) -> TrainingColumns:
+    """Vectorised synthetic data: hot, wet, under-vaccinated rows break out"""
+    rng = np.random.default_rng(seed)
+    low = np.array([15, 30, 0, 10, 20, 20, 0, 10], dtype=np.float64)
+    high = np.array([38, 95, 250, 6000, 100, 100, 400, 95], dtype=np.float64)
+    features = rng.uniform(low, high, size=(n_rows, len(FEATURE_COLUMNS)))
+    features[:, FEATURE_COLUMNS.index("previous_cases")] = np.floor(
+        features[:, FEATURE_COLUMNS.index("previous_cases")]
+    )
+    temperature = features[:, FEATURE_COLUMNS.index("temperature")]
+    rainfall = features[:, FEATURE_COLUMNS.index("rainfall")]
+    vaccination = features[:, FEATURE_COLUMNS.index("vaccination_rate")]
+    labels = ((temperature > 27) & (rainfall > 90)) | (vaccination < 25)
+    labels ^= rng.random(n_rows) < 0.05  # label noise
+    disease_codes = rng.integers(0, len(DISEASES), size=n_rows, dtype=np.int8)
+    return TrainingColumns(features, labels, disease_codes)
+
+
+def synthetic_points(columns: TrainingColumns) -> List[TrainingDataPoint]:
+    """TrainingDataPoint rows mirroring the columns (construction is not timed)"""
+    previous_cases = FEATURE_COLUMNS.index("previous_cases")
+    return [
+        TrainingDataPoint.model_construct(
+            county=f"County {i % 47}",
+            disease=DISEASES[code],
+            outbreak_occurred=bool(label),
+            **{
+                col: (int(row[j]) if j == previous_cases else float(row[j]))
+                for j, col in enumerate(FEATURE_COLUMNS)
+            },
+        )
+        for i, (row, label, code) in enumerate(
+            zip(columns.features, columns.labels, columns.disease_codes)
+        )
+    ]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def best_of(repeat: int, fn) -> tuple:
+    """Minimum wall time over `repeat` runs, and the last result"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def run_size(n_rows: int, repeat: int, max_point_rows: int, seed: int) -> Dict:
+    """Benchmark every stage for one dataset size (run in a fresh process)"""
+    baseline_rss = peak_rss_mb()
+    timings: Dict[str, float] = {}
+
+    start = time.perf_counter()
+    columns = synthetic_columns(n_rows, seed)
+    timings["generate"] = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as models_dir:
+        manager = MLModelManager(models_dir=models_dir, cache_size=0)
+
+        if n_rows <= max_point_rows:
+            points = synthetic_points(columns)
+            timings["prepare_points"], _ = best_of(
+                repeat, lambda: manager.prepare_training_data(points)
+            )
+            del points
+        timings["prepare_columns"], (X, y) = best_of(
+            repeat, lambda: manager.prepare_training_data(columns)
+        )
+
+        timings["fit"], (model, scaler, evaluation) = best_of(
+            repeat, lambda: fit_naive_bayes(X, y)
+        )
+
+        registry = ModelRegistry(Path(models_dir))
+        timings["persist"], published = best_of(
+            repeat, lambda: registry.publish("all", model, scaler, {"rows": n_rows})
+        )
+
+        def cold_load():
+            version = ModelRegistry(Path(models_dir)).get("all")
+            version.compiled.score_one(X[0])
+            return version
+
+        timings["load"], _ = best_of(repeat, cold_load)
+        artifact_bytes = sum(
+            f.stat().st_size for f in Path(models_dir).rglob("model.npy")
+        ) // max(1, len(registry.versions("all")))
+
+    return {
+        "rows": n_rows,
+        "rows_per_disease": n_rows // len(DISEASES),
+        "timings_seconds": {stage: round(t, 6) for stage, t in timings.items()},
+        "rows_per_second": {
+            stage: round(n_rows / t) for stage, t in timings.items()
+            if stage not in ("persist", "load") and t > 0
+        },
+        "accuracy": round(evaluation["accuracy"], 4),
+        "artifact_bytes": artifact_bytes,
+        "baseline_rss_mb": baseline_rss,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_isolated(n_rows: int, args: argparse.Namespace) -> Dict:
+    """Run one size in a child interpreter so peak RSS is per size"""
+    command = [
+        sys.executable, str(Path(__file__).resolve()),
+        "--single", str(n_rows),
+        "--repeat", str(args.repeat),
+        "--max-point-rows", str(args.max_point_rows),
+        "--seed", str(args.seed),
+    ]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {"rows": n_rows, "error": completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout)
+
+
+def environment() -> Dict:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scikit_learn": sklearn.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the ml-service training pipeline")
+    parser.add_argument("--sizes", type=float, nargs="+", default=DEFAULT_SIZES,
+                        help="Row counts to benchmark (e.g. 1e3 1e5)")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="Runs per stage; the fastest is reported")
+    parser.add_argument("--max-point-rows", type=int, default=DEFAULT_MAX_POINT_ROWS,
+                        help="Largest size for which TrainingDataPoint rows are built")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="benchmarks/results/bench_training.json",
+                        help="JSON results path ('-' for stdout)")
+    parser.add_argument("--in-process", action="store_true",
+                        help="Run all sizes in this process (peak RSS becomes cumulative)")
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single is not None:
+        print(json.dumps(run_size(args.single, args.repeat, args.max_point_rows, args.seed)))
+        return
+
+    results = []
+    for size in (int(s) for s in args.sizes):
+        print(f"Benchmarking {size:,} rows...", file=sys.stderr)
+        if args.in_process:
+            result = run_size(size, args.repeat, args.max_point_rows, args.seed)
+        else:
+            result = run_isolated(size, args)
+        results.append(result)
+        if "error" in result:
+            print(f"  failed: {result['error']}", file=sys.stderr)
+            continue
+        stages = ", ".join(f"{k}={v:.3f}s" for k, v in result["timings_seconds"].items())
+        print(f"  {stages}, peak_rss={result['peak_rss_mb']} MB", file=sys.stderr)
+
+    report = {
+        "benchmark": "training_pipeline",
+        "generated_at": datetime.now().isoformat(),
+        "environment": environment(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output == "-":
+        print(json.dumps(report, indent=2))
+    else:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2))
+        print(f"Results written to {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
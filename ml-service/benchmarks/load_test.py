@@ -0,0 +1,293 @@
+"""
+Inference load test
+===================
+Drives POST /predict and POST /predict/batch at a fixed concurrency and
+reports latency percentiles, throughput and CPU time per request, so pod
+replicas and CPU/memory limits (k8s/ml-service.yaml, helm values) can be
+sized from measurements.
+
+Targets:
+    in-process (default)  the FastAPI app through httpx's ASGI transport,
+                          with synthetic models trained into a temp dir
+    --url URL             a running server, e.g. uvicorn on localhost;
+                          pass --server-pid to measure its CPU time
+
+Model state (in-process only):
+    cold   a fresh manager per run, so early requests pay model loads
+    warm   every model is loaded before the clock starts
+
+Requests mix diseases (--diseases Malaria=3,Cholera=1 ...) and counties,
+and use fresh random features so the prediction cache does not hide the
+model path (--cacheable reuses a small pool instead).
+
+Run from ml-service/:
+    python benchmarks/load_test.py --requests 2000 --concurrency 32
+    python benchmarks/load_test.py --url http://localhost:5000 --server-pid 1234
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+import numpy as np
+
+from app.model_keys import COUNTY_REGIONS
+from app.models import DiseaseEnum
+
+FEATURE_RANGES = {
+    "temperature": (15, 38),
+    "humidity": (30, 95),
+    "rainfall": (0, 250),
+    "population_density": (10, 6000),
+    "access_to_water": (20, 100),
+    "healthcare_coverage": (20, 100),
+    "vaccination_rate": (10, 95),
+}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Request generation
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def parse_disease_mix(spec: Optional[str]) -> Dict[str, float]:
+    """'Malaria=3,Cholera=1' -> weights; default is a uniform mix"""
+    if not spec:
+        return {d.value: 1.0 for d in DiseaseEnum}
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        mix[DiseaseEnum(name.strip()).value] = float(weight or 1)
+    return mix
+
+
+class RequestFactory:
+    """Random prediction payloads following a disease mix"""
+
+    def __init__(self, disease_mix: Dict[str, float], cacheable: bool, seed: int):
+        self.rng = random.Random(seed)
+        self.diseases = list(disease_mix)
+        self.weights = list(disease_mix.values())
+        self.counties = list(COUNTY_REGIONS)
+        self.pool = [self._fresh() for _ in range(64)] if cacheable else None
+
+    def _fresh(self) -> dict:
+        payload = {
+            "county": self.rng.choice(self.counties),
+            "disease": self.rng.choices(self.diseases, self.weights)[0],
+            "previous_cases": self.rng.randint(0, 400),
+        }
+        for field, (low, high) in FEATURE_RANGES.items():
+            payload[field] = round(self.rng.uniform(low, high), 3)
+        return payload
+
+    def one(self) -> dict:
+        return self.rng.choice(self.pool) if self.pool else self._fresh()
+
+    def batch(self, size: int) -> List[dict]:
+        return [self.one() for _ in range(size)]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# In-process target
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def train_synthetic_models(models_dir: str, rows: int) -> None:
+    """Train one model per disease plus the combined model"""
+    from app.ml_service import MLModelManager
+    from benchmarks.bench_training import synthetic_columns
+
+    manager = MLModelManager(models_dir=models_dir)
+    columns = synthetic_columns(rows)
+    for disease in DiseaseEnum:
+        manager.train_model(columns, disease=disease)
+    manager.train_model(columns)
+
+
+def in_process_client(models_dir: str, warm: bool) -> httpx.AsyncClient:
+    """Point the app at models_dir with a fresh manager and wrap it in ASGI transport"""
+    from app import main
+    from app.ml_service import MLModelManager
+    from app.warmup import ModelWarmup
+
+    main.ml_manager = MLModelManager(models_dir=models_dir)
+    main.warmup = ModelWarmup(main.ml_manager)
+    if warm:
+        main.warmup.run()
+    else:
+        main.warmup.mark_ready()
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=main.app), base_url="http://ml-service"
+    )
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Measurement
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def process_cpu_seconds(pid: Optional[int]) -> float:
+    """CPU time of this process, or of another process via /proc (Linux)"""
+    if pid is None:
+        return time.process_time()
+    fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    factory: RequestFactory,
+    n_requests: int,
+    concurrency: int,
+    batch_size: int,
+    cpu_pid: Optional[int]
+) -> Dict:
+    """Send n_requests from `concurrency` workers; batch_size > 1 uses /predict/batch"""
+    latencies: List[float] = []
+    errors = 0
+    remaining = n_requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            if batch_size > 1:
+                path, body = "/predict/batch", factory.batch(batch_size)
+            else:
+                path, body = "/predict", factory.one()
+            start = time.perf_counter()
+            try:
+                response = await client.post(path, json=body)
+                response.raise_for_status()
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    cpu_start = process_cpu_seconds(cpu_pid)
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall_start
+    cpu = process_cpu_seconds(cpu_pid) - cpu_start
+
+    completed = len(latencies)
+    ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    rows = completed * batch_size
+    return {
+        "endpoint": "/predict/batch" if batch_size > 1 else "/predict",
+        "batch_size": batch_size,
+        "concurrency": concurrency,
+        "requests": completed,
+        "errors": errors,
+        "wall_seconds": round(wall, 4),
+        "requests_per_second": round(completed / wall, 1) if wall else 0.0,
+        "rows_per_second": round(rows / wall, 1) if wall else 0.0,
+        "latency_ms": {
+            "p50": round(float(np.percentile(ms, 50)), 3),
+            "p95": round(float(np.percentile(ms, 95)), 3),
+            "p99": round(float(np.percentile(ms, 99)), 3),
+            "max": round(float(ms.max()), 3),
+            "mean": round(float(ms.mean()), 3),
+        },
+        "cpu_ms_per_request": round(cpu * 1000 / completed, 4) if completed else None,
+        "cpu_ms_per_row": round(cpu * 1000 / rows, 4) if rows else None,
+    }
+
+
+async def run_all(args: argparse.Namespace) -> List[Dict]:
+    factory = RequestFactory(parse_disease_mix(args.diseases), args.cacheable, args.seed)
+    shapes = []
+    if args.mode in ("single", "both"):
+        shapes.append(1)
+    if args.mode in ("batch", "both"):
+        shapes.append(args.batch_size)
+    # Batch requests carry batch_size rows each; send the same number of rows
+    requests_for = {1: args.requests, args.batch_size: max(1, args.requests // args.batch_size)}
+
+    results = []
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=30.0) as client:
+            for shape in shapes:
+                result = await run_scenario(
+                    client, factory, requests_for[shape], args.concurrency, shape,
+                    args.server_pid
+                )
+                results.append({"target": args.url, "models": "remote", **result})
+        return results
+
+    with tempfile.TemporaryDirectory() as models_dir:
+        print(f"Training synthetic models ({args.train_rows:,} rows)...", file=sys.stderr)
+        train_synthetic_models(models_dir, args.train_rows)
+        states = ["cold", "warm"] if args.models == "both" else [args.models]
+        for state in states:
+            for shape in shapes:
+                async with in_process_client(models_dir, warm=state == "warm") as client:
+                    result = await run_scenario(
+                        client, factory, requests_for[shape], args.concurrency, shape, None
+                    )
+                results.append({"target": "in-process", "models": state, **result})
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test ml-service prediction endpoints")
+    parser.add_argument("--url", help="Base URL of a running ml-service (default: in-process)")
+    parser.add_argument("--server-pid", type=int,
+                        help="PID of the server process to measure CPU time for (--url mode)")
+    parser.add_argument("--requests", type=int, default=2000,
+                        help="Single-row requests per scenario (batch scenarios send as many rows)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mode", choices=["single", "batch", "both"], default="both")
+    parser.add_argument("--batch-size", type=int, default=47,
+                        help="Rows per /predict/batch call (default: one per county)")
+    parser.add_argument("--models", choices=["cold", "warm", "both"], default="both",
+                        help="Model state for in-process runs")
+    parser.add_argument("--diseases", help="Disease mix, e.g. 'Malaria=3,Cholera=1'")
+    parser.add_argument("--cacheable", action="store_true",
+                        help="Reuse a small request pool so the prediction cache can hit")
+    parser.add_argument("--train-rows", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="benchmarks/results/load_test.json",
+                        help="JSON results path ('-' for stdout)")
+    args = parser.parse_args()
+    if args.batch_size < 2:
+        parser.error("--batch-size must be at least 2")
+
+    results = asyncio.run(run_all(args))
+    for r in results:
+        latency = r["latency_ms"]
+        print(
+            f"{r['models']:>6} {r['endpoint']:<15} c={r['concurrency']:<3} "
+            f"{r['requests_per_second']:>8} req/s {r['rows_per_second']:>9} rows/s  "
+            f"p50={latency['p50']}ms p95={latency['p95']}ms p99={latency['p99']}ms  "
+            f"cpu/req={r['cpu_ms_per_request']}ms errors={r['errors']}",
+            file=sys.stderr,
+        )
+
+    report = {
+        "benchmark": "inference_load",
+        "generated_at": datetime.now().isoformat(),
+        "cpu_count": os.cpu_count(),
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "results": results,
+    }
+    if args.output == "-":
+        print(json.dumps(report, indent=2))
+    else:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2))
+        print(f"Results written to {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
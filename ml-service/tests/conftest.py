@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+from app.ml_service import MLModelManager
+from app.models import DiseaseEnum, PredictionRequest, TrainingDataPoint
+
+
+def make_training_points(n: int = 200, seed: int = 7):
+    """Synthetic observations where hot, wet, under-vaccinated rows break out."""
+    rng = random.Random(seed)
+    diseases = list(DiseaseEnum)
+    points = []
+    for i in range(n):
+        temperature = rng.uniform(15, 38)
+        rainfall = rng.uniform(0, 250)
+        vaccination_rate = rng.uniform(10, 95)
+        outbreak = temperature > 27 and rainfall > 90 or vaccination_rate < 25
+        points.append(TrainingDataPoint(
+            county=f"County {i % 47}",
+            disease=diseases[i % len(diseases)],
+            temperature=temperature,
+            humidity=rng.uniform(30, 95),
+            rainfall=rainfall,
+            population_density=rng.uniform(10, 6000),
+            access_to_water=rng.uniform(20, 100),
+            healthcare_coverage=rng.uniform(20, 100),
+            previous_cases=rng.randint(0, 400),
+            vaccination_rate=vaccination_rate,
+            outbreak_occurred=outbreak,
+        ))
+    return points
+
+
+def make_prediction_request(disease=DiseaseEnum.MALARIA, **overrides):
+    fields = dict(
+        county="Kisumu",
+        disease=disease,
+        temperature=29.5,
+        humidity=78.0,
+        rainfall=140.0,
+        population_density=1200.0,
+        access_to_water=55.0,
+        healthcare_coverage=60.0,
+        previous_cases=150,
+        vaccination_rate=40.0,
+    )
+    fields.update(overrides)
+    return PredictionRequest(**fields)
+
+
+@pytest.fixture
+def training_points():
+    return make_training_points()
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return MLModelManager(models_dir=str(tmp_path / "models"))
+
+
+@pytest.fixture
+def trained_manager(manager, training_points):
+    assert manager.train_model(training_points)["success"]
+    assert manager.train_model(training_points, disease=DiseaseEnum.MALARIA)["success"]
+    return manager
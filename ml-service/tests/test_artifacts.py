@@ -0,0 +1,95 @@
+"""
+Tests for the pickle-free model artifact format
+===============================================
+Round trips through a memory-mapped .npy file must preserve predictions,
+and joblib-era versions must stay loadable.
+"""
+import json
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.naive_bayes import GaussianNB
+from sklearn.preprocessing import StandardScaler
+
+from app.artifacts import load_artifact, save_artifact
+from app.ml_service import MLModelManager, update_naive_bayes
+
+from tests.conftest import make_prediction_request
+
+
+@pytest.fixture
+def fitted():
+    rng = np.random.default_rng(3)
+    X = rng.normal(loc=[25, 65, 80, 1500, 70, 60, 50, 45],
+                   scale=[5, 15, 40, 900, 15, 15, 40, 20], size=(200, 8))
+    y = X[:, 0] > 25
+    scaler = StandardScaler().fit(X)
+    model = GaussianNB().fit(scaler.transform(X), y)
+    return model, scaler, X
+
+
+def test_round_trip_is_memory_mapped_and_exact(tmp_path, fitted):
+    model, scaler, X = fitted
+    path = tmp_path / "model.npy"
+    save_artifact(path, model, scaler)
+
+    loaded_model, loaded_scaler, compiled = load_artifact(path)
+    assert isinstance(compiled.theta, np.memmap)
+    assert isinstance(loaded_model.theta_, np.memmap)
+    assert loaded_model.classes_.dtype == bool
+    np.testing.assert_array_equal(
+        loaded_model.predict_proba(loaded_scaler.transform(X)),
+        model.predict_proba(scaler.transform(X)),
+    )
+    np.testing.assert_allclose(
+        compiled.predict_proba(X), model.predict_proba(scaler.transform(X)), rtol=1e-9
+    )
+
+
+def test_mapped_model_can_be_updated_incrementally(tmp_path, fitted):
+    model, scaler, X = fitted
+    path = tmp_path / "model.npy"
+    save_artifact(path, model, scaler)
+    loaded_model, loaded_scaler, _ = load_artifact(path)
+
+    updated_model, _, _ = update_naive_bayes(loaded_model, loaded_scaler, X[:50], X[:50, 0] > 25)
+    assert updated_model.class_count_.sum() == model.class_count_.sum() + 50
+    # The mapped source must be left untouched
+    np.testing.assert_array_equal(loaded_model.theta_, model.theta_)
+
+
+def test_rejects_foreign_files(tmp_path):
+    path = tmp_path / "model.npy"
+    np.save(path, np.arange(20, dtype=np.float64))
+    with pytest.raises(ValueError):
+        load_artifact(path)
+
+
+def test_joblib_versions_remain_loadable(trained_manager):
+    models_dir = trained_manager.models_dir
+    active = trained_manager.registry.get("Malaria")
+    record_dir = models_dir / "versions" / "Malaria" / "v_joblib"
+    record_dir.mkdir(parents=True)
+    joblib.dump(active.model, record_dir / "naive_bayes.pkl")
+    joblib.dump(active.scaler, record_dir / "scaler.pkl")
+
+    manifest_path = models_dir / "manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    manifest["models"]["Malaria"] = {
+        "active": "v_joblib",
+        "versions": [{
+            "version": "v_joblib",
+            "model_path": "versions/Malaria/v_joblib/naive_bayes.pkl",
+            "scaler_path": "versions/Malaria/v_joblib/scaler.pkl",
+            "metadata": active.metadata,
+        }],
+    }
+    manifest_path.write_text(json.dumps(manifest))
+
+    request = make_prediction_request()
+    reloaded = MLModelManager(models_dir=str(models_dir))
+    assert reloaded.registry.get("Malaria").version == "v_joblib"
+    assert reloaded.predict(request).outbreak_probability == pytest.approx(
+        trained_manager.predict(request).outbreak_probability
+    )
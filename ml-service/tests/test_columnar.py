@@ -0,0 +1,122 @@
+"""
+Tests for columnar training data
+================================
+"""
+import numpy as np
+import pytest
+
+from app.columnar import DISEASE_CODES, FEATURE_COLUMNS, TrainingColumns
+from app.models import DiseaseEnum
+
+
+def test_from_points_fills_columns_in_order(training_points):
+    columns = TrainingColumns.from_points(training_points)
+    assert columns.features.dtype == np.float64
+    assert columns.features[0, FEATURE_COLUMNS.index("rainfall")] == training_points[0].rainfall
+    assert columns.labels.tolist() == [p.outbreak_occurred for p in training_points]
+    assert columns.disease_codes[0] == DISEASE_CODES[training_points[0].disease]
+
+
+def test_select_filters_by_disease(training_points):
+    columns = TrainingColumns.from_points(training_points)
+    X, y = columns.select(DiseaseEnum.CHOLERA)
+    expected = [p for p in training_points if p.disease == DiseaseEnum.CHOLERA]
+    assert len(X) == len(y) == len(expected)
+    assert X[0, 0] == expected[0].temperature
+
+
+def test_from_arrays_validates_shapes():
+    with pytest.raises(ValueError):
+        TrainingColumns.from_arrays(np.zeros((3, 4)), np.zeros(3), np.zeros(3))
+    columns = TrainingColumns.from_arrays(
+        np.zeros((2, len(FEATURE_COLUMNS))), [0, 1], [DISEASE_CODES[DiseaseEnum.FLU]] * 2
+    )
+    assert columns.labels.dtype == bool
+    assert len(TrainingColumns.concatenate([columns, columns])) == 4
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Binary Streaming Format
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def test_stream_round_trip_across_arbitrary_chunk_boundaries(training_points):
+    from app.columnar_stream import FrameDecoder, iter_frames
+
+    columns = TrainingColumns.from_points(training_points)
+    body = b"".join(iter_frames(columns, chunk_rows=64))
+    decoder = FrameDecoder()
+    chunks = []
+    for start in range(0, len(body), 777):
+        chunks.extend(decoder.feed(body[start:start + 777]))
+    decoder.close()
+
+    assert decoder.frames == 4 and decoder.rows == len(training_points)
+    decoded = TrainingColumns.concatenate(chunks)
+    np.testing.assert_array_equal(decoded.features, columns.features)
+    np.testing.assert_array_equal(decoded.labels, columns.labels)
+    np.testing.assert_array_equal(decoded.disease_codes, columns.disease_codes)
+
+
+def test_stream_remaps_sender_disease_codes():
+    from app.columnar_stream import FrameDecoder, encode_frame
+
+    frame = encode_frame(
+        np.zeros((2, len(FEATURE_COLUMNS))), [True, False], [0, 1], ["Cholera", "Malaria"]
+    )
+    (chunk,) = FrameDecoder().feed(frame)
+    assert chunk.disease_codes.tolist() == [
+        DISEASE_CODES[DiseaseEnum.CHOLERA], DISEASE_CODES[DiseaseEnum.MALARIA]
+    ]
+
+    with pytest.raises(ValueError):
+        FrameDecoder().feed(encode_frame(np.zeros((1, 8)), [True], [0], ["Ebola"]))
+    decoder = FrameDecoder()
+    decoder.feed(frame[:-3])
+    with pytest.raises(ValueError):
+        decoder.close()
+
+
+def test_train_stream_endpoint(monkeypatch, tmp_path, training_points):
+    from fastapi.testclient import TestClient
+    from app import main
+    from app.columnar_stream import MEDIA_TYPE, iter_frames
+    from app.ml_service import MLModelManager
+
+    monkeypatch.setattr(main, "ml_manager", MLModelManager(models_dir=str(tmp_path)))
+    client = TestClient(main.app)
+    columns = TrainingColumns.from_points(training_points)
+
+    response = client.post(
+        "/train/stream",
+        params={"disease": "Malaria"},
+        content=iter_frames(columns, chunk_rows=50),
+        headers={"Content-Type": MEDIA_TYPE},
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["success"] and result["disease"] == "Malaria"
+    assert result["training_samples"] + main.ml_manager.model_metadata["Malaria"]["test_samples"] \
+        == int(np.sum(columns.disease_codes == DISEASE_CODES[DiseaseEnum.MALARIA]))
+
+    # County scoping needs the frames' counties array
+    scoped = {"disease": "Malaria", "county": training_points[0].county}
+    response = client.post(
+        "/train/stream", params=scoped,
+        content=iter_frames(columns, chunk_rows=50), headers={"Content-Type": MEDIA_TYPE},
+    )
+    assert response.json()["success"] is False
+
+    with_counties = TrainingColumns.from_arrays(
+        columns.features, columns.labels, columns.disease_codes,
+        [p.county for p in training_points],
+    )
+    response = client.post(
+        "/train/stream", params=scoped,
+        content=iter_frames(with_counties, chunk_rows=50), headers={"Content-Type": MEDIA_TYPE},
+    )
+    result = response.json()
+    assert result["success"] and "Malaria" in result["model_key"]
+    assert main.ml_manager.model_metadata[result["model_key"]]["county"] == scoped["county"]
+
+    assert client.post("/train/stream", content=b"{}",
+                       headers={"Content-Type": "application/json"}).status_code == 415
@@ -0,0 +1,54 @@
+"""
+Tests for the compiled Gaussian Naive Bayes kernel
+==================================================
+The scaler-folded kernel must reproduce sklearn's scaler + GaussianNB output.
+"""
+import numpy as np
+import pytest
+from sklearn.naive_bayes import GaussianNB
+from sklearn.preprocessing import StandardScaler
+
+from app.compiled_model import CompiledGaussianNB
+
+
+@pytest.fixture
+def fitted():
+    rng = np.random.default_rng(0)
+    X = rng.normal(loc=[25, 65, 80, 1500, 70, 60, 50, 45],
+                   scale=[5, 15, 40, 900, 15, 15, 40, 20], size=(300, 8))
+    y = (X[:, 0] + rng.normal(scale=3, size=300)) > 26
+    scaler = StandardScaler().fit(X)
+    model = GaussianNB().fit(scaler.transform(X), y)
+    return model, scaler, X
+
+
+def test_matches_sklearn_probabilities(fitted):
+    model, scaler, X = fitted
+    compiled = CompiledGaussianNB.from_estimators(model, scaler)
+    expected = model.predict_proba(scaler.transform(X))
+    np.testing.assert_allclose(compiled.predict_proba(X), expected, rtol=1e-9, atol=1e-12)
+    np.testing.assert_array_equal(compiled.predict(X), model.predict(scaler.transform(X)))
+
+
+def test_score_one_matches_batch(fitted):
+    model, scaler, X = fitted
+    compiled = CompiledGaussianNB.from_estimators(model, scaler)
+    probabilities = compiled.outbreak_probability(X[:20])
+    for row, expected in zip(X[:20], probabilities):
+        prob, label = compiled.score_one(row.tolist())
+        assert prob == pytest.approx(expected, abs=1e-12)
+        assert label == (expected >= 0.5)
+
+
+def test_without_scaler(fitted):
+    model, _, X = fitted
+    compiled = CompiledGaussianNB.from_estimators(model)
+    np.testing.assert_allclose(compiled.predict_proba(X), model.predict_proba(X), atol=1e-12)
+
+
+def test_single_class_model_has_no_outbreak_probability():
+    model = GaussianNB().fit(np.random.default_rng(1).normal(size=(10, 8)), np.zeros(10, bool))
+    compiled = CompiledGaussianNB.from_estimators(model)
+    prob, label = compiled.score_one([0.0] * 8)
+    assert prob == 0.0
+    assert not label
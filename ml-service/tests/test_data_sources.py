@@ -0,0 +1,221 @@
+"""
+Tests for direct training data sources
+======================================
+"""
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app import data_sources
+from app.columnar import DISEASE_CODES, FEATURE_COLUMNS, TrainingColumns
+from app.config import settings
+from app.models import DataSourceRef, DiseaseEnum
+
+
+def as_rows(points, with_counties=False):
+    """Cursor tuples in the layout _database_query selects"""
+    return [
+        tuple(getattr(p, col) for col in FEATURE_COLUMNS)
+        + (p.outbreak_occurred, p.disease.value)
+        + ((p.county,) if with_counties else ())
+        for p in points
+    ]
+
+
+def test_scoped_columns_match_filter_scope(training_points):
+    from app.model_keys import filter_scope
+
+    for i, point in enumerate(training_points):
+        point.county = ["Kisumu", "Siaya", "Nairobi"][i % 3]
+    rows = as_rows(training_points, with_counties=True)
+    columns = data_sources._rows_to_columns(rows, with_counties=True)
+
+    for scope in ({"county": "kisumu"}, {"region": "Nyanza"}):
+        expected = TrainingColumns.from_points(filter_scope(training_points, **scope))
+        np.testing.assert_array_equal(columns.scoped(**scope).features, expected.features)
+    with pytest.raises(ValueError):
+        TrainingColumns.from_points(training_points).scoped(county="Kisumu")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PostgreSQL
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def test_database_query_pushes_down_filters():
+    from datetime import datetime
+
+    source = DataSourceRef(type="database", since=datetime(2025, 1, 1))
+    query, params = data_sources._database_query(source, DiseaseEnum.CHOLERA, with_counties=True)
+    assert "COALESCE(vaccination_rate, 0.0)" in query
+    assert query.endswith(
+        "WHERE outbreak_occurred IS NOT NULL AND disease = %s AND observation_date >= %s"
+    )
+    assert query.split(" FROM ")[0].endswith("county")
+    assert params == ["Cholera", datetime(2025, 1, 1)]
+
+    query, params = data_sources._database_query(
+        DataSourceRef(type="database", until=datetime(2026, 1, 1)), None, with_counties=False
+    )
+    assert query.endswith("WHERE outbreak_occurred IS NOT NULL AND observation_date < %s")
+    assert params == [datetime(2026, 1, 1)]
+
+
+def test_date_filters_match_migrated_schema():
+    migration = Path(__file__).parents[2] / "supabase" / "migrations" / "002_ml_tables.sql"
+    if not migration.exists():
+        pytest.skip("migrations are not shipped with the service")
+    training_table = migration.read_text().split("CREATE TABLE IF NOT EXISTS training_data")[1]
+    assert f"{data_sources.DATE_COLUMN} TIMESTAMP" in training_table.split(");")[0]
+
+
+def test_database_source_reads_named_cursor_in_chunks(monkeypatch, training_points):
+    class FakeCursor:
+        def __init__(self, rows):
+            self.rows = rows
+            self.fetches = 0
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def execute(self, query, params):
+            self.query = query
+
+        def fetchmany(self, size):
+            self.fetches += 1
+            chunk, self.rows = self.rows[:size], self.rows[size:]
+            return chunk
+
+    class FakeConnection:
+        def __init__(self, cursor):
+            self.cursor_obj = cursor
+            self.cursor_name = None
+
+        def set_session(self, readonly):
+            self.readonly = readonly
+
+        def cursor(self, name=None):
+            self.cursor_name = name
+            return self.cursor_obj
+
+        def close(self):
+            self.closed = True
+
+    connection = FakeConnection(FakeCursor(as_rows(training_points)))
+    monkeypatch.setattr(data_sources, "_connect", lambda: connection)
+
+    columns = data_sources.load_training_columns(
+        DataSourceRef(type="database"), chunk_rows=64
+    )
+    expected = TrainingColumns.from_points(training_points)
+    np.testing.assert_array_equal(columns.features, expected.features)
+    np.testing.assert_array_equal(columns.disease_codes, expected.disease_codes)
+    assert connection.cursor_name and connection.readonly and connection.closed
+    assert connection.cursor_obj.fetches == 5  # 4 chunks of <= 64 rows, then empty
+
+
+def test_database_source_requires_url(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_URL", "")
+    with pytest.raises(ValueError, match="DATABASE_URL"):
+        data_sources.load_training_columns(DataSourceRef(type="database"))
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Parquet
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@pytest.fixture
+def parquet_dir(monkeypatch, tmp_path, training_points):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    table = pa.Table.from_pylist([
+        {**p.model_dump(), "disease": p.disease.value, "vaccination_rate": None if i == 0 else p.vaccination_rate}
+        for i, p in enumerate(training_points)
+    ])
+    (tmp_path / "snapshots").mkdir()
+    pq.write_table(table, tmp_path / "snapshots" / "training.parquet", row_group_size=50)
+    monkeypatch.setattr(settings, "TRAINING_DATA_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_parquet_source_filters_and_fills_defaults(parquet_dir, training_points):
+    source = DataSourceRef(type="parquet", path="snapshots/training.parquet")
+    columns = data_sources.load_training_columns(source, chunk_rows=32)
+    expected = TrainingColumns.from_points(training_points)
+    assert columns.features[0, FEATURE_COLUMNS.index("vaccination_rate")] == 0.0
+    np.testing.assert_array_equal(columns.features[1:], expected.features[1:])
+    np.testing.assert_array_equal(columns.labels, expected.labels)
+    assert columns.counties is None
+
+    malaria = data_sources.load_training_columns(source, DiseaseEnum.MALARIA, with_counties=True)
+    assert set(malaria.disease_codes) == {DISEASE_CODES[DiseaseEnum.MALARIA]}
+    assert malaria.counties[0] == training_points[0].county
+
+
+def test_parquet_date_filter_uses_table_column(monkeypatch, tmp_path, training_points):
+    from datetime import datetime, timedelta
+
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    start = datetime(2025, 1, 1)
+    table = pa.Table.from_pylist([
+        {**p.model_dump(exclude={"date"}), "disease": p.disease.value,
+         "observation_date": start + timedelta(days=i)}
+        for i, p in enumerate(training_points)
+    ])
+    pq.write_table(table, tmp_path / "export.parquet")
+    monkeypatch.setattr(settings, "TRAINING_DATA_DIR", str(tmp_path))
+
+    source = DataSourceRef(
+        type="parquet", path="export.parquet",
+        since=start + timedelta(days=10), until=start + timedelta(days=30)
+    )
+    assert len(data_sources.load_training_columns(source).labels) == 20
+
+
+def test_parquet_path_must_stay_inside_data_dir(parquet_dir):
+    with pytest.raises(ValueError, match="inside"):
+        data_sources.load_training_columns(DataSourceRef(type="parquet", path="../etc/passwd"))
+    with pytest.raises(ValueError, match="not found"):
+        data_sources.load_training_columns(DataSourceRef(type="parquet", path="missing.parquet"))
+
+
+def test_train_endpoint_reads_data_source(monkeypatch, tmp_path, parquet_dir):
+    from fastapi.testclient import TestClient
+    from app import main
+    from app.ml_service import MLModelManager
+
+    monkeypatch.setattr(main, "ml_manager", MLModelManager(models_dir=str(tmp_path / "models")))
+    client = TestClient(main.app)
+
+    source = {"type": "parquet", "path": "snapshots"}
+    response = client.post("/train", json={"data_source": source, "disease": "Cholera"})
+    assert response.status_code == 200
+    assert response.json()["success"] and response.json()["disease"] == "Cholera"
+
+    assert client.post("/train", json={"disease": "Cholera"}).status_code == 422
+    both = {"data_source": source, "training_data": []}
+    assert client.post("/train", json=both).status_code == 422
+
+
+def test_incremental_data_source_needs_since(monkeypatch, tmp_path, parquet_dir):
+    from fastapi.testclient import TestClient
+    from app import main
+    from app.ml_service import MLModelManager
+
+    monkeypatch.setattr(main, "ml_manager", MLModelManager(models_dir=str(tmp_path / "models")))
+    client = TestClient(main.app)
+    source = {"type": "parquet", "path": "snapshots"}
+    assert client.post("/train", json={"data_source": source, "disease": "Cholera"}).status_code == 200
+
+    unbounded = {"data_source": source, "disease": "Cholera", "incremental": True}
+    response = client.post("/train", json=unbounded)
+    assert response.status_code == 422 and "since" in response.text
+
+    bounded = {**unbounded, "data_source": {**source, "since": "2026-01-15T00:00:00"}}
+    response = client.post("/train", json=bounded)
+    assert response.status_code == 200 and response.json()["success"]
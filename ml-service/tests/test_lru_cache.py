@@ -0,0 +1,57 @@
+"""
+Tests for the shared bounded LRU
+================================
+Count, byte and time bounds behind ModelCache and PredictionCache.
+"""
+from app.lru_cache import BoundedLRU
+from app.model_cache import ModelCache
+from app.prediction_cache import PredictionCache
+
+
+def test_count_bound_evicts_least_recently_used():
+    cache = BoundedLRU(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.put("c", 3)
+    assert cache.keys() == ["a", "c"]
+    assert cache.evictions == 1 and cache.loads == 3
+
+
+def test_byte_bound_keeps_the_newest_entry():
+    cache = BoundedLRU(max_entries=10, max_bytes=100, sizeof=len)
+    cache.put("a", "x" * 60)
+    cache.put("b", "x" * 60)
+    assert cache.keys() == ["b"] and cache.bytes == 60
+    cache.put("huge", "x" * 500)  # alone over the limit, but still cached
+    assert cache.keys() == ["huge"] and cache.bytes == 500
+    assert cache.pop("huge") == "x" * 500 and cache.bytes == 0
+
+
+def test_entries_expire_after_ttl():
+    now = [0.0]
+    cache = BoundedLRU(max_entries=4, ttl_seconds=10, clock=lambda: now[0])
+    cache.put("a", 1)
+    now[0] = 9.9
+    assert cache.peek("a") == 1 and cache.get("a") == 1
+    now[0] = 10.0
+    assert cache.peek("a") is None
+    assert cache.get("a") is None
+    assert (cache.expirations, cache.misses, len(cache)) == (1, 1, 0)
+
+
+def test_zero_entries_disables_the_cache():
+    cache = BoundedLRU(max_entries=0)
+    cache.put("a", 1)
+    assert cache.get("a") is None
+    assert len(cache) == 0 and cache.misses == 0
+
+
+def test_caches_share_the_implementation():
+    models = ModelCache(max_models=0)
+    assert models.max_models == 1  # a model cache always holds the active version
+    assert "max_models" in models.stats()
+
+    predictions = PredictionCache(max_size=0, ttl_seconds=60)
+    assert not predictions.enabled
+    assert predictions.stats()["max_size"] == 0
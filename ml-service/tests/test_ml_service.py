@@ -0,0 +1,341 @@
+"""
+Tests for the ML model manager
+==============================
+Training, single-row prediction and the vectorized batch path.
+"""
+import time
+
+import numpy as np
+import pytest
+from sklearn.naive_bayes import GaussianNB
+from sklearn.preprocessing import StandardScaler
+
+from app.ml_service import MLModelManager, cross_validate_naive_bayes, update_naive_bayes
+from app.models import DiseaseEnum, RiskLevelEnum
+
+from tests.conftest import make_prediction_request
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Batch Prediction
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestBatchPrediction:
+    """predict_batch must agree with predict row for row."""
+
+    def test_batch_matches_single_row(self, trained_manager):
+        requests = [
+            make_prediction_request(DiseaseEnum.MALARIA),
+            make_prediction_request(DiseaseEnum.CHOLERA, temperature=18.0, rainfall=10.0),
+            make_prediction_request(DiseaseEnum.MALARIA, vaccination_rate=15.0, previous_cases=7),
+            make_prediction_request(DiseaseEnum.COVID, county="Nairobi", humidity=40.0),
+        ]
+        batch = trained_manager.predict_batch(requests)
+        assert len(batch) == len(requests)
+        for request, result in zip(requests, batch):
+            single = trained_manager.predict(request)
+            assert result.county == request.county
+            assert result.disease == request.disease
+            assert result.outbreak_probability == pytest.approx(single.outbreak_probability)
+            assert result.risk_level == single.risk_level
+            assert result.predicted_cases == single.predicted_cases
+            assert result.model_version == single.model_version
+            assert result.registry_version == single.registry_version
+            assert result.recommendations == single.recommendations
+
+    def test_registry_version_matches_model_status(self, trained_manager):
+        result = trained_manager.predict(make_prediction_request(DiseaseEnum.MALARIA))
+        status = trained_manager.get_model_status()["models"]
+        assert result.registry_version.startswith("v")
+        assert result.registry_version in {m["version"] for m in status.values()}
+
+    def test_empty_batch(self, trained_manager):
+        assert trained_manager.predict_batch([]) == []
+
+    def test_batch_without_models_uses_mock_fallback(self, manager):
+        request = make_prediction_request(DiseaseEnum.DENGUE)
+        [result] = manager.predict_batch([request])
+        assert result.outbreak_probability == pytest.approx(
+            manager.predict(request).outbreak_probability
+        )
+        assert result.model_version == "NaiveBayes_unknown"
+        assert result.registry_version is None
+
+    def test_columnar_matches_rows(self, trained_manager):
+        requests = [
+            make_prediction_request(DiseaseEnum.MALARIA, temperature=33.0),
+            make_prediction_request(DiseaseEnum.CHOLERA, temperature=18.0, rainfall=10.0),
+            make_prediction_request(DiseaseEnum.MALARIA, vaccination_rate=15.0, previous_cases=7),
+            make_prediction_request(DiseaseEnum.COVID, county="Nairobi", humidity=40.0),
+        ]
+        rows = trained_manager.predict_batch(requests)
+        columns = trained_manager.predict_batch_columns(requests)
+
+        assert columns["count"] == len(requests)
+        for i, row in enumerate(rows):
+            assert columns["county"][i] == row.county
+            assert columns["disease"][i] == row.disease.value
+            assert columns["risk_level"][i] == row.risk_level.value
+            assert columns["outbreak_probability"][i] == pytest.approx(row.outbreak_probability)
+            assert columns["confidence_score"][i] == pytest.approx(row.confidence_score)
+            assert columns["predicted_cases"][i] == row.predicted_cases
+            assert columns["model_version"][i] == row.model_version
+            assert columns["registry_version"][i] == row.registry_version
+            code = columns["recommendations"][i]
+            assert columns["recommendation_sets"][code] == row.recommendations
+
+    def test_columnar_empty_batch(self, trained_manager):
+        columns = trained_manager.predict_batch_columns([])
+        assert columns["count"] == 0
+        assert len(columns["outbreak_probability"]) == 0
+        assert columns["recommendation_sets"] == []
+
+    def test_batch_endpoint_columnar_format(self, monkeypatch, trained_manager):
+        from fastapi.testclient import TestClient
+        from app import main
+
+        monkeypatch.setattr(main, "ml_manager", trained_manager)
+        client = TestClient(main.app)
+        body = [make_prediction_request(d).model_dump(mode="json") for d in DiseaseEnum]
+
+        rows = client.post("/predict/batch", json=body).json()
+        columns = client.post("/predict/batch", params={"format": "columnar"}, json=body).json()
+        assert columns["count"] == len(rows)
+        assert columns["outbreak_probability"] == [r["outbreak_probability"] for r in rows]
+        assert columns["predicted_cases"] == [r["predicted_cases"] for r in rows]
+        assert client.post("/predict/batch", params={"format": "xml"}, json=body).status_code == 422
+
+
+@pytest.mark.parametrize("probability, previous_cases, expected_level, expected_cases", [
+    (0.95, 100, RiskLevelEnum.CRITICAL, 250),
+    (0.8, 100, RiskLevelEnum.CRITICAL, 250),
+    (0.65, 100, RiskLevelEnum.HIGH, 180),
+    (0.4, 100, RiskLevelEnum.MEDIUM, 120),
+    (0.1, 100, RiskLevelEnum.LOW, 80),
+])
+def test_classify_risk_bands(probability, previous_cases, expected_level, expected_cases):
+    level, cases = MLModelManager._classify_risk(probability, previous_cases)
+    assert level == expected_level
+    assert cases == expected_cases
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Prediction Cache
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestPredictionCache:
+    """Repeated requests are served from the LRU + TTL cache."""
+
+    def test_repeat_request_hits_cache(self, trained_manager):
+        request = make_prediction_request()
+        first = trained_manager.predict(request)
+        second = trained_manager.predict(request.model_copy(update={"county": "Siaya"}))
+        stats = trained_manager.get_model_status()["prediction_cache"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert second.county == "Siaya"
+        assert second.outbreak_probability == first.outbreak_probability
+
+    def test_training_invalidates_cache(self, trained_manager, training_points):
+        trained_manager.predict(make_prediction_request())
+        assert len(trained_manager.prediction_cache) == 1
+        trained_manager.train_model(training_points, disease=DiseaseEnum.MALARIA)
+        assert len(trained_manager.prediction_cache) == 0
+
+    def test_lru_eviction_and_ttl(self):
+        from app.prediction_cache import PredictionCache
+        now = [0.0]
+        cache = PredictionCache(max_size=2, ttl_seconds=10, clock=lambda: now[0])
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        assert cache.stats()["evictions"] == 1
+        now[0] = 11.0
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Training Jobs
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def test_train_all_job_publishes_every_model(manager, training_points):
+    from app.training_jobs import TrainingJobManager
+    jobs = TrainingJobManager(manager, max_workers=2)
+    try:
+        job = jobs.submit(training_points, train_all=True)
+        assert job.targets[-1] == "all"
+        for _ in range(600):
+            if jobs.get(job.id)["status"] in ("completed", "failed"):
+                break
+            time.sleep(0.1)
+        result = jobs.get(job.id)
+        assert result["status"] == "completed"
+        assert result["progress"]["finished"] == len(DiseaseEnum) + 1
+        assert set(manager.model_metadata) == {d.value for d in DiseaseEnum} | {"all"}
+    finally:
+        jobs.shutdown()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Incremental Training
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestIncrementalTraining:
+    """update_naive_bayes must match a full refit on the combined history."""
+
+    @staticmethod
+    def _fit(X, y):
+        scaler = StandardScaler().fit(X)
+        return GaussianNB().fit(scaler.transform(X), y), scaler
+
+    def test_update_matches_full_refit(self, manager, training_points):
+        X, y = manager.prepare_training_data(training_points)
+        X = X.astype(np.float64)
+        model, scaler = self._fit(X[:150], y[:150])
+        updated, updated_scaler, evaluation = update_naive_bayes(model, scaler, X[150:], y[150:])
+        expected, expected_scaler = self._fit(X, y)
+
+        np.testing.assert_allclose(updated_scaler.mean_, expected_scaler.mean_)
+        np.testing.assert_allclose(updated_scaler.scale_, expected_scaler.scale_)
+        np.testing.assert_allclose(updated.theta_, expected.theta_, atol=1e-9)
+        np.testing.assert_allclose(updated.var_, expected.var_, rtol=1e-7)
+        np.testing.assert_allclose(updated.class_prior_, expected.class_prior_)
+        assert evaluation["training_samples"] == len(X)
+        assert evaluation["test_samples"] == 50
+        # The active estimators are left untouched
+        assert scaler.n_samples_seen_ == 150
+
+    def test_update_model_publishes_new_version(self, trained_manager, training_points):
+        before = trained_manager.registry.get("Malaria")
+        result = trained_manager.update_model(training_points[:30], disease=DiseaseEnum.MALARIA)
+        assert result["success"]
+        after = trained_manager.registry.get("Malaria")
+        assert after.version != before.version
+        assert after.metadata["training_mode"] == "incremental"
+        assert after.metadata["training_samples"] > before.metadata["training_samples"]
+
+    def test_update_requires_existing_model(self, manager, training_points):
+        result = manager.update_model(training_points, disease=DiseaseEnum.FLU)
+        assert result["success"] is False
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Cross-Validation Training
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def test_cross_validation_records_per_fold_metrics(manager, training_points):
+    result = manager.train_model(training_points, cross_validation=True, cv_folds=4)
+    assert result["success"], result
+
+    cv = manager.model_metadata["all"]["cross_validation"]
+    assert cv["folds"] == 4 and len(cv["per_fold"]) == 4
+    assert cv["var_smoothing"] in [c["var_smoothing"] for c in cv["grid"]]
+    f1_scores = [fold["f1_score"] for fold in cv["per_fold"]]
+    assert cv["aggregate"]["f1_score"]["mean"] == pytest.approx(np.mean(f1_scores))
+    assert result["f1_score"] == pytest.approx(np.mean(f1_scores))
+    # Pooled confusion counts cover every row exactly once
+    assert sum(result["metrics"].values()) == len(training_points)
+    assert manager.model_metadata["all"]["training_mode"] == "cross_validation"
+
+
+def test_cross_validation_picks_best_f1_candidate():
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(120, 8))
+    y = X[:, 0] + rng.normal(scale=0.5, size=120) > 0
+    model, scaler, evaluation = cross_validate_naive_bayes(
+        X, y, n_folds=3, var_smoothing_grid=[1e-9, 1e-1, 10.0], n_jobs=1
+    )
+    grid = evaluation["cross_validation"]["grid"]
+    best = max(grid, key=lambda c: c["f1_mean"])
+    assert model.var_smoothing == best["var_smoothing"]
+    assert scaler.n_samples_seen_ == 120
+
+
+def test_cross_validation_reduces_folds_and_rejects_tiny_data():
+    X = np.arange(16, dtype=float).reshape(2, 8).repeat(5, axis=0)
+    y = np.array([True] * 3 + [False] * 7)
+    _, _, evaluation = cross_validate_naive_bayes(X, y, n_folds=5, n_jobs=1)
+    assert evaluation["cross_validation"]["folds"] == 3
+
+    with pytest.raises(ValueError):
+        cross_validate_naive_bayes(X, np.array([True] + [False] * 9), n_jobs=1)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# County / Region Scoped Models
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def test_fallback_chain_order():
+    from app.model_keys import fallback_chain
+
+    assert fallback_chain("Malaria", "Homa Bay") == (
+        "county__homa-bay__Malaria", "region__nyanza__Malaria", "Malaria", "all"
+    )
+    assert fallback_chain("Malaria", "Atlantis") == ("county__atlantis__Malaria", "Malaria", "all")
+    assert fallback_chain("Flu") == ("Flu", "all")
+
+
+def test_predictions_use_most_specific_scoped_model(trained_manager, training_points):
+    for point in training_points[:120]:
+        point.county = "Kisumu" if point.county < "County 3" else "Siaya"
+    region = trained_manager.train_model(
+        training_points[:120], disease=DiseaseEnum.MALARIA, region="Nyanza"
+    )
+    county = trained_manager.train_model(
+        training_points[:120], disease=DiseaseEnum.MALARIA, county="Kisumu"
+    )
+    assert county["model_key"] == "county__kisumu__Malaria"
+    assert region["model_key"] == "region__nyanza__Malaria"
+
+    resolve = trained_manager._resolve_model
+    assert resolve("Malaria", "Kisumu")[0] == "county__kisumu__Malaria"
+    assert resolve("Malaria", "Siaya")[0] == "region__nyanza__Malaria"
+    assert resolve("Malaria", "Nairobi")[0] == "Malaria"
+    assert resolve("Cholera", "Kisumu")[0] == "all"
+
+    requests = [
+        make_prediction_request(county=county_name)
+        for county_name in ("Kisumu", "Siaya", "Nairobi")
+    ]
+    batch = trained_manager.predict_batch(requests)
+    for request, response in zip(requests, batch):
+        assert trained_manager.predict(request).outbreak_probability == \
+            response.outbreak_probability
+
+
+def test_scoped_training_rejects_columnar_data(manager, training_points):
+    from app.columnar import TrainingColumns
+
+    result = manager.train_model(
+        TrainingColumns.from_points(training_points), county="Kisumu"
+    )
+    assert not result["success"]
+
+
+def test_exported_params_reproduce_predictions(trained_manager, training_points):
+    import math
+
+    for point in training_points[:60]:
+        point.county = "Kisumu"
+    trained_manager.train_model(training_points[:60], disease=DiseaseEnum.MALARIA, county="Kisumu")
+    params = trained_manager.export_params()
+    assert set(params["models"]) == {"all", "Malaria"}
+
+    request = make_prediction_request(DiseaseEnum.MALARIA, county="Nairobi")
+    model = params["models"]["Malaria"]
+    features = [getattr(request, col) for col in params["feature_columns"]]
+    jll = [
+        norm - 0.5 * sum((x - t) ** 2 * v for x, t, v in zip(features, theta, inv_var))
+        for norm, theta, inv_var in zip(model["log_norm"], model["theta"], model["inv_var"])
+    ]
+    positive = [math.exp(j - max(jll)) for j in jll]
+    probability = positive[model["classes"].index(True)] / sum(positive)
+
+    prediction = trained_manager.predict(request)
+    assert round(probability, 4) == prediction.outbreak_probability
+    assert model["model_version"] == prediction.model_version
+    base = params["recommendations_by_level"][prediction.risk_level.value]
+    assert prediction.recommendations[:len(base)] == base
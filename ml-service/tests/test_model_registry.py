@@ -0,0 +1,200 @@
+"""
+Tests for the versioned model registry
+======================================
+Publishing, manifest persistence, rollback and legacy file migration.
+"""
+import json
+import multiprocessing
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.naive_bayes import GaussianNB
+
+from app.ml_service import MLModelManager
+from app.model_registry import LEGACY_VERSION, ModelRegistry
+from app.models import DiseaseEnum
+
+from tests.conftest import make_prediction_request
+
+
+def test_training_publishes_versioned_files(trained_manager):
+    models_dir = trained_manager.models_dir
+    manifest = json.loads((models_dir / "manifest.json").read_text())["models"]
+    assert set(manifest) == {"all", "Malaria"}
+    record = manifest["Malaria"]["versions"][-1]
+    assert manifest["Malaria"]["active"] == record["version"]
+    assert (models_dir / record["artifact_path"]).exists()
+    assert not list(models_dir.rglob("*.pkl"))
+
+
+def test_manifest_is_reloaded_by_a_new_manager(trained_manager):
+    request = make_prediction_request()
+    expected = trained_manager.predict(request)
+    reloaded = MLModelManager(models_dir=str(trained_manager.models_dir))
+    assert reloaded.model_metadata["Malaria"]["version"] == \
+        trained_manager.model_metadata["Malaria"]["version"]
+    assert reloaded.predict(request).outbreak_probability == expected.outbreak_probability
+
+
+def test_rollback_repoints_to_previous_version(trained_manager, training_points):
+    first = trained_manager.registry.get("Malaria")
+    retrained = trained_manager.train_model(training_points[:60], disease=DiseaseEnum.MALARIA)
+    assert trained_manager.registry.get("Malaria").version == retrained["model_version"]
+
+    result = trained_manager.rollback_model("Malaria")
+    assert result["active_version"] == first.version
+    assert trained_manager.registry.get("Malaria") is first
+
+    with pytest.raises(ValueError):
+        trained_manager.rollback_model("Malaria")
+    with pytest.raises(KeyError):
+        trained_manager.rollback_model("Cholera")
+
+
+def test_history_is_pruned(tmp_path, training_points):
+    manager = MLModelManager(models_dir=str(tmp_path))
+    manager.registry.history_limit = 2
+    manager.registry.retire_grace_seconds = 0
+    for _ in range(3):
+        manager.train_model(training_points, disease=DiseaseEnum.FLU)
+    versions = manager.registry.versions("Flu")
+    assert len(versions) == 2
+    assert len(list((tmp_path / "versions" / "Flu").iterdir())) == 2
+
+
+def test_pruned_versions_stay_loadable_for_lagging_replicas(tmp_path, training_points):
+    now = [1000.0]
+    manager = MLModelManager(models_dir=str(tmp_path))
+    manager.registry = ModelRegistry(
+        tmp_path, history_limit=1, retire_grace_seconds=60, clock=lambda: now[0]
+    )
+    first = manager.train_model(training_points, disease=DiseaseEnum.FLU)["model_version"]
+    replica = ModelRegistry(tmp_path)  # its snapshot points at `first`
+
+    manager.train_model(training_points, disease=DiseaseEnum.FLU)
+    assert (tmp_path / "versions" / "Flu" / first).exists()
+    assert replica.get("Flu").version == first  # loads from disk despite the pruning
+
+    now[0] += 61
+    manager.train_model(training_points, disease=DiseaseEnum.CHOLERA)
+    assert not (tmp_path / "versions" / "Flu" / first).exists()
+    manifest = json.loads((tmp_path / "manifest.json").read_text())["models"]
+    assert manifest["Flu"]["retired"] == []
+
+
+def test_empty_manifest_file_is_not_replaced_by_stale_snapshot(trained_manager):
+    registry = trained_manager.registry
+    registry._write_manifest({})  # e.g. another process cleared every key
+    registry.publish("Flu", registry.get("all").model, registry.get("all").scaler, {})
+    manifest = json.loads(registry.manifest_path.read_text())["models"]
+    assert set(manifest) == {"Flu"}
+
+
+def test_legacy_files_are_registered(tmp_path, trained_manager):
+    active = trained_manager.registry.get("all")
+    joblib.dump(active.model, tmp_path / "naive_bayes_all_diseases.pkl")
+    joblib.dump(active.scaler, tmp_path / "scaler_all_diseases.pkl")
+    (tmp_path / "metadata_all_diseases.json").write_text(json.dumps(active.metadata))
+
+    registry = ModelRegistry(tmp_path)
+    legacy = registry.get("all")
+    assert legacy.version == LEGACY_VERSION
+    assert legacy.metadata["trained_at"] == active.metadata["trained_at"]
+
+
+def test_replica_picks_up_models_published_elsewhere(trained_manager, training_points):
+    replica = MLModelManager(models_dir=str(trained_manager.models_dir))
+    stale = replica.registry.get("Malaria")
+    assert replica.registry.refresh() == []  # nothing changed yet
+
+    retrained = trained_manager.train_model(training_points[:80], disease=DiseaseEnum.MALARIA)
+    trained_manager.train_model(training_points, disease=DiseaseEnum.CHOLERA)
+
+    # Only models that were hot here are reloaded eagerly; new keys stay lazy
+    assert replica.registry.refresh() == ["Malaria"]
+    assert replica.registry.get("Malaria").version == retrained["model_version"]
+    assert replica.registry.get("Malaria") is not stale
+    assert not replica.registry.is_loaded("Cholera")
+    assert replica.registry.get("Cholera") is not None
+    assert replica.registry.refresh() == []
+
+
+def test_publish_merges_other_replicas_entries(trained_manager, training_points):
+    replica = MLModelManager(models_dir=str(trained_manager.models_dir))
+    trained_manager.train_model(training_points, disease=DiseaseEnum.CHOLERA)
+    replica.train_model(training_points, disease=DiseaseEnum.FLU)
+
+    manifest = json.loads((trained_manager.models_dir / "manifest.json").read_text())["models"]
+    assert {"Cholera", "Flu"} <= set(manifest)
+
+
+def test_checksum_mismatch_refuses_to_load(trained_manager):
+    models_dir = trained_manager.models_dir
+    record = json.loads((models_dir / "manifest.json").read_text())["models"]["all"]["versions"][-1]
+    assert record["checksum"].startswith("sha256:")
+    artifact = models_dir / record["artifact_path"]
+    data = bytearray(artifact.read_bytes())
+    data[-1] ^= 0xFF
+    artifact.write_bytes(bytes(data))
+
+    assert ModelRegistry(models_dir).get("all") is None
+
+
+def test_loaded_models_are_bounded_and_reload_on_miss(tmp_path, training_points):
+    manager = MLModelManager(models_dir=str(tmp_path))
+    for disease in (DiseaseEnum.MALARIA, DiseaseEnum.CHOLERA, DiseaseEnum.FLU):
+        manager.train_model(training_points, disease=disease)
+
+    registry = ModelRegistry(tmp_path, max_loaded_models=2)
+    for key in ("Malaria", "Cholera", "Flu"):
+        assert registry.get(key) is not None
+    assert not registry.is_loaded("Malaria")
+
+    assert registry.get("Malaria") is not None  # loaded again on miss
+    stats = registry.cache_stats()
+    assert stats["size"] == 2
+    assert stats["evictions"] == 2
+    assert stats["loads"] == 4
+    assert stats["bytes"] > 0
+
+
+def test_byte_limit_evicts_least_recently_used(tmp_path, training_points):
+    manager = MLModelManager(models_dir=str(tmp_path))
+    manager.train_model(training_points, disease=DiseaseEnum.MALARIA)
+    manager.train_model(training_points, disease=DiseaseEnum.CHOLERA)
+    one_model = manager.registry.cache_stats()["bytes"] // 2
+
+    registry = ModelRegistry(tmp_path, max_loaded_bytes=one_model)
+    registry.get("Malaria")
+    registry.get("Cholera")
+    assert registry.is_loaded("Cholera") and not registry.is_loaded("Malaria")
+
+
+def _publish_versions(models_dir, key, count):
+    """Child process: publish `count` versions of one key"""
+    rng = np.random.default_rng(len(key))
+    model = GaussianNB().fit(rng.normal(size=(20, 8)), np.arange(20) % 2)
+    registry = ModelRegistry(models_dir, history_limit=count)
+    for i in range(count):
+        registry.publish(key, model, None, {"run": i})
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="needs fork"
+)
+def test_concurrent_publishes_from_processes_keep_every_version(tmp_path):
+    keys = ["Malaria", "Cholera", "Dengue", "Flu"]
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(target=_publish_versions, args=(tmp_path, key, 8)) for key in keys
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+    manifest = json.loads((tmp_path / "manifest.json").read_text())["models"]
+    assert set(manifest) == set(keys)
+    assert all(len(manifest[key]["versions"]) == 8 for key in keys)
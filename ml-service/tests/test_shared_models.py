@@ -0,0 +1,72 @@
+"""
+Tests for shared-memory model serving
+=====================================
+Parameters published by the launcher are served by workers without
+touching the artifact files, and scoring matches the file-backed path.
+"""
+import numpy as np
+import pytest
+
+from app import inference_pool, shared_models
+from app.config import settings
+from app.model_registry import ModelRegistry
+from app.models import DiseaseEnum
+from app.shared_models import SharedModelSegment
+
+from tests.conftest import make_prediction_request
+
+
+@pytest.fixture
+def segment(trained_manager):
+    segment = SharedModelSegment.publish(trained_manager.registry.active_artifacts())
+    yield segment
+    segment.close()
+
+
+def test_worker_scores_from_shared_memory(trained_manager, segment):
+    assert set(segment.index) == {
+        f"{key}@{trained_manager.registry.get(key).version}"
+        for key in trained_manager.registry.keys()
+    }
+
+    # A worker attaches by name; artifact files are no longer needed
+    worker_segment = SharedModelSegment.attach(segment.shm.name, segment.index)
+    for path in trained_manager.models_dir.glob("versions/*/*/model.npy"):
+        path.unlink()
+    worker = ModelRegistry(trained_manager.models_dir, shared=worker_segment)
+
+    features = np.array([trained_manager._request_features(make_prediction_request())])
+    for key in trained_manager.registry.keys():
+        loaded = worker.get(key)
+        assert not loaded.compiled.theta.flags.writeable
+        np.testing.assert_allclose(
+            loaded.compiled.outbreak_probability(features),
+            trained_manager.registry.get(key).compiled.outbreak_probability(features),
+        )
+
+
+def test_attached_segment_reads_environment(monkeypatch, segment):
+    monkeypatch.setattr(shared_models, "_attached", None)
+    for name, value in segment.environ().items():
+        monkeypatch.setenv(name, value)
+    attached = shared_models.attached_segment()
+    assert attached.index == segment.index
+    assert shared_models.attached_segment() is attached
+
+    key, version = next(iter(segment.index)).split("@")
+    np.testing.assert_array_equal(attached.get(key, version), segment.get(key, version))
+    assert attached.get(key, "v0") is None
+
+
+def test_nothing_to_share(manager):
+    assert SharedModelSegment.publish(manager.registry.active_artifacts()) is None
+
+
+def test_inference_threads_split_cpus_between_workers(monkeypatch):
+    monkeypatch.setattr(inference_pool.os, "cpu_count", lambda: 8)
+    monkeypatch.setattr(settings, "SERVE_WORKERS", 4)
+    monkeypatch.setattr(settings, "INFERENCE_THREADS", 0)
+    assert inference_pool.default_threads() == 2
+
+    monkeypatch.setattr(settings, "INFERENCE_THREADS", 3)
+    assert inference_pool.InferencePool().max_workers == 3
@@ -0,0 +1,54 @@
+"""
+Tests for startup model warm-up
+===============================
+Every registered model is loaded before the service reports ready.
+"""
+from app.ml_service import MLModelManager
+from app.warmup import ModelWarmup
+
+
+def test_warmup_loads_every_registered_model(trained_manager):
+    reloaded = MLModelManager(models_dir=str(trained_manager.models_dir))
+    assert not any(reloaded.registry.is_loaded(key) for key in reloaded.registry.keys())
+
+    warmup = ModelWarmup(reloaded, max_workers=2)
+    assert not warmup.ready
+    warmup.start()
+    assert warmup.wait(timeout=10)
+
+    status = warmup.to_dict()
+    assert status["ready"] and status["status"] == "ready"
+    assert status["progress"] == {"total": 2, "loaded": 2, "failed": 0, "fraction": 1.0}
+    assert all(reloaded.registry.is_loaded(key) for key in ("all", "Malaria"))
+
+
+def test_warmup_reports_models_that_fail_to_load(trained_manager):
+    models_dir = trained_manager.models_dir
+    for artifact in (models_dir / "versions" / "Malaria").rglob("model.npy"):
+        artifact.write_bytes(b"corrupt")
+
+    warmup = ModelWarmup(MLModelManager(models_dir=str(models_dir)))
+    warmup.run()
+
+    status = warmup.to_dict()
+    assert status["ready"]
+    assert status["failed_models"] == ["Malaria"]
+    assert status["progress"]["loaded"] == 1
+
+
+def test_ready_endpoint_is_gated_on_warmup(monkeypatch, tmp_path):
+    from fastapi.testclient import TestClient
+    from app import main
+
+    warmup = ModelWarmup(MLModelManager(models_dir=str(tmp_path)))
+    monkeypatch.setattr(main, "warmup", warmup)
+    client = TestClient(main.app)
+
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "warming_up"
+
+    warmup.run()
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["ready"] is True